@@ -0,0 +1,26 @@
+#!/bin/bash
+set -e
+
+DATASET_PATH=/home/pi/yolo-benchmark/data/datasets/coco128/images/train2017/
+MODELS_PATH=/home/pi/yolo-benchmark/data/models/
+NUM_CORES=$(nproc)
+
+cd /home/pi/yolo-benchmark
+
+# Sweeps the number of worker processes against the threads of each worker session, keeping
+# workers x threads within the available cores. Each run writes its throughput.csv under a
+# "_workers<K>x<T>" output folder.
+for MODEL_ARCHITECTURE in yolo11n yolo11s yolo11m; do
+  for MODEL_PATH in onnx/${MODEL_ARCHITECTURE}_float32.onnx tflite/${MODEL_ARCHITECTURE}_int8.tflite; do
+    for WORKERS in 1 2 4; do
+      for THREADS in 1 2 4; do
+        if [ $((WORKERS * THREADS)) -gt ${NUM_CORES} ]; then
+          continue
+        fi
+
+        echo "RUNNING BENCHMARK FOR '$MODEL_PATH' WITH $WORKERS WORKERS x $THREADS THREADS" && sleep 10
+        python3 src/InferenceBenckmark/main.py --images_folder ${DATASET_PATH} --model_path ${MODELS_PATH}/${MODEL_PATH} --language python --workers ${WORKERS} --threads ${THREADS} && echo "Waiting 10s to next execution..." && sleep 10
+      done
+    done
+  done
+done
@@ -0,0 +1,54 @@
+import importlib.util
+import os
+import sys
+import threading
+
+ENGINE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "InferenceEngine", "python")
+
+class InProcessEngine:
+    # Runs the Python inference engine in a thread of the benchmark process, without spawning a
+    # process or going through the broker. Messages reach the benchmark through the channel given
+    # as producer
+
+    def __init__(self, engine_folder=ENGINE_FOLDER):
+        self.engine_folder = os.path.normpath(engine_folder)
+        self.thread = None
+        self.error = None
+
+    def start(self, producer, runtime_options, **inferencing_options):
+        engine = self.__load()
+        inferencing_options["runtime_config"] = engine.RuntimeConfig(**runtime_options)
+        inferencing_options["producer"] = producer
+        self.thread = threading.Thread(
+            target=self.__run,
+            args=(engine.start_inferencing, inferencing_options),
+            name="inference-engine",
+            daemon=True
+        )
+        self.thread.start()
+
+    def is_alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def join(self):
+        if self.thread is not None:
+            self.thread.join()
+        if self.error is not None:
+            raise RuntimeError("The in-process inference engine failed.") from self.error
+
+    def __run(self, start_inferencing, inferencing_options):
+        try:
+            start_inferencing(**inferencing_options)
+        except BaseException as error:
+            self.error = error
+
+    def __load(self):
+        # Both applications have an `interface` package; they are namespace packages, so with the
+        # engine folder on the path the engine modules resolve next to the benchmark ones. The
+        # engine entry point is loaded under its own name, as `main` is the benchmark's
+        if self.engine_folder not in sys.path:
+            sys.path.append(self.engine_folder)
+        spec = importlib.util.spec_from_file_location("inference_engine", os.path.join(self.engine_folder, "main.py"))
+        engine = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(engine)
+        return engine
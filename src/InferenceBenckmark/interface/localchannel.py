@@ -0,0 +1,19 @@
+import json
+from interface.messagebuffer import MessageBuffer
+
+class LocalChannel(MessageBuffer):
+    # Handed to an engine running in the benchmark process as its producer: messages are encoded as
+    # they would be for the broker, then buffered directly for the consumer side
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def produce(self, topic, msg):
+        msg_str = json.dumps(msg)
+        self.put(topic, msg_str.encode())
+
+    def produce_bytes(self, topic, payload):
+        self.put(topic, payload)
@@ -0,0 +1,37 @@
+from collections import deque
+import threading
+import json
+
+class MessageBuffer:
+
+    def __init__(self, binary_topics=()):
+        # Messages of these topics are returned as raw bytes instead of being decoded as JSON
+        self.binary_topics = binary_topics
+        # The receiving thread never blocks on a slow consumer: messages are buffered without bound
+        self.msgs = deque()
+        self.condition = threading.Condition()
+
+    def put(self, topic, payload):
+        with self.condition:
+            self.msgs.append([topic, payload])
+            self.condition.notify()
+
+    def consume(self):
+        with self.condition:
+            if not self.msgs:
+                return None, None
+            topic, payload = self.msgs.popleft()
+        return self.__decode(topic, payload)
+
+    def consume_all(self, timeout=None):
+        # Waits until a message arrives or the timeout expires, then takes every buffered message
+        with self.condition:
+            self.condition.wait_for(lambda: self.msgs, timeout=timeout)
+            msgs = list(self.msgs)
+            self.msgs.clear()
+        return [self.__decode(topic, payload) for topic, payload in msgs]
+
+    def __decode(self, topic, payload):
+        if topic in self.binary_topics:
+            return topic, payload
+        return topic, json.loads(payload.decode())
@@ -1,41 +1,46 @@
 import paho.mqtt.client as mqtt
-from queue import Queue
-import json
+import threading
+from interface.messagebuffer import MessageBuffer
 
-class MQTTConsumer:
+class MQTTConsumer(MessageBuffer):
 
-    def __init__(self, server, client_id, topics):
+    def __init__(self, server, client_id, topics, binary_topics=(), qos=1):
+        super().__init__(binary_topics=binary_topics)
         self.server = server
         self.client_id = client_id
         self.topics = topics
+        self.qos = qos
         self.client = mqtt.Client(self.client_id)
+        self.subscribed = threading.Event()
+        self.__started = False
 
     def __del__(self):
         self.stop()
 
     def on_connect(self, client, userdata, flags, rc):
-        for topic in self.topics:
-            self.client.subscribe(topic) 
+        self.client.subscribe([(topic, self.qos) for topic in self.topics])
+
+    def on_subscribe(self, client, userdata, mid, granted_qos):
+        self.subscribed.set()
 
     def on_message(self, client, userdata, msg):
-        self.msgs.put([msg.topic, msg.payload.decode()])
+        self.put(msg.topic, msg.payload)
 
-    def start(self):
+    def start(self, timeout=5.0):
         self.client.on_connect = self.on_connect
+        self.client.on_subscribe = self.on_subscribe
         self.client.on_message = self.on_message
-        self.msgs = Queue(5)
 
         self.client.connect(self.server["address"], self.server["port"])
         self.client.loop_start()
+        self.__started = True
+        # Messages published before the subscription is acknowledged would be missed
+        if not self.subscribed.wait(timeout):
+            raise TimeoutError(f"MQTT subscription to {self.topics} not acknowledged within {timeout} s.")
 
     def stop(self):
+        if not self.__started:
+            return
+        self.__started = False
         self.client.loop_stop()
         self.client.disconnect()
-
-    def consume(self):
-        if self.msgs.qsize() == 0:
-            return None, None
-        else:
-            topic, msg_str = self.msgs.get()
-            msg = json.loads(msg_str)
-            return topic, msg
\ No newline at end of file
@@ -0,0 +1,58 @@
+import os
+import socket
+import struct
+import threading
+from interface.messagebuffer import MessageBuffer
+
+class SocketConsumer(MessageBuffer):
+    # Same framing as the engine's SocketProducer: a little-endian (topic length, payload length)
+    # header followed by the topic and the payload
+    HEADER = struct.Struct("<HI")
+
+    def __init__(self, socket_path, binary_topics=()):
+        super().__init__(binary_topics=binary_topics)
+        self.socket_path = socket_path
+        self.server = None
+        self.thread = None
+        self.__started = False
+
+    def __del__(self):
+        self.stop()
+
+    def start(self):
+        # Listening before the engine is launched, so its first message already has a reader
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen(1)
+        self.__started = True
+        self.thread = threading.Thread(target=self.__receive_loop, name="socket-consumer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.__started:
+            return
+        self.__started = False
+        # Unblocks the accept of the receiving thread
+        self.server.shutdown(socket.SHUT_RDWR)
+        self.server.close()
+        # An engine that never closed its connection leaves the thread blocked on a read
+        self.thread.join(timeout=1.0)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __receive_loop(self):
+        while self.__started:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            with connection, connection.makefile("rb") as stream:
+                while True:
+                    header = stream.read(SocketConsumer.HEADER.size)
+                    if len(header) < SocketConsumer.HEADER.size:
+                        break
+                    topic_length, payload_length = SocketConsumer.HEADER.unpack(header)
+                    topic = stream.read(topic_length).decode()
+                    self.put(topic, stream.read(payload_length))
@@ -1,18 +1,93 @@
 import argparse
+import json
 import os
-from time import sleep
+import platform
+import psutil
 from datetime import datetime
 from report.table import generate_table, export_table
 
+from interface.inprocessengine import InProcessEngine
 from monitor.performancemetrics import PerformanceMetrics
 from monitor.consumptionmetrics import ConsumptionMetrics
+from monitor.processmetrics import ProcessMetrics
+from monitor.sampler import Sampler
+from monitor.powersources import create_power_source, POWER_SOURCES
 
-def start_benchmarking(images_folder: str, model_path: str, half_cores: bool, language: str):
+SOCKET_PATH = "/tmp/yolo-benchmark.sock"
+
+def sample_resources(timestamp: int) -> None:
+    # System-wide and engine process figures are sampled together, at the same timestamp
+    ConsumptionMetrics.update(timestamp=timestamp)
+    ProcessMetrics.update(timestamp=timestamp)
+
+def start_benchmarking(
+    images_folder: str,
+    model_path: str,
+    half_cores: bool,
+    language: str,
+    batch_size: int = 1,
+    pipelined: bool = False,
+    class_aware_nms: bool = False,
+    io_binding: bool = False,
+    zero_copy: bool = False,
+    workers: int = 1,
+    threads: int = None,
+    inter_op_threads: int = None,
+    execution_mode: str = "sequential",
+    graph_optimization: str = "all",
+    no_spinning: bool = False,
+    cpu_affinity: list = None,
+    no_xnnpack: bool = False,
+    model_cache: bool = True,
+    clear_model_cache: bool = False,
+    warmup: int = 0,
+    prefetch: int = 4,
+    decode_threads: int = 1,
+    tensor_cache: bool = False,
+    clear_tensor_cache: bool = False,
+    video_source: str = None,
+    realtime: bool = False,
+    max_frames: int = None,
+    save_images: bool = False,
+    jpeg_quality: int = 90,
+    image_sampling: int = 1,
+    save_detections: str = None,
+    preview_scale: float = 1.0,
+    backend: str = None,
+    opencv_backend: str = "opencv",
+    opencv_target: str = "cpu",
+    telemetry: str = "binary",
+    telemetry_batch: int = 64,
+    telemetry_interval: float = 250.0,
+    transport: str = "mqtt",
+    sampling_period: float = 100.0,
+    power_source: str = "auto",
+    hwmon_name: str = None,
+    min_current: float = None,
+    max_current: float = None
+):
     '''
     STAGE 1: Benchmark activation
     '''
-    with open("/proc/device-tree/model", "r") as file:
-        board_name = file.read().strip().replace("\x00", "")
+    if os.path.exists("/proc/device-tree/model"):
+        with open("/proc/device-tree/model", "r") as file:
+            board_name = file.read().strip().replace("\x00", "")
+    elif os.path.exists("/sys/class/dmi/id/product_name"):
+        # Boards without a device tree, such as x86 machines, are named by their DMI product name
+        with open("/sys/class/dmi/id/product_name", "r") as file:
+            board_name = file.read().strip()
+    else:
+        board_name = platform.machine()
+    # Power is read from the Pi 5 PMIC, a hwmon monitor or the RAPL counters, or estimated from the
+    # CPU usage with the currents measured externally
+    power_reader = create_power_source(
+        name=power_source,
+        board_name=board_name,
+        hwmon_name=hwmon_name,
+        min_current=min_current,
+        max_current=max_current,
+        half_cores=half_cores
+    )
         
     model_name = model_path.split("/")[-1].replace('.', '_').split("_")
     current_datetime = datetime.now()
@@ -24,7 +99,44 @@ def start_benchmarking(images_folder: str, model_path: str, half_cores: bool, la
         "type": model_name[1],
         "format": model_name[2],
         "cores": "half" if half_cores else "full",
-        "language": language
+        "language": language,
+        "backend": backend if backend is not None else ("litert" if model_path.endswith(".tflite") else "onnxrt"),
+        "batch_size": batch_size,
+        "execution": "pipelined" if pipelined else "sequential",
+        "nms": "class_aware" if class_aware_nms else "agnostic",
+        "io_binding": io_binding,
+        "zero_copy": zero_copy,
+        "workers": workers,
+        "threads": threads if threads is not None else "auto",
+        "inter_op_threads": inter_op_threads if inter_op_threads is not None else "auto",
+        "ort_execution_mode": execution_mode,
+        "graph_optimization": graph_optimization,
+        "spinning": not no_spinning,
+        "cpu_affinity": "-".join(str(core) for core in sorted(set(cpu_affinity))) if cpu_affinity else "all",
+        "xnnpack": not no_xnnpack,
+        "opencv_backend": opencv_backend if backend == "opencvrt" else None,
+        "opencv_target": opencv_target if backend == "opencvrt" else None,
+        "model_cache": model_cache,
+        "warmup": warmup,
+        # The C++ inferencer decodes each image inside its loop
+        "prefetch": prefetch if language == "python" else 0,
+        "decode_threads": decode_threads if language == "python" else 0,
+        "tensor_cache": tensor_cache,
+        "input": video_source if video_source is not None else images_folder,
+        "video_mode": ("realtime" if realtime else "every_frame") if video_source is not None else None,
+        "max_frames": max_frames,
+        "save_images": save_images,
+        "jpeg_quality": jpeg_quality if save_images else None,
+        "image_sampling": image_sampling if save_images else None,
+        "save_detections": save_detections,
+        "preview_scale": preview_scale if language == "python" else 1.0,
+        # The C++ inferencer publishes one JSON message per frame
+        "telemetry": telemetry if language == "python" else "json",
+        "telemetry_batch": telemetry_batch if language == "python" and telemetry == "binary" else None,
+        "telemetry_interval": telemetry_interval if language == "python" and telemetry == "binary" else None,
+        "transport": transport,
+        "sampling_period": sampling_period,
+        "power_source": power_reader.name if power_reader is not None else "none"
     }
     
     print(
@@ -37,32 +149,218 @@ def start_benchmarking(images_folder: str, model_path: str, half_cores: bool, la
         f"         Format: {experiment_specs['format']}\n"
         f"    Inference specs\n"
         f"         Language: {experiment_specs['language']}\n"
-        f"         CPU cores: {experiment_specs['cores']}"
+        f"         Backend: {experiment_specs['backend']}\n"
+        f"         CPU cores: {experiment_specs['cores']}\n"
+        f"         Batch size: {experiment_specs['batch_size']}\n"
+        f"         Execution: {experiment_specs['execution']}\n"
+        f"         NMS: {experiment_specs['nms']}\n"
+        f"         I/O binding: {experiment_specs['io_binding']}\n"
+        f"         Zero-copy: {experiment_specs['zero_copy']}\n"
+        f"         Workers: {experiment_specs['workers']} x {experiment_specs['threads']} threads\n"
+        f"         Warm-up inferences: {experiment_specs['warmup']}\n"
+        f"         Prefetched images: {experiment_specs['prefetch']} ({experiment_specs['decode_threads']} decode threads)\n"
+        f"         Input tensor cache: {experiment_specs['tensor_cache']}\n"
+        f"         Input: {experiment_specs['input']}\n"
+        f"         Video mode: {experiment_specs['video_mode'] or 'n/a'}\n"
+        f"         Saved images: {experiment_specs['save_images']}\n"
+        f"         JPEG quality: {experiment_specs['jpeg_quality'] or 'n/a'}\n"
+        f"         Image sampling: {experiment_specs['image_sampling'] or 'n/a'}\n"
+        f"         Saved detections: {experiment_specs['save_detections'] or 'no'}\n"
+        f"         Preview scale: {experiment_specs['preview_scale']}\n"
+        f"         Telemetry: {experiment_specs['telemetry']}"
+        f" (batch {experiment_specs['telemetry_batch'] or 'n/a'}, interval {experiment_specs['telemetry_interval'] or 'n/a'} ms)\n"
+        f"         Transport: {experiment_specs['transport']}\n"
+        f"         Sampling period: {experiment_specs['sampling_period']} ms\n"
+        f"         Power source: {experiment_specs['power_source']}\n"
+        f"    Runtime specs\n"
+        f"         Inter-op threads: {experiment_specs['inter_op_threads']}\n"
+        f"         ORT execution mode: {experiment_specs['ort_execution_mode']}\n"
+        f"         Graph optimization: {experiment_specs['graph_optimization']}\n"
+        f"         Thread spinning: {experiment_specs['spinning']}\n"
+        f"         CPU affinity: {experiment_specs['cpu_affinity']}\n"
+        f"         XNNPACK: {experiment_specs['xnnpack']}\n"
+        f"         OpenCV backend/target: {experiment_specs['opencv_backend'] or 'n/a'}/{experiment_specs['opencv_target'] or 'n/a'}\n"
+        f"         Optimized model cache: {experiment_specs['model_cache']}"
     )
     
     output_path = f"/home/pi/yolo-benchmark/data/output/{experiment_specs['board'].replace(' ', '_')}/"
     output_path += f"{experiment_specs['architecture']}_{experiment_specs['type']}_"
     output_path += f"{experiment_specs['format']}_{experiment_specs['language']}_"
-    output_path += f"{experiment_specs['cores']}/{experiment_specs['datetime']}"
+    output_path += f"{experiment_specs['cores']}"
+    if backend == "opencvrt":
+        output_path += f"_{experiment_specs['backend']}"
+        if opencv_backend != "opencv" or opencv_target != "cpu":
+            output_path += f"_{experiment_specs['opencv_backend']}-{experiment_specs['opencv_target']}"
+    if batch_size > 1:
+        output_path += f"_batch{experiment_specs['batch_size']}"
+    if pipelined:
+        output_path += f"_{experiment_specs['execution']}"
+    if class_aware_nms:
+        output_path += f"_{experiment_specs['nms']}"
+    if io_binding:
+        output_path += "_iobinding"
+    if zero_copy:
+        output_path += "_zerocopy"
+    if workers > 1 or threads is not None:
+        output_path += f"_workers{experiment_specs['workers']}x{experiment_specs['threads']}"
+    if warmup > 0:
+        output_path += f"_warmup{experiment_specs['warmup']}"
+    if language == "python" and (prefetch != 4 or decode_threads != 1):
+        output_path += f"_prefetch{experiment_specs['prefetch']}x{experiment_specs['decode_threads']}"
+    if tensor_cache:
+        output_path += "_tensorcache"
+    if video_source is not None:
+        output_path += "_realtime" if realtime else "_video"
+    if save_images:
+        output_path += f"_images{experiment_specs['jpeg_quality']}x{experiment_specs['image_sampling']}"
+    if save_detections is not None:
+        output_path += f"_detections{experiment_specs['save_detections']}"
+    if preview_scale != 1.0:
+        output_path += f"_preview{experiment_specs['preview_scale']}"
+    if language == "python" and telemetry != "binary":
+        output_path += f"_telemetry{experiment_specs['telemetry']}"
+    elif language == "python" and (telemetry_batch != 64 or telemetry_interval != 250.0):
+        output_path += f"_telemetry{experiment_specs['telemetry_batch']}x{experiment_specs['telemetry_interval']:g}"
+    if transport != "mqtt":
+        output_path += f"_{experiment_specs['transport']}"
+    if sampling_period != 100.0:
+        output_path += f"_sampling{experiment_specs['sampling_period']:g}"
+    if inter_op_threads is not None:
+        output_path += f"_inter{experiment_specs['inter_op_threads']}"
+    if execution_mode != "sequential":
+        output_path += f"_ort{experiment_specs['ort_execution_mode']}"
+    if graph_optimization != "all":
+        output_path += f"_opt{experiment_specs['graph_optimization']}"
+    if no_spinning:
+        output_path += "_nospin"
+    if cpu_affinity:
+        output_path += f"_cpu{experiment_specs['cpu_affinity']}"
+    if no_xnnpack:
+        output_path += "_noxnnpack"
+    output_path += f"/{experiment_specs['datetime']}"
     os.makedirs(output_path, exist_ok=True)
+    with open(f"{output_path}/specs.json", "w") as file:
+        json.dump(experiment_specs, file, indent=4)
     
-    PerformanceMetrics.init()
-    if board_name == "Raspberry Pi 5 Model B Rev 1.0":
-        ConsumptionMetrics.init(internal_current_sensor=True)
-    else:
-        ConsumptionMetrics.init(internal_current_sensor=False)
+    PerformanceMetrics.init(transport=transport, socket_path=SOCKET_PATH)
+    ConsumptionMetrics.init(power_source=power_reader)
+    # Resources are sampled from their own thread on a fixed period, from before the engine starts
+    sampler = Sampler(sample=sample_resources, period=sampling_period)
+    sampler.start()
     
     '''
     STAGE 2: Inference engine activation
     '''
     inferencer_cmd: str = ""
-    if language == "python":
+    engine: InProcessEngine = None
+    if transport == "inprocess":
+        # The engine runs in a thread of this process and hands its messages over directly
+        engine = InProcessEngine()
+        engine.start(
+            producer=PerformanceMetrics.get_channel(),
+            runtime_options={
+                "intra_op_threads": threads,
+                "cpu_affinity": cpu_affinity,
+                "inter_op_threads": inter_op_threads,
+                "execution_mode": execution_mode,
+                "graph_optimization_level": graph_optimization,
+                "allow_spinning": not no_spinning,
+                "use_xnnpack": not no_xnnpack,
+                "opencv_backend": opencv_backend,
+                "opencv_target": opencv_target
+            },
+            images_folder=images_folder if video_source is None else None,
+            model_path=model_path,
+            half_cores=half_cores,
+            output_folder=f"{output_path}/detections",
+            batch_size=batch_size,
+            pipelined=pipelined,
+            class_aware_nms=class_aware_nms,
+            io_binding=io_binding,
+            zero_copy=zero_copy,
+            workers=workers,
+            model_cache_folder="/home/pi/yolo-benchmark/data/cache/onnx" if model_cache else None,
+            clear_model_cache=clear_model_cache,
+            warmup=warmup,
+            prefetch=prefetch,
+            decode_threads=decode_threads,
+            tensor_cache_folder="/home/pi/yolo-benchmark/data/cache/tensors" if tensor_cache else None,
+            clear_tensor_cache=clear_tensor_cache,
+            video_source=video_source,
+            realtime=realtime,
+            max_frames=max_frames,
+            save_images=save_images,
+            jpeg_quality=jpeg_quality,
+            image_sampling=image_sampling,
+            save_detections=save_detections,
+            preview_scale=preview_scale,
+            backend=backend,
+            telemetry_format=telemetry,
+            telemetry_batch=telemetry_batch,
+            telemetry_interval=telemetry_interval
+        )
+
+    elif language == "python":
         inferencer_cmd = "python3 /home/pi/yolo-benchmark/src/InferenceEngine/python/main.py"
-        inferencer_cmd += f" --images_folder {images_folder}"
+        if video_source is not None:
+            inferencer_cmd += f" --video_source {video_source}"
+            if realtime:
+                inferencer_cmd += " --realtime"
+            if max_frames is not None:
+                inferencer_cmd += f" --max_frames {max_frames}"
+        else:
+            inferencer_cmd += f" --images_folder {images_folder}"
         inferencer_cmd += f" --model_path {model_path}"
+        if backend is not None:
+            inferencer_cmd += f" --backend {backend}"
+            if backend == "opencvrt":
+                inferencer_cmd += f" --opencv_backend {opencv_backend} --opencv_target {opencv_target}"
         if half_cores:
             inferencer_cmd += " --half_cores"
-        inferencer_cmd += f" --output {output_path}/detections"
+        inferencer_cmd += f" --batch_size {batch_size}"
+        if pipelined:
+            inferencer_cmd += " --pipelined"
+        if class_aware_nms:
+            inferencer_cmd += " --class_aware_nms"
+        if io_binding:
+            inferencer_cmd += " --io_binding"
+        if zero_copy:
+            inferencer_cmd += " --zero_copy"
+        inferencer_cmd += f" --workers {workers}"
+        inferencer_cmd += f" --warmup {warmup}"
+        inferencer_cmd += f" --prefetch {prefetch}"
+        inferencer_cmd += f" --decode_threads {decode_threads}"
+        if tensor_cache:
+            inferencer_cmd += " --tensor_cache_folder /home/pi/yolo-benchmark/data/cache/tensors"
+            if clear_tensor_cache:
+                inferencer_cmd += " --clear_tensor_cache"
+        if threads is not None:
+            inferencer_cmd += f" --threads {threads}"
+        if inter_op_threads is not None:
+            inferencer_cmd += f" --inter_op_threads {inter_op_threads}"
+        inferencer_cmd += f" --execution_mode {execution_mode}"
+        inferencer_cmd += f" --graph_optimization {graph_optimization}"
+        if no_spinning:
+            inferencer_cmd += " --no_spinning"
+        if cpu_affinity:
+            inferencer_cmd += " --cpu_affinity " + " ".join(str(core) for core in cpu_affinity)
+        if no_xnnpack:
+            inferencer_cmd += " --no_xnnpack"
+        if model_cache:
+            inferencer_cmd += " --model_cache_folder /home/pi/yolo-benchmark/data/cache/onnx"
+            if clear_model_cache:
+                inferencer_cmd += " --clear_model_cache"
+        if save_images:
+            inferencer_cmd += f" --save_images --jpeg_quality {jpeg_quality} --image_sampling {image_sampling}"
+        if save_detections is not None:
+            inferencer_cmd += f" --save_detections {save_detections}"
+        if preview_scale != 1.0:
+            inferencer_cmd += f" --preview_scale {preview_scale}"
+        inferencer_cmd += f" --telemetry {telemetry}"
+        inferencer_cmd += f" --telemetry_batch {telemetry_batch} --telemetry_interval {telemetry_interval}"
+        if transport == "socket":
+            inferencer_cmd += f" --transport socket --socket_path {SOCKET_PATH}"
+        inferencer_cmd += f" --output_folder {output_path}/detections"
 
     elif language == "cpp":
         inferencer_cmd = "cd /home/pi/yolo-benchmark/src/InferenceEngine/cpp/ && sudo ./yolo_benchmark"
@@ -73,36 +371,102 @@ def start_benchmarking(images_folder: str, model_path: str, half_cores: bool, la
             inferencer_cmd += " full"
         inferencer_cmd += f" {output_path}/detections"
     
-    os.system(f"{inferencer_cmd} &")
+    if engine is None:
+        os.system(f"{inferencer_cmd} &")
     
     '''
     STAGE 3: Benchmark monitoring
     '''
-    while True:
-        ConsumptionMetrics.update()
-        PerformanceMetrics.update()
-        sleep(0.1)
-        if not PerformanceMetrics.is_active() and PerformanceMetrics.get_measures() is not None:
-            break
+    # Engine messages are taken as soon as they arrive; the loop ends once the final status and every
+    # record before it are in
+    engine_tracked = False
+    while not PerformanceMetrics.is_complete():
+        PerformanceMetrics.update(timeout=0.1)
+        # The engine process is tracked from its start status, which carries its PID
+        if not engine_tracked and PerformanceMetrics.get_engine_pid() is not None:
+            engine_tracked = True
+            try:
+                ProcessMetrics.attach(pid=PerformanceMetrics.get_engine_pid())
+            except (psutil.NoSuchProcess, FileNotFoundError):
+                print("[INF. BENCHMARK] The inference engine exited before its process could be tracked")
+        # An in-process engine that failed never sends its final status
+        if engine is not None and not engine.is_alive():
+            engine.join()
+    if engine is not None:
+        engine.join()
+    PerformanceMetrics.stop()
+    sampler.stop()
+    ProcessMetrics.stop()
     
-    if board_name != "Raspberry Pi 5 Model B Rev 1.0":
-        min_current_consumption = int(input(f"[INF. BENCHMARK] Enter with the minimum current consumption in mA: "))
-        max_current_consumption = int(input(f"[INF. BENCHMARK] Enter with the maximum current consumption in mA: "))
-        ConsumptionMetrics.compute_current_levels(min_current=min_current_consumption, max_current=max_current_consumption, half_cores=half_cores)
+    delivery = PerformanceMetrics.get_delivery()
+    if delivery is not None and delivery[2] > 0:
+        print(f"[INF. BENCHMARK] {delivery[2]} of {delivery[0]} engine records were not received")
+    if PerformanceMetrics.get_measures() is None:
+        print("[INF. BENCHMARK] No measures received from the inference engine")
+        return
     
     '''
     STAGE 4: Report generation
     '''
     print("[INF. BENCHMARK] Generating the report")
     pre_processing_times, inference_times, post_processing_times = PerformanceMetrics.get_measures()
-    cpu_usage_levels, cpu_temperature_levels, ram_usage_levels, current_usage_levels = ConsumptionMetrics.get_measures()
-    performance_table = generate_table(
-        fields_names=["Sample", "Preprocessing time (ms)", "Inference time (ms)", "Post processing time (ms)"],
-        rows=zip(pre_processing_times, inference_times, post_processing_times),
-    )
+    cpu_usage_levels, cpu_temperature_levels, ram_usage_levels, current_usage_levels, power_levels = ConsumptionMetrics.get_measures()
+    ConsumptionMetrics.stop()
+    power_columns = list()
+    power_fields = list()
+    if power_levels:
+        power_columns = [current_usage_levels, power_levels]
+        power_fields = ["Current consumption (mA)", "Power (W)"]
+    # Each resource sample covers the time since the previous one; frames are joined to the sample
+    # window they were reported in, as both sides are stamped with the monotonic clock
+    sample_timestamps = ConsumptionMetrics.get_timestamps()
+    sample_times = [(timestamp - sampler.start_ts) / 1e6 for timestamp in sample_timestamps]
+    frame_timestamps = PerformanceMetrics.get_timestamps()
+    frame_columns = list()
+    frame_fields = list()
+    window_columns = list()
+    window_fields = list()
+    if frame_timestamps is not None:
+        frame_windows = Sampler.get_windows(sample_timestamps=sample_timestamps, frame_timestamps=frame_timestamps)
+        window_inference_times = [list() for _ in sample_timestamps]
+        for inference_time, window in zip(inference_times, frame_windows):
+            if window is not None:
+                window_inference_times[window].append(inference_time)
+        frame_columns = [
+            [(timestamp - sampler.start_ts) / 1e6 for timestamp in frame_timestamps],
+            [window + 1 if window is not None else "" for window in frame_windows]
+        ]
+        frame_fields = ["Timestamp (ms)", "Sample window"]
+        window_columns = [
+            [len(times) for times in window_inference_times],
+            [sum(times) / len(times) if times else "" for times in window_inference_times]
+        ]
+        window_fields = ["Frames", "Mean inference time (ms)"]
+
+    stage_measures = PerformanceMetrics.get_stage_measures()
+    if stage_measures is not None:
+        decode_times, draw_times, publish_times, latencies = stage_measures
+        performance_table = generate_table(
+            fields_names=[
+                "Sample", "Decode time (ms)", "Preprocessing time (ms)", "Inference time (ms)",
+                "Post processing time (ms)", "Draw time (ms)", "Publish time (ms)", "Latency (ms)"
+            ] + frame_fields,
+            rows=zip(
+                decode_times, pre_processing_times, inference_times, post_processing_times,
+                draw_times, publish_times, latencies, *frame_columns
+            ),
+        )
+    else:
+        performance_table = generate_table(
+            fields_names=["Sample", "Preprocessing time (ms)", "Inference time (ms)", "Post processing time (ms)"] + frame_fields,
+            rows=zip(pre_processing_times, inference_times, post_processing_times, *frame_columns),
+        )
     consumption_table = generate_table(
-        fields_names=["Sample", "CPU usage (%)", "CPU temperature (°C)", "RAM usage (MB)" , "Current consumption (mA)"],
-        rows=zip(cpu_usage_levels, cpu_temperature_levels, ram_usage_levels, current_usage_levels),
+        fields_names=["Sample", "CPU usage (%)", "CPU temperature (°C)", "RAM usage (MB)"] + power_fields + ["Timestamp (ms)"] + window_fields,
+        rows=zip(
+            cpu_usage_levels, cpu_temperature_levels, ram_usage_levels, *power_columns, sample_times,
+            *window_columns
+        ),
     )
     print("\n######################## PERFORMANCE METRICS ########################")
     print(performance_table)
@@ -116,6 +480,189 @@ def start_benchmarking(images_folder: str, model_path: str, half_cores: bool, la
         table=consumption_table, 
         file_path=f"{output_path}/consumption.csv"
     )
+    warmup_measures = PerformanceMetrics.get_warmup_measures()
+    if warmup_measures is not None:
+        warmup_table = generate_table(
+            fields_names=["Sample", "Preprocessing time (ms)", "Inference time (ms)", "Post processing time (ms)"],
+            rows=zip(*warmup_measures),
+        )
+        print("\n########################  WARM-UP METRICS  ########################")
+        print(warmup_table)
+        export_table(
+            table=warmup_table, 
+            file_path=f"{output_path}/warmup.csv"
+        )
+    throughput = PerformanceMetrics.get_throughput()
+    if throughput is not None:
+        throughput_table = generate_table(
+            fields_names=["Processed images", "Elapsed time (ms)", "Throughput (images/s)"],
+            rows=[throughput],
+        )
+        print("\n########################  THROUGHPUT METRICS  ########################")
+        print(throughput_table)
+        export_table(
+            table=throughput_table, 
+            file_path=f"{output_path}/throughput.csv"
+        )
+    stream = PerformanceMetrics.get_stream()
+    if stream is not None:
+        stream_table = generate_table(
+            fields_names=[
+                "Captured frames", "Processed frames", "Dropped frames", "Drop rate (%)",
+                "Achieved FPS", "Mean latency (ms)", "P95 latency (ms)"
+            ],
+            rows=[stream],
+        )
+        print("\n########################  STREAM METRICS  ########################")
+        print(stream_table)
+        export_table(
+            table=stream_table, 
+            file_path=f"{output_path}/stream.csv"
+        )
+    output = PerformanceMetrics.get_output()
+    if output is not None:
+        output_table = generate_table(
+            fields_names=[
+                "Written images", "Written records", "Dropped writes", "Max queue depth", "Mean queue depth"
+            ],
+            rows=[output],
+        )
+        print("\n########################  OUTPUT METRICS  ########################")
+        print(output_table)
+        export_table(
+            table=output_table, 
+            file_path=f"{output_path}/output.csv"
+        )
+    telemetry_stats = PerformanceMetrics.get_telemetry()
+    if telemetry_stats is not None:
+        telemetry_table = generate_table(
+            fields_names=[
+                "Format", "Records", "Batches", "Bytes", "Mean batch publish time (ms)",
+                "Max batch publish time (ms)", "Mean record time (ms)"
+            ],
+            rows=[telemetry_stats],
+        )
+        print("\n########################  TELEMETRY METRICS  ########################")
+        print(telemetry_table)
+        export_table(
+            table=telemetry_table, 
+            file_path=f"{output_path}/telemetry.csv"
+        )
+    if delivery is not None:
+        delivery_table = generate_table(
+            fields_names=[
+                "Expected records", "Received records", "Missing records", "Sequence gaps", "Duplicate records"
+            ],
+            rows=[delivery],
+        )
+        print("\n########################  DELIVERY METRICS  ########################")
+        print(delivery_table)
+        export_table(
+            table=delivery_table, 
+            file_path=f"{output_path}/delivery.csv"
+        )
+    sampling_table = generate_table(
+        fields_names=["Period (ms)", "Samples", "Overruns", "Mean jitter (ms)", "Max jitter (ms)"],
+        rows=[sampler.get_stats()],
+    )
+    print("\n########################  SAMPLING METRICS  ########################")
+    print(sampling_table)
+    export_table(
+        table=sampling_table, 
+        file_path=f"{output_path}/sampling.csv"
+    )
+    process_measures = ProcessMetrics.get_measures()
+    if process_measures is not None:
+        (
+            process_timestamps, engine_cpu_usage_levels, rss_levels, uss_levels, peak_rss_levels, thread_counts,
+            voluntary_switches, involuntary_switches, minor_faults, major_faults
+        ) = process_measures
+        # Engine samples are taken with the system-wide ones, so they share their timestamps
+        sample_indexes = {timestamp: index for index, timestamp in enumerate(sample_timestamps)}
+        process_indexes = [sample_indexes[timestamp] for timestamp in process_timestamps]
+        process_table = generate_table(
+            fields_names=[
+                "Sample", "Timestamp (ms)", "CPU usage (%)", "Engine CPU usage (%)", "RAM usage (MB)", "Engine RSS (MB)",
+                "Engine USS (MB)", "Engine peak RSS (MB)", "Engine threads", "Voluntary context switches",
+                "Involuntary context switches", "Minor page faults", "Major page faults"
+            ],
+            rows=zip(
+                [index + 1 for index in process_indexes],
+                [sample_times[index] for index in process_indexes],
+                [cpu_usage_levels[index] for index in process_indexes],
+                engine_cpu_usage_levels,
+                [ram_usage_levels[index] for index in process_indexes],
+                rss_levels,
+                [uss if uss is not None else "" for uss in uss_levels],
+                peak_rss_levels,
+                thread_counts,
+                voluntary_switches,
+                involuntary_switches,
+                minor_faults,
+                major_faults
+            ),
+        )
+        print("\n########################  PROCESS METRICS  ########################")
+        print(process_table)
+        export_table(
+            table=process_table, 
+            file_path=f"{output_path}/process.csv"
+        )
+        threads_table = generate_table(
+            fields_names=["PID", "TID", "Name", "CPU time (s)", "CPU usage (% of a core)", "Cores"],
+            rows=ProcessMetrics.get_threads(),
+        )
+        print("\n########################  THREAD METRICS  ########################")
+        print(threads_table)
+        export_table(
+            table=threads_table, 
+            file_path=f"{output_path}/threads.csv"
+        )
+        # How busy each core was, and how often engine threads ran on it, tells whether the engine
+        # stays on the cores it was given and how many threads compete for them
+        core_activity = ProcessMetrics.get_core_activity()
+        total_activity = sum(core_activity.values())
+        cores_table = generate_table(
+            fields_names=["Core", "CPU usage (%)", "Engine thread activity (%)"],
+            rows=[
+                (core, core_usage, core_activity.get(core, 0) / total_activity * 100 if total_activity else 0.0)
+                for core, core_usage in enumerate(ConsumptionMetrics.get_core_usage())
+            ],
+        )
+        print("\n########################  CORE METRICS  ########################")
+        print(cores_table)
+        export_table(
+            table=cores_table, 
+            file_path=f"{output_path}/cores.csv"
+        )
+    energy = ConsumptionMetrics.get_energy()
+    if energy is not None:
+        source_name, mean_power, total_energy = energy
+        processed_images = len(pre_processing_times)
+        energy_table = generate_table(
+            fields_names=["Power source", "Mean power (W)", "Energy (J)", "Energy per image (mJ)"],
+            rows=[(source_name, mean_power, total_energy, total_energy / processed_images * 1000)],
+        )
+        print("\n########################  ENERGY METRICS  ########################")
+        print(energy_table)
+        export_table(
+            table=energy_table, 
+            file_path=f"{output_path}/energy.csv"
+        )
+    startup = PerformanceMetrics.get_startup()
+    if startup is not None:
+        startup_table = generate_table(
+            fields_names=[
+                "Backend import time (ms)", "Model load time (ms)", "First inference time (ms)", "Optimized model cache"
+            ],
+            rows=[startup],
+        )
+        print("\n########################  STARTUP METRICS  ########################")
+        print(startup_table)
+        export_table(
+            table=startup_table, 
+            file_path=f"{output_path}/startup.csv"
+        )
     print(f"[INF. BENCHMARK] Experiment {experiment_specs['datetime']} finished")
 
 if __name__ == "__main__":
@@ -123,9 +670,15 @@ if __name__ == "__main__":
     parser.add_argument(
         "--images_folder",
         type=str,
-        required=True,
+        default=None,
         help="Path to the folder containing images."
     )
+    parser.add_argument(
+        "--video_source",
+        type=str,
+        default=None,
+        help="Video file, stream URL, device path or camera index read instead of an images folder (Python inferencer only)."
+    )
     parser.add_argument(
         "--model_path",
         type=str,
@@ -143,12 +696,398 @@ if __name__ == "__main__":
         required=True,
         help="Python or C++ inferencer."
     )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=1,
+        help="Number of images processed by each forward pass (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Run the inference loop stages concurrently (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--class_aware_nms",
+        action="store_true",
+        help="Apply Non-Maximum Suppression per class (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--io_binding",
+        action="store_true",
+        help="Run ONNX models through an I/O binding with reused buffers (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--zero_copy",
+        action="store_true",
+        help="Run LiteRT models through views of the interpreter tensors (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of inference worker processes (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Number of inference threads per worker (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--inter_op_threads",
+        type=int,
+        default=None,
+        help="Number of ONNX Runtime inter-op threads (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--execution_mode",
+        type=str,
+        choices=["sequential", "parallel"],
+        default="sequential",
+        help="ONNX Runtime execution mode (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--graph_optimization",
+        type=str,
+        choices=["disable", "basic", "extended", "all"],
+        default="all",
+        help="ONNX Runtime graph optimization level (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--no_spinning",
+        action="store_true",
+        help="Disable the busy-waiting of idle ONNX Runtime threads (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--cpu_affinity",
+        type=int,
+        nargs="+",
+        default=None,
+        help="CPU cores the inference engine is pinned to, e.g. 2 3 (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--no_xnnpack",
+        action="store_true",
+        help="Run LiteRT models without the XNNPACK delegate (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=("onnxrt", "opencvrt"),
+        default=None,
+        help="Inference backend of ONNX models: ONNX Runtime (default) or the OpenCV DNN module (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--opencv_backend",
+        type=str,
+        choices=("default", "opencv", "openvino", "cuda", "vulkan"),
+        default="opencv",
+        help="OpenCV DNN computation backend."
+    )
+
+    parser.add_argument(
+        "--opencv_target",
+        type=str,
+        choices=("cpu", "opencl", "opencl_fp16", "cuda", "cuda_fp16", "vulkan"),
+        default="cpu",
+        help="OpenCV DNN target device."
+    )
+
+    parser.add_argument(
+        "--no_model_cache",
+        action="store_true",
+        help="Optimize ONNX models on every run instead of reusing the cached optimized graph (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--clear_model_cache",
+        action="store_true",
+        help="Remove the cached optimized ONNX models before the run (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        help="Number of warm-up inferences reported apart from the measured ones (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=4,
+        help="Number of images decoded ahead of the inference loop (Python inferencer only, 0 decodes inline)."
+    )
+
+    parser.add_argument(
+        "--decode_threads",
+        type=int,
+        default=1,
+        help="Number of threads decoding the prefetched images (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--tensor_cache",
+        action="store_true",
+        help="Read cached preprocessed input tensors instead of decoding the images (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--clear_tensor_cache",
+        action="store_true",
+        help="Remove the cached input tensors before the run (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Process only the latest frame of the video source, dropping the frames the engine cannot keep up with."
+    )
+
+    parser.add_argument(
+        "--max_frames",
+        type=int,
+        default=None,
+        help="Maximum number of video frames processed (needed to stop live streams)."
+    )
+
+    parser.add_argument(
+        "--save_images",
+        action="store_true",
+        help="Save the annotated images from a background writer (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--jpeg_quality",
+        type=int,
+        default=90,
+        help="JPEG quality (0-100) of the saved images."
+    )
+
+    parser.add_argument(
+        "--image_sampling",
+        type=int,
+        default=1,
+        help="Save one annotated image every N frames."
+    )
+
+    parser.add_argument(
+        "--save_detections",
+        type=str,
+        choices=("jsonl", "binary"),
+        default=None,
+        help="Save the detections of each frame as JSON lines or binary records (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--preview_scale",
+        type=float,
+        default=1.0,
+        help="Draw the detections onto a copy of each image downscaled by this factor (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--telemetry",
+        type=str,
+        choices=("binary", "json"),
+        default="binary",
+        help="Per-frame timings as batches of binary records or one JSON message per frame (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--telemetry_batch",
+        type=int,
+        default=64,
+        help="Number of binary telemetry records published together."
+    )
+
+    parser.add_argument(
+        "--telemetry_interval",
+        type=float,
+        default=250.0,
+        help="Maximum time in milliseconds a binary telemetry record waits before being published."
+    )
+
+    parser.add_argument(
+        "--transport",
+        type=str,
+        choices=("mqtt", "socket", "inprocess"),
+        default="mqtt",
+        help="How engine messages reach the benchmark: MQTT broker, Unix socket, or an engine run in the benchmark process (Python inferencer only)."
+    )
+
+    parser.add_argument(
+        "--sampling_period",
+        type=float,
+        default=100.0,
+        help="Period in milliseconds of the resource usage samples."
+    )
+
+    parser.add_argument(
+        "--power_source",
+        type=str,
+        choices=POWER_SOURCES,
+        default="auto",
+        help="Power reader: Pi 5 PMIC, hwmon monitor, RAPL counters, linear CPU usage model, none, or auto-detected."
+    )
+
+    parser.add_argument(
+        "--hwmon_name",
+        type=str,
+        default=None,
+        help="Name of the hwmon power monitor, e.g. ina219 (default: the first one found)."
+    )
+
+    parser.add_argument(
+        "--min_current",
+        type=float,
+        default=None,
+        help="Current consumption in mA at idle, for the linear power model."
+    )
+
+    parser.add_argument(
+        "--max_current",
+        type=float,
+        default=None,
+        help="Current consumption in mA at full CPU load, for the linear power model."
+    )
 
     args = parser.parse_args()
+    if (args.images_folder is None) == (args.video_source is None):
+        parser.error("Exactly one of --images_folder and --video_source is required.")
+    if args.video_source is not None and (args.language != "python" or args.tensor_cache):
+        parser.error("--video_source is only supported by the Python inferencer, without --tensor_cache.")
+    if (args.realtime or args.max_frames is not None) and args.video_source is None:
+        parser.error("--realtime and --max_frames only apply to --video_source.")
+    if args.realtime and args.batch_size > 1:
+        parser.error("--realtime does not support --batch_size greater than 1.")
+    if args.batch_size > 1 and args.language != "python":
+        parser.error("--batch_size is only supported by the Python inferencer.")
+    if args.pipelined and args.language != "python":
+        parser.error("--pipelined is only supported by the Python inferencer.")
+    if args.pipelined and args.batch_size > 1:
+        parser.error("--pipelined does not support --batch_size greater than 1.")
+    if args.class_aware_nms and args.language != "python":
+        parser.error("--class_aware_nms is only supported by the Python inferencer.")
+    if args.io_binding and (args.language != "python" or not args.model_path.endswith(".onnx")):
+        parser.error("--io_binding is only supported by the Python inferencer with ONNX models.")
+    if args.zero_copy and (args.language != "python" or not args.model_path.endswith(".tflite")):
+        parser.error("--zero_copy is only supported by the Python inferencer with LiteRT models.")
+    if args.zero_copy and args.pipelined:
+        parser.error("--zero_copy does not support --pipelined.")
+    if (args.workers > 1 or args.threads is not None) and args.language != "python":
+        parser.error("--workers and --threads are only supported by the Python inferencer.")
+    if args.workers > 1 and (args.pipelined or args.batch_size > 1):
+        parser.error("--workers greater than 1 does not support --pipelined or --batch_size greater than 1.")
+    runtime_options = (
+        args.inter_op_threads is not None or args.execution_mode != "sequential"
+        or args.graph_optimization != "all" or args.no_spinning or args.cpu_affinity or args.no_xnnpack
+    )
+    if args.warmup > 0 and args.language != "python":
+        parser.error("--warmup is only supported by the Python inferencer.")
+    if (args.prefetch != 4 or args.decode_threads != 1) and args.language != "python":
+        parser.error("--prefetch and --decode_threads are only supported by the Python inferencer.")
+    if args.tensor_cache and args.language != "python":
+        parser.error("--tensor_cache is only supported by the Python inferencer.")
+    if args.tensor_cache and (args.pipelined or args.workers > 1 or args.zero_copy):
+        parser.error("--tensor_cache does not support --pipelined, --workers greater than 1 or --zero_copy.")
+    if (args.save_images or args.save_detections is not None) and args.language != "python":
+        parser.error("--save_images and --save_detections are only supported by the Python inferencer.")
+    if args.telemetry != "binary" and args.language != "python":
+        parser.error("--telemetry is only supported by the Python inferencer.")
+    if args.preview_scale != 1.0 and args.language != "python":
+        parser.error("--preview_scale is only supported by the Python inferencer.")
+    if not 0 < args.preview_scale <= 1:
+        parser.error("--preview_scale must be in (0, 1].")
+    if args.backend is not None and (args.language != "python" or not args.model_path.endswith(".onnx")):
+        parser.error("--backend is only supported by the Python inferencer with ONNX models.")
+    onnxrt_options = (
+        args.io_binding or args.inter_op_threads is not None or args.execution_mode != "sequential"
+        or args.graph_optimization != "all" or args.no_spinning
+    )
+    if args.backend == "opencvrt" and onnxrt_options:
+        parser.error("ONNX Runtime options do not apply to --backend opencvrt.")
+    if (args.opencv_backend != "opencv" or args.opencv_target != "cpu") and args.backend != "opencvrt":
+        parser.error("--opencv_backend and --opencv_target only apply to --backend opencvrt.")
+    if runtime_options and args.language != "python":
+        parser.error("Runtime tuning options are only supported by the Python inferencer.")
+    # The engine rejects these for other model formats, and would exit before the benchmark hears from it
+    onnx_session_options = (
+        args.inter_op_threads is not None or args.execution_mode != "sequential"
+        or args.graph_optimization != "all" or args.no_spinning
+    )
+    if onnx_session_options and not args.model_path.endswith(".onnx"):
+        parser.error("--inter_op_threads, --execution_mode, --graph_optimization and --no_spinning only apply to ONNX models.")
+    if args.no_xnnpack and not args.model_path.endswith(".tflite"):
+        parser.error("--no_xnnpack only applies to LiteRT models.")
+    if args.sampling_period <= 0:
+        parser.error("--sampling_period must be greater than 0.")
+    if args.power_source == "linear" and (args.min_current is None or args.max_current is None):
+        parser.error("--power_source linear needs --min_current and --max_current.")
+    if args.transport != "mqtt" and args.language != "python":
+        parser.error("--transport is only supported by the Python inferencer.")
 
     start_benchmarking(
         images_folder=args.images_folder, 
         model_path=args.model_path, 
         half_cores=args.half_cores,
-        language=args.language
+        language=args.language,
+        batch_size=args.batch_size,
+        pipelined=args.pipelined,
+        class_aware_nms=args.class_aware_nms,
+        io_binding=args.io_binding,
+        zero_copy=args.zero_copy,
+        workers=args.workers,
+        threads=args.threads,
+        inter_op_threads=args.inter_op_threads,
+        execution_mode=args.execution_mode,
+        graph_optimization=args.graph_optimization,
+        no_spinning=args.no_spinning,
+        cpu_affinity=args.cpu_affinity,
+        no_xnnpack=args.no_xnnpack,
+        model_cache=(
+            not args.no_model_cache and args.language == "python" and args.model_path.endswith(".onnx")
+            and args.backend != "opencvrt"
+        ),
+        clear_model_cache=args.clear_model_cache,
+        warmup=args.warmup,
+        prefetch=args.prefetch,
+        decode_threads=args.decode_threads,
+        tensor_cache=args.tensor_cache,
+        clear_tensor_cache=args.clear_tensor_cache,
+        video_source=args.video_source,
+        realtime=args.realtime,
+        max_frames=args.max_frames,
+        save_images=args.save_images,
+        jpeg_quality=args.jpeg_quality,
+        image_sampling=args.image_sampling,
+        save_detections=args.save_detections,
+        preview_scale=args.preview_scale,
+        backend=args.backend,
+        opencv_backend=args.opencv_backend,
+        opencv_target=args.opencv_target,
+        telemetry=args.telemetry,
+        telemetry_batch=args.telemetry_batch,
+        telemetry_interval=args.telemetry_interval,
+        transport=args.transport,
+        sampling_period=args.sampling_period,
+        power_source=args.power_source,
+        hwmon_name=args.hwmon_name,
+        min_current=args.min_current,
+        max_current=args.max_current
     )
\ No newline at end of file
@@ -1,47 +1,57 @@
+import os
 import psutil
-import subprocess
+import time
+from monitor.powersources import SUPPLY_VOLTAGE
 
 class ConsumptionMetrics:
-    __internal_current_sensor: bool
+    __power_source = None
+    __temperature_fd: int = None
 
     __cpu_usage_levels: list = list()
+    __core_usage_levels: list = list()
     __cpu_temperature_levels: list = list()
     __ram_usage_levels: list = list()
     __current_usage_levels: list = list()
+    __power_levels: list = list()
+    __timestamps: list = list()
 
     @staticmethod
-    def init(internal_current_sensor: bool) -> None:
-        ConsumptionMetrics.__internal_current_sensor = internal_current_sensor
+    def init(power_source=None, sysfs_root: str = "/sys") -> None:
+        # The power source is one of the readers of monitor.powersources, or None to skip power
+        ConsumptionMetrics.__power_source = power_source
+        temperature_path = os.path.join(sysfs_root, "class", "thermal", "thermal_zone0", "temp")
+        if os.path.exists(temperature_path):
+            ConsumptionMetrics.__temperature_fd = os.open(temperature_path, os.O_RDONLY)
 
     @staticmethod
-    def update() -> None:
-        with open("/sys/class/thermal/thermal_zone0/temp", "r") as file:
+    def stop() -> None:
+        if ConsumptionMetrics.__power_source is not None:
+            ConsumptionMetrics.__power_source.close()
+        if ConsumptionMetrics.__temperature_fd is not None:
+            os.close(ConsumptionMetrics.__temperature_fd)
+            ConsumptionMetrics.__temperature_fd = None
+
+    @staticmethod
+    def update(timestamp: int = None) -> None:
+        # Samples carry the monotonic_ns time they were taken at, the clock of the engine frame timestamps
+        ConsumptionMetrics.__timestamps.append(time.monotonic_ns() if timestamp is None else timestamp)
+        if ConsumptionMetrics.__temperature_fd is not None:
             ConsumptionMetrics.__cpu_temperature_levels.append(
-                float(file.read()) / 1000.0
+                float(os.pread(ConsumptionMetrics.__temperature_fd, 16, 0)) / 1000.0
             )
-        ConsumptionMetrics.__cpu_usage_levels.append(psutil.cpu_percent())
+        else:
+            ConsumptionMetrics.__cpu_temperature_levels.append(None)
+        cpu_usage = psutil.cpu_percent()
+        ConsumptionMetrics.__cpu_usage_levels.append(cpu_usage)
+        ConsumptionMetrics.__core_usage_levels.append(psutil.cpu_percent(percpu=True))
         ConsumptionMetrics.__ram_usage_levels.append(
             psutil.virtual_memory().used / (1024 * 1024)
         )
 
-        if ConsumptionMetrics.__internal_current_sensor:
-            ConsumptionMetrics.__current_usage_levels.append(
-                ConsumptionMetrics.__get_current_consumption()
-            )
-
-    @staticmethod
-    def compute_current_levels(
-        min_current: int, max_current: int, half_cores: bool
-    ) -> None:
-        if not half_cores:
-            cpu_max = 100
-        else:
-            cpu_max = 50
-
-        ConsumptionMetrics.__current_usage_levels = [
-            min_current + (max_current - min_current) * (cpu_usage / cpu_max)
-            for cpu_usage in ConsumptionMetrics.__cpu_usage_levels
-        ]
+        if ConsumptionMetrics.__power_source is not None:
+            power = ConsumptionMetrics.__power_source.read(cpu_usage=cpu_usage)
+            ConsumptionMetrics.__power_levels.append(power)
+            ConsumptionMetrics.__current_usage_levels.append(power / SUPPLY_VOLTAGE * 1000)
 
     @staticmethod
     def get_measures() -> list:
@@ -51,40 +61,36 @@ class ConsumptionMetrics:
                 ConsumptionMetrics.__cpu_temperature_levels,
                 ConsumptionMetrics.__ram_usage_levels,
                 ConsumptionMetrics.__current_usage_levels,
+                ConsumptionMetrics.__power_levels,
             )
         else:
             return None
-        
-    @staticmethod
-    def __get_current_consumption() -> float:
-        cmd_result = subprocess.run(["vcgencmd", "pmic_read_adc"], capture_output=True, text=True)
-        measures_str = cmd_result.stdout.strip()
-        measures_str = measures_str.replace(" ", "")
-        measures_list = measures_str.split("\n")
 
-        rails_currents = dict()
-        rails_voltages = dict()
-        for measure in measures_list:
-            measure_type, measure_value = measure.split("=")
-            measure_type = "_".join(measure_type.split("_")[:-1])
-            
-            if "A" in measure_value:
-                measure_value = float(measure_value.replace("A", ""))
-                rails_currents[measure_type] = measure_value
-
-            elif "V" in measure_value:
-                measure_value = float(measure_value.replace("V", ""))
-                rails_voltages[measure_type] = measure_value
-
-        total_5v_current = 0
-        for rail_name, rail_current in rails_currents.items():
-            rail_power = rail_current * rails_voltages[rail_name]
+    @staticmethod
+    def get_energy() -> list:
+        # Each sample holds the power over the time since the previous one (for RAPL, exactly the
+        # energy counted in between), so the energy is their sum weighted by the sample intervals
+        if not ConsumptionMetrics.__power_levels:
+            return None
+        timestamps = ConsumptionMetrics.__timestamps
+        energy = sum(
+            power * (timestamp - previous_timestamp) / 1e9
+            for power, timestamp, previous_timestamp in zip(
+                ConsumptionMetrics.__power_levels[1:], timestamps[1:], timestamps[:-1]
+            )
+        )
+        elapsed_time = (timestamps[-1] - timestamps[0]) / 1e9
+        mean_power = energy / elapsed_time if elapsed_time > 0 else ConsumptionMetrics.__power_levels[0]
+        return ConsumptionMetrics.__power_source.name, mean_power, energy
 
-            if rail_power > 0:
-                rail_5v_current = (rail_power / 5.0)
-            else:
-                rail_5v_current = 0
+    @staticmethod
+    def get_core_usage() -> list:
+        # Mean usage of each core over the run, in %
+        core_usage_levels = ConsumptionMetrics.__core_usage_levels
+        if not core_usage_levels:
+            return None
+        return [sum(levels) / len(levels) for levels in zip(*core_usage_levels)]
 
-            total_5v_current += rail_5v_current
-        
-        return (total_5v_current * 1000)
+    @staticmethod
+    def get_timestamps() -> list:
+        return ConsumptionMetrics.__timestamps
@@ -1,40 +1,237 @@
+from interface.messagebuffer import MessageBuffer
+from interface.localchannel import LocalChannel
 from interface.mqttconsumer import MQTTConsumer
+from interface.socketconsumer import SocketConsumer
 import json
+import math
+import time
+import struct
 
 class PerformanceMetrics:
     __is_active: bool = False
-    __mqtt_consumer: MQTTConsumer = None
+    __consumer: MessageBuffer = None
 
+    __decode_times: list = list()
     __pre_process_times: list = list()
     __inference_times: list = list()
     __post_process_times: list = list()
+    __draw_times: list = list()
+    __publish_times: list = list()
+    __latencies: list = list()
+    __timestamps: list = list()
+
+    __warmup_pre_process_times: list = list()
+    __warmup_inference_times: list = list()
+    __warmup_post_process_times: list = list()
+
+    __engine_pid: int = None
+    __processed_images: int = None
+    __captured_frames: int = None
+    __output: tuple = None
+    __dropped_frames: int = None
+    __elapsed_time: float = None
+
+    __import_time: float = None
+    __load_time: float = None
+    __first_inference_time: float = None
+    __model_cache: str = None
+
+    __telemetry_record: struct.Struct = None
+    __telemetry_fields: list = None
+    __telemetry_warmup_flag: int = None
+    __pending_batches: list = list()
+    __telemetry: tuple = None
+
+    __received_records: int = 0
+    __received_seqs: set = set()
+    __duplicate_records: int = 0
+    __expected_records: int = None
+    __final_status_ts: float = None
     
     @staticmethod
-    def init() -> None:
-        PerformanceMetrics.__mqtt_consumer = MQTTConsumer(
-            server={
-                "address": "localhost",
-                "port": 1883
-            },
-            client_id="benchmark",
-            topics=[
-                "inferenceEngine/status",
-                "inferenceEngine/data"
-            ]
-        )
-        PerformanceMetrics.__mqtt_consumer.start()
-
-    @staticmethod
-    def update() -> None:
-        topic, msg = PerformanceMetrics.__mqtt_consumer.consume()
-            
+    def init(transport: str = "mqtt", socket_path: str = None) -> None:
+        # Engine messages come through the MQTT broker, a Unix socket the engine connects to, or an
+        # in-process channel the engine is handed as its producer (see get_channel)
+        binary_topics = ["inferenceEngine/telemetry"]
+        if transport == "socket":
+            PerformanceMetrics.__consumer = SocketConsumer(socket_path=socket_path, binary_topics=binary_topics)
+        elif transport == "inprocess":
+            PerformanceMetrics.__consumer = LocalChannel(binary_topics=binary_topics)
+        else:
+            PerformanceMetrics.__consumer = MQTTConsumer(
+                server={
+                    "address": "localhost",
+                    "port": 1883
+                },
+                client_id="benchmark",
+                topics=[
+                    "inferenceEngine/status",
+                    "inferenceEngine/data",
+                    "inferenceEngine/telemetry"
+                ],
+                binary_topics=binary_topics
+            )
+        PerformanceMetrics.__consumer.start()
+
+    @staticmethod
+    def get_channel() -> LocalChannel:
+        if isinstance(PerformanceMetrics.__consumer, LocalChannel):
+            return PerformanceMetrics.__consumer
+        else:
+            return None
+
+    @staticmethod
+    def stop() -> None:
+        PerformanceMetrics.__consumer.stop()
+
+    @staticmethod
+    def update(timeout: float = None) -> None:
+        # Takes every message received so far, waiting up to the timeout for one if there is none
+        for topic, msg in PerformanceMetrics.__consumer.consume_all(timeout=timeout):
+            PerformanceMetrics.__handle(topic, msg)
+
+    @staticmethod
+    def __handle(topic: str, msg) -> None:
         if topic == "inferenceEngine/status":
             PerformanceMetrics.__is_active = bool(msg['active'])
+            if not PerformanceMetrics.__is_active:
+                # The final status announces how many records precede it: the Python engine counts
+                # its warm-up records too, the C++ engine sends one message per processed image
+                PerformanceMetrics.__final_status_ts = time.monotonic()
+                expected_records = msg.get('telemetry_records', msg.get('processed_images'))
+                PerformanceMetrics.__expected_records = int(expected_records) if expected_records is not None else None
+            if 'pid' in msg:
+                PerformanceMetrics.__engine_pid = int(msg['pid'])
+            if 'load_time' in msg:
+                PerformanceMetrics.__import_time = float(msg['import_time'])
+                PerformanceMetrics.__load_time = float(msg['load_time'])
+                PerformanceMetrics.__model_cache = str(msg['model_cache'])
+            if 'telemetry' in msg:
+                # The record layout of the binary batches comes with the engine start
+                schema = msg['telemetry']
+                PerformanceMetrics.__telemetry_record = struct.Struct(schema['struct'])
+                PerformanceMetrics.__telemetry_fields = schema['fields']
+                PerformanceMetrics.__telemetry_warmup_flag = int(schema['warmup_flag'])
+                for batch in PerformanceMetrics.__pending_batches:
+                    PerformanceMetrics.__decode_batch(batch)
+                PerformanceMetrics.__pending_batches = list()
+            if 'telemetry_records' in msg:
+                PerformanceMetrics.__telemetry = (
+                    str(msg['telemetry_format']),
+                    int(msg['telemetry_records']),
+                    int(msg['telemetry_flushes']),
+                    int(msg['telemetry_flushed_bytes']),
+                    float(msg['telemetry_mean_flush_time']),
+                    float(msg['telemetry_max_flush_time'])
+                )
+            if 'processed_images' in msg:
+                PerformanceMetrics.__processed_images = int(msg['processed_images'])
+                PerformanceMetrics.__elapsed_time = float(msg['elapsed_time'])
+            if 'output_dropped_writes' in msg:
+                PerformanceMetrics.__output = (
+                    int(msg['output_written_images']),
+                    int(msg['output_written_records']),
+                    int(msg['output_dropped_writes']),
+                    int(msg['output_max_queue_depth']),
+                    float(msg['output_mean_queue_depth'])
+                )
+            if 'captured_frames' in msg:
+                PerformanceMetrics.__captured_frames = int(msg['captured_frames'])
+                PerformanceMetrics.__dropped_frames = int(msg['dropped_frames'])
+            if msg.get('first_inference_time') is not None:
+                PerformanceMetrics.__first_inference_time = float(msg['first_inference_time'])
+            if msg.get('last_publish_time') is not None:
+                PerformanceMetrics.__publish_times.append(float(msg['last_publish_time']))
             
+        elif topic == "inferenceEngine/data" and not PerformanceMetrics.__is_new_record(msg.get('seq')):
+            return
+
+        elif topic == "inferenceEngine/data" and msg.get('warmup', False):
+            PerformanceMetrics.__warmup_pre_process_times.append(float(msg['pre_processing_time']))
+            PerformanceMetrics.__warmup_inference_times.append(float(msg['inference_time']))
+            PerformanceMetrics.__warmup_post_process_times.append(float(msg['post_processing_time']))
+
         elif topic == "inferenceEngine/data":
-            PerformanceMetrics.__pre_process_times.append(int(msg['pre_processing_time']))
-            PerformanceMetrics.__inference_times.append(int(msg['inference_time']))
-            PerformanceMetrics.__post_process_times.append(int(msg['post_processing_time']))
+            PerformanceMetrics.__pre_process_times.append(float(msg['pre_processing_time']))
+            PerformanceMetrics.__inference_times.append(float(msg['inference_time']))
+            PerformanceMetrics.__post_process_times.append(float(msg['post_processing_time']))
+            if 'timestamp' in msg:
+                PerformanceMetrics.__timestamps.append(int(msg['timestamp']))
+            # The C++ engine only reports the detector steps
+            if 'decode_time' in msg:
+                PerformanceMetrics.__decode_times.append(float(msg['decode_time']))
+                PerformanceMetrics.__draw_times.append(float(msg['draw_time']))
+                PerformanceMetrics.__latencies.append(float(msg['latency']))
+            # Each message carries the publish time of the previous one
+            if msg.get('publish_time') is not None:
+                PerformanceMetrics.__publish_times.append(float(msg['publish_time']))
+
+        elif topic == "inferenceEngine/telemetry":
+            if PerformanceMetrics.__telemetry_record is None:
+                PerformanceMetrics.__pending_batches.append(msg)
+            else:
+                PerformanceMetrics.__decode_batch(msg)
+
+    @staticmethod
+    def __decode_batch(batch: bytes) -> None:
+        for values in PerformanceMetrics.__telemetry_record.iter_unpack(batch):
+            record = dict(zip(PerformanceMetrics.__telemetry_fields, values))
+            if not PerformanceMetrics.__is_new_record(record['seq']):
+                continue
+            if record['flags'] & PerformanceMetrics.__telemetry_warmup_flag:
+                PerformanceMetrics.__warmup_pre_process_times.append(record['pre_processing_time'])
+                PerformanceMetrics.__warmup_inference_times.append(record['inference_time'])
+                PerformanceMetrics.__warmup_post_process_times.append(record['post_processing_time'])
+                continue
+
+            PerformanceMetrics.__pre_process_times.append(record['pre_processing_time'])
+            PerformanceMetrics.__inference_times.append(record['inference_time'])
+            PerformanceMetrics.__post_process_times.append(record['post_processing_time'])
+            PerformanceMetrics.__timestamps.append(record['timestamp'])
+            PerformanceMetrics.__decode_times.append(record['decode_time'])
+            PerformanceMetrics.__draw_times.append(record['draw_time'])
+            PerformanceMetrics.__latencies.append(record['latency'])
+            # NaN marks the first record, which has no previous publish to report
+            if not math.isnan(record['publish_time']):
+                PerformanceMetrics.__publish_times.append(record['publish_time'])
+
+    @staticmethod
+    def __is_new_record(seq: int) -> bool:
+        # QoS 1 delivers at least once, so records already received are skipped by sequence number
+        if seq is not None:
+            if seq in PerformanceMetrics.__received_seqs:
+                PerformanceMetrics.__duplicate_records += 1
+                return False
+            PerformanceMetrics.__received_seqs.add(seq)
+        PerformanceMetrics.__received_records += 1
+        return True
+
+    @staticmethod
+    def is_complete(grace_time: float = 5.0) -> bool:
+        # Done once the final status and every record it announces are in, or once the missing
+        # records had the grace time to arrive
+        if PerformanceMetrics.__final_status_ts is None:
+            return False
+        # An engine that does not announce its record count is done as soon as it stops
+        if PerformanceMetrics.__expected_records is None:
+            return True
+        if PerformanceMetrics.__received_records >= PerformanceMetrics.__expected_records:
+            return True
+        return time.monotonic() - PerformanceMetrics.__final_status_ts > grace_time
+
+    @staticmethod
+    def get_delivery() -> list:
+        if PerformanceMetrics.__expected_records is None:
+            return None
+        expected = PerformanceMetrics.__expected_records
+        received = PerformanceMetrics.__received_records
+        # Gaps are located from the sequence numbers both engines stamp their records with (binary
+        # records and JSON messages alike); without any, e.g. from an older engine, they are unknown
+        gaps = None
+        seqs = sorted(PerformanceMetrics.__received_seqs)
+        if seqs:
+            gaps = sum(1 for previous, seq in zip([-1] + seqs, seqs + [expected]) if seq - previous > 1)
+        return expected, received, max(0, expected - received), gaps, PerformanceMetrics.__duplicate_records
 
     @staticmethod
     def get_measures() -> list:
@@ -43,6 +240,94 @@ class PerformanceMetrics:
         else:
             return None
     
+    @staticmethod
+    def get_stage_measures() -> list:
+        if PerformanceMetrics.__decode_times:
+            return (
+                PerformanceMetrics.__decode_times,
+                PerformanceMetrics.__draw_times,
+                PerformanceMetrics.__publish_times,
+                PerformanceMetrics.__latencies
+            )
+        else:
+            return None
+
+    @staticmethod
+    def get_timestamps() -> list:
+        # monotonic_ns time at which each measured frame was reported, if the engine sends it
+        if PerformanceMetrics.__timestamps and len(PerformanceMetrics.__timestamps) == len(PerformanceMetrics.__pre_process_times):
+            return PerformanceMetrics.__timestamps
+        else:
+            return None
+
+    @staticmethod
+    def get_warmup_measures() -> list:
+        if PerformanceMetrics.__warmup_pre_process_times:
+            return (
+                PerformanceMetrics.__warmup_pre_process_times,
+                PerformanceMetrics.__warmup_inference_times,
+                PerformanceMetrics.__warmup_post_process_times
+            )
+        else:
+            return None
+
+    @staticmethod
+    def get_throughput() -> list:
+        if PerformanceMetrics.__processed_images and PerformanceMetrics.__elapsed_time:
+            throughput = PerformanceMetrics.__processed_images / (PerformanceMetrics.__elapsed_time / 1000)
+            return PerformanceMetrics.__processed_images, PerformanceMetrics.__elapsed_time, throughput
+        else:
+            return None
+
+    @staticmethod
+    def get_stream() -> list:
+        if PerformanceMetrics.__captured_frames and PerformanceMetrics.__elapsed_time:
+            drop_rate = PerformanceMetrics.__dropped_frames / PerformanceMetrics.__captured_frames * 100
+            fps = PerformanceMetrics.__processed_images / (PerformanceMetrics.__elapsed_time / 1000)
+            latencies = sorted(PerformanceMetrics.__latencies)
+            mean_latency = sum(latencies) / len(latencies) if latencies else None
+            p95_latency = latencies[int(0.95 * (len(latencies) - 1))] if latencies else None
+            return (
+                PerformanceMetrics.__captured_frames,
+                PerformanceMetrics.__processed_images,
+                PerformanceMetrics.__dropped_frames,
+                drop_rate,
+                fps,
+                mean_latency,
+                p95_latency
+            )
+        else:
+            return None
+
+    @staticmethod
+    def get_output() -> list:
+        return PerformanceMetrics.__output
+
+    @staticmethod
+    def get_telemetry() -> list:
+        if PerformanceMetrics.__telemetry is not None:
+            publish_times = PerformanceMetrics.__publish_times
+            mean_publish_time = sum(publish_times) / len(publish_times) if publish_times else None
+            return PerformanceMetrics.__telemetry + (mean_publish_time,)
+        else:
+            return None
+
+    @staticmethod
+    def get_startup() -> list:
+        if PerformanceMetrics.__load_time is not None:
+            return (
+                PerformanceMetrics.__import_time,
+                PerformanceMetrics.__load_time,
+                PerformanceMetrics.__first_inference_time,
+                PerformanceMetrics.__model_cache
+            )
+        else:
+            return None
+
+    @staticmethod
+    def get_engine_pid() -> int:
+        return PerformanceMetrics.__engine_pid
+
     @staticmethod
     def is_active() -> bool:
         return PerformanceMetrics.__is_active
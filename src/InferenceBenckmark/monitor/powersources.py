@@ -0,0 +1,219 @@
+import os
+import glob
+import fcntl
+import time
+import struct
+
+POWER_SOURCES = ("auto", "pipmic", "hwmon", "rapl", "linear", "none")
+
+# Power is also reported as the current drawn from a 5 V supply, as the Raspberry Pi boards are powered
+SUPPLY_VOLTAGE = 5.0
+
+def _pread_value(fd: int) -> int:
+    # Sysfs attributes are regenerated on each read from offset 0, so the file is never reopened
+    return int(os.pread(fd, 64, 0))
+
+class PiPmic:
+    # Rail currents and voltages of the Raspberry Pi 5 PMIC. The `pmic_read_adc` command vcgencmd
+    # would run is sent straight to the firmware through the mailbox property interface of a
+    # persistent /dev/vcio handle, so no process is forked per sample
+    GENCMD_TAG = 0x00030080
+    RESPONSE_SUCCESS = 0x80000000
+    RESPONSE_SIZE = 1024
+    # _IOWR(100, 0, char *)
+    IOCTL_MBOX_PROPERTY = (3 << 30) | (struct.calcsize("P") << 16) | (100 << 8)
+
+    def __init__(self, device="/dev/vcio"):
+        self.name = "pipmic"
+        self.fd = None
+        self.fd = os.open(device, os.O_RDWR)
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def read(self, cpu_usage: float = None) -> float:
+        return PiPmic.parse_adc(self.__gencmd(b"pmic_read_adc"))
+
+    def __gencmd(self, command: bytes) -> str:
+        # Property message: size, request code, tag, value buffer size, request size, response code,
+        # value buffer (the command, then its response), end tag
+        header = struct.Struct("<6I")
+        buffer = bytearray(header.size + PiPmic.RESPONSE_SIZE + 4)
+        header.pack_into(buffer, 0, len(buffer), 0, PiPmic.GENCMD_TAG, PiPmic.RESPONSE_SIZE, 0, 0)
+        buffer[header.size:header.size + len(command)] = command
+        fcntl.ioctl(self.fd, PiPmic.IOCTL_MBOX_PROPERTY, buffer, True)
+
+        response_code = header.unpack_from(buffer, 0)[1]
+        if response_code != PiPmic.RESPONSE_SUCCESS:
+            raise OSError(f"Firmware command '{command.decode()}' failed with response code {response_code:#x}.")
+        response = buffer[header.size:header.size + PiPmic.RESPONSE_SIZE]
+        return response.split(b"\0", 1)[0].decode()
+
+    @staticmethod
+    def parse_adc(measures_str: str) -> float:
+        # Lines look like "VDD_CORE_A current(7)=2.07690000A" and "VDD_CORE_V volt(15)=0.87940000V"
+        measures_str = measures_str.strip().replace(" ", "")
+        rails_currents = dict()
+        rails_voltages = dict()
+        for measure in measures_str.split("\n"):
+            measure_type, measure_value = measure.split("=")
+            measure_type = "_".join(measure_type.split("_")[:-1])
+
+            if "A" in measure_value:
+                rails_currents[measure_type] = float(measure_value.replace("A", ""))
+            elif "V" in measure_value:
+                rails_voltages[measure_type] = float(measure_value.replace("V", ""))
+
+        total_power = 0.0
+        for rail_name, rail_current in rails_currents.items():
+            rail_power = rail_current * rails_voltages[rail_name]
+            if rail_power > 0:
+                total_power += rail_power
+        return total_power
+
+class Hwmon:
+    # A hwmon power monitor (e.g. an INA219/INA226 on the supply), read from power1_input (uW) or
+    # from curr1_input (mA) and in1_input (mV)
+
+    def __init__(self, sysfs_root="/sys", device_name=None):
+        self.name = "hwmon"
+        self.fds = dict()
+        for device in sorted(glob.glob(os.path.join(sysfs_root, "class", "hwmon", "hwmon*"))):
+            with open(os.path.join(device, "name"), "r") as file:
+                name = file.read().strip()
+            if device_name is not None and name != device_name:
+                continue
+            if os.path.exists(os.path.join(device, "power1_input")):
+                attributes = ["power1_input"]
+            elif os.path.exists(os.path.join(device, "curr1_input")) and os.path.exists(os.path.join(device, "in1_input")):
+                attributes = ["curr1_input", "in1_input"]
+            else:
+                continue
+            self.name = f"hwmon:{name}"
+            self.fds = {attribute: os.open(os.path.join(device, attribute), os.O_RDONLY) for attribute in attributes}
+            break
+        if not self.fds:
+            raise ValueError(f"No hwmon power monitor{f' named {device_name}' if device_name else ''} found in {sysfs_root}.")
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = dict()
+
+    def read(self, cpu_usage: float = None) -> float:
+        if "power1_input" in self.fds:
+            return _pread_value(self.fds["power1_input"]) / 1e6
+        return _pread_value(self.fds["curr1_input"]) * _pread_value(self.fds["in1_input"]) / 1e6
+
+class Rapl:
+    # Intel/AMD package energy counters of the powercap interface, in uJ. Only the package domains
+    # are summed, as their subdomains (core, uncore, dram) and psys overlap them. The counters are
+    # cumulative, so each read returns the mean power since the previous one
+    def __init__(self, sysfs_root="/sys"):
+        self.name = "rapl"
+        self.domains = list()
+        for domain in sorted(glob.glob(os.path.join(sysfs_root, "class", "powercap", "intel-rapl:*"))):
+            with open(os.path.join(domain, "name"), "r") as file:
+                if not file.read().startswith("package"):
+                    continue
+            with open(os.path.join(domain, "max_energy_range_uj"), "r") as file:
+                max_energy = int(file.read())
+            # energy_uj is only readable by root on recent kernels
+            try:
+                fd = os.open(os.path.join(domain, "energy_uj"), os.O_RDONLY)
+            except PermissionError as error:
+                raise PermissionError(
+                    f"Reading the RAPL energy counters ({domain}/energy_uj) requires root."
+                ) from error
+            self.domains.append([fd, max_energy, _pread_value(fd)])
+        if not self.domains:
+            raise ValueError(f"No RAPL package domain found in {sysfs_root}.")
+        self.last_ts = time.monotonic_ns()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        for fd, _, _ in self.domains:
+            os.close(fd)
+        self.domains = list()
+
+    def read(self, cpu_usage: float = None) -> float:
+        sample_ts = time.monotonic_ns()
+        energy = 0
+        for domain in self.domains:
+            fd, max_energy, last_energy = domain
+            domain[2] = _pread_value(fd)
+            # The counters wrap around at max_energy_range_uj
+            energy += (domain[2] - last_energy) % (max_energy + 1)
+        elapsed_time = (sample_ts - self.last_ts) / 1e9
+        self.last_ts = sample_ts
+        return energy / 1e6 / elapsed_time if elapsed_time > 0 else 0.0
+
+class LinearModel:
+    # Estimates the supply current from the CPU usage, between the currents measured externally at
+    # idle and at full load
+    def __init__(self, min_current: float, max_current: float, half_cores: bool = False):
+        self.name = "linear"
+        self.min_current = min_current
+        self.max_current = max_current
+        self.cpu_max = 50 if half_cores else 100
+
+    def close(self):
+        pass
+
+    def read(self, cpu_usage: float = None) -> float:
+        current = self.min_current + (self.max_current - self.min_current) * (cpu_usage / self.cpu_max)
+        return current / 1000 * SUPPLY_VOLTAGE
+
+def create_power_source(
+    name: str = "auto",
+    board_name: str = None,
+    sysfs_root: str = "/sys",
+    hwmon_name: str = None,
+    min_current: float = None,
+    max_current: float = None,
+    half_cores: bool = False
+):
+    # With "auto", the Pi 5 PMIC, then RAPL, then a hwmon monitor, then the linear model (if its
+    # currents are given) are tried; None means power is not measured
+    if name == "auto":
+        if board_name is not None and board_name.startswith("Raspberry Pi 5"):
+            name = "pipmic"
+        else:
+            # RAPL counters are only readable by root on recent kernels, so an unreadable or missing
+            # source falls through to the next one
+            try:
+                return Rapl(sysfs_root=sysfs_root)
+            except (OSError, ValueError):
+                pass
+            try:
+                return Hwmon(sysfs_root=sysfs_root, device_name=hwmon_name)
+            except (OSError, ValueError):
+                pass
+            if min_current is not None and max_current is not None:
+                name = "linear"
+            else:
+                name = "none"
+
+    if name == "pipmic":
+        return PiPmic()
+    elif name == "hwmon":
+        return Hwmon(sysfs_root=sysfs_root, device_name=hwmon_name)
+    elif name == "rapl":
+        return Rapl(sysfs_root=sysfs_root)
+    elif name == "linear":
+        if min_current is None or max_current is None:
+            raise ValueError("The linear power model needs the minimum and maximum current consumption.")
+        return LinearModel(min_current=min_current, max_current=max_current, half_cores=half_cores)
+    elif name == "none":
+        return None
+    raise ValueError(f"Invalid power source '{name}', expected one of {POWER_SOURCES}.")
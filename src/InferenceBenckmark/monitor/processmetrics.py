@@ -0,0 +1,215 @@
+import os
+import psutil
+
+class ProcessMetrics:
+    # Resource usage of the inference engine process and of its worker processes, sampled next to
+    # the system-wide figures of ConsumptionMetrics once the engine has reported its PID
+    __CLOCK_TICKS: int = os.sysconf("SC_CLK_TCK")
+    # Worker processes are looked up every few samples only, as it scans the whole process table
+    __CHILDREN_REFRESH: int = 10
+
+    __process: psutil.Process = None
+    __processes: dict = dict()
+    __proc_fds: dict = dict()
+    __last_counters: dict = dict()
+    __samples: int = 0
+
+    __timestamps: list = list()
+    __cpu_usage_levels: list = list()
+    __rss_levels: list = list()
+    __uss_levels: list = list()
+    __peak_rss_levels: list = list()
+    __thread_counts: list = list()
+    __voluntary_switches: list = list()
+    __involuntary_switches: list = list()
+    __minor_faults: list = list()
+    __major_faults: list = list()
+
+    __threads: dict = dict()
+    __core_activity: dict = dict()
+
+    @staticmethod
+    def attach(pid: int) -> None:
+        # Called from the main thread while the sampler thread runs update, which starts sampling
+        # once the process is set, so it is set only after the process is fully tracked
+        process = psutil.Process(pid)
+        ProcessMetrics.__track(process)
+        ProcessMetrics.__process = process
+
+    @staticmethod
+    def is_attached() -> bool:
+        return ProcessMetrics.__process is not None
+
+    @staticmethod
+    def update(timestamp: int) -> None:
+        if ProcessMetrics.__process is None:
+            return
+        if ProcessMetrics.__samples % ProcessMetrics.__CHILDREN_REFRESH == 0:
+            try:
+                for child in ProcessMetrics.__process.children(recursive=True):
+                    if child.pid not in ProcessMetrics.__processes:
+                        ProcessMetrics.__track(child)
+            except (psutil.NoSuchProcess, FileNotFoundError):
+                pass
+        ProcessMetrics.__samples += 1
+
+        cpu_usage = 0.0
+        rss = 0
+        uss = 0
+        peak_rss = 0
+        thread_count = 0
+        counters_delta = [0, 0, 0, 0]
+        for pid, process in list(ProcessMetrics.__processes.items()):
+            try:
+                cpu_usage += process.cpu_percent()
+                rss += process.memory_info().rss
+                # USS walks the memory mappings, which needs the same user as the engine (or root)
+                if uss is not None:
+                    try:
+                        uss += process.memory_full_info().uss
+                    except psutil.AccessDenied:
+                        uss = None
+                switches = process.num_ctx_switches()
+                stat_fd, status_fd = ProcessMetrics.__proc_fds[pid]
+                stat = ProcessMetrics.__read_stat(stat_fd)
+                peak_rss += ProcessMetrics.__read_peak_rss(status_fd)
+                thread_count += ProcessMetrics.__update_threads(pid)
+            except (psutil.NoSuchProcess, FileNotFoundError, ProcessLookupError, ValueError):
+                # The process exited since the previous sample
+                ProcessMetrics.__untrack(pid)
+                continue
+
+            # Context switches and page faults are cumulative, so each sample holds the ones since the previous
+            counters = (switches.voluntary, switches.involuntary, int(stat[7]), int(stat[9]))
+            last_counters = ProcessMetrics.__last_counters.get(pid, counters)
+            for index, (counter, last_counter) in enumerate(zip(counters, last_counters)):
+                counters_delta[index] += counter - last_counter
+            ProcessMetrics.__last_counters[pid] = counters
+
+        if not ProcessMetrics.__processes:
+            ProcessMetrics.__process = None
+            return
+        ProcessMetrics.__timestamps.append(timestamp)
+        # Normalized to all cores, as the system-wide CPU usage
+        ProcessMetrics.__cpu_usage_levels.append(cpu_usage / psutil.cpu_count())
+        ProcessMetrics.__rss_levels.append(rss / (1024 * 1024))
+        ProcessMetrics.__uss_levels.append(uss / (1024 * 1024) if uss is not None else None)
+        ProcessMetrics.__peak_rss_levels.append(peak_rss / 1024)
+        ProcessMetrics.__thread_counts.append(thread_count)
+        ProcessMetrics.__voluntary_switches.append(counters_delta[0])
+        ProcessMetrics.__involuntary_switches.append(counters_delta[1])
+        ProcessMetrics.__minor_faults.append(counters_delta[2])
+        ProcessMetrics.__major_faults.append(counters_delta[3])
+
+    @staticmethod
+    def stop() -> None:
+        for pid in list(ProcessMetrics.__processes):
+            ProcessMetrics.__untrack(pid)
+        ProcessMetrics.__process = None
+
+    @staticmethod
+    def get_measures() -> list:
+        if ProcessMetrics.__timestamps:
+            return (
+                ProcessMetrics.__timestamps,
+                ProcessMetrics.__cpu_usage_levels,
+                ProcessMetrics.__rss_levels,
+                ProcessMetrics.__uss_levels,
+                ProcessMetrics.__peak_rss_levels,
+                ProcessMetrics.__thread_counts,
+                ProcessMetrics.__voluntary_switches,
+                ProcessMetrics.__involuntary_switches,
+                ProcessMetrics.__minor_faults,
+                ProcessMetrics.__major_faults
+            )
+        else:
+            return None
+
+    @staticmethod
+    def get_threads() -> list:
+        # (PID, TID, name, CPU time in s, share of one core over the tracked time in %, cores it ran on)
+        if not ProcessMetrics.__timestamps:
+            return None
+        tracked_time = (ProcessMetrics.__timestamps[-1] - ProcessMetrics.__timestamps[0]) / 1e9
+        rows = list()
+        for (pid, tid), thread in sorted(ProcessMetrics.__threads.items()):
+            cpu_time = (thread["cpu_ticks"] - thread["first_cpu_ticks"]) / ProcessMetrics.__CLOCK_TICKS
+            rows.append((
+                pid,
+                tid,
+                thread["name"],
+                cpu_time,
+                cpu_time / tracked_time * 100 if tracked_time > 0 else 0.0,
+                "-".join(str(core) for core in sorted(thread["cores"])) or "none"
+            ))
+        return rows
+
+    @staticmethod
+    def get_core_activity() -> dict:
+        # Number of samples in which an engine thread ran, by the core it last ran on
+        return ProcessMetrics.__core_activity
+
+    @staticmethod
+    def __track(process: psutil.Process) -> None:
+        # The first call only sets the reference of the CPU usage, which then covers each sample interval
+        process.cpu_percent()
+        # The files are opened before the process is listed, so update never finds one without them
+        stat_fd = os.open(f"/proc/{process.pid}/stat", os.O_RDONLY)
+        try:
+            status_fd = os.open(f"/proc/{process.pid}/status", os.O_RDONLY)
+        except FileNotFoundError:
+            os.close(stat_fd)
+            raise
+        ProcessMetrics.__proc_fds[process.pid] = (stat_fd, status_fd)
+        ProcessMetrics.__processes[process.pid] = process
+
+    @staticmethod
+    def __untrack(pid: int) -> None:
+        ProcessMetrics.__processes.pop(pid, None)
+        for fd in ProcessMetrics.__proc_fds.pop(pid, ()):
+            os.close(fd)
+
+    @staticmethod
+    def __read_stat(fd: int) -> list:
+        # Fields after the command name, which may hold spaces: index 0 is the state (field 3)
+        stat = os.pread(fd, 4096, 0).decode()
+        if not stat:
+            raise ProcessLookupError()
+        return stat[stat.rindex(")") + 2:].split()
+
+    @staticmethod
+    def __read_peak_rss(fd: int) -> int:
+        # VmHWM, the peak resident set size in kB
+        for line in os.pread(fd, 4096, 0).decode().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+        raise ProcessLookupError()
+
+    @staticmethod
+    def __update_threads(pid: int) -> int:
+        tids = os.listdir(f"/proc/{pid}/task")
+        for tid in tids:
+            try:
+                with open(f"/proc/{pid}/task/{tid}/stat", "r") as file:
+                    stat = file.read()
+            except FileNotFoundError:
+                continue
+            name = stat[stat.index("(") + 1:stat.rindex(")")]
+            fields = stat[stat.rindex(")") + 2:].split()
+            # utime and stime (fields 14 and 15) and the core the thread last ran on (field 39)
+            cpu_ticks = int(fields[11]) + int(fields[12])
+            core = int(fields[36])
+
+            thread = ProcessMetrics.__threads.get((pid, int(tid)))
+            if thread is None:
+                ProcessMetrics.__threads[(pid, int(tid))] = {
+                    "name": name, "first_cpu_ticks": cpu_ticks, "cpu_ticks": cpu_ticks, "cores": set()
+                }
+                continue
+            # A thread that used CPU since the previous sample ran, at least last, on this core
+            if cpu_ticks > thread["cpu_ticks"]:
+                thread["cores"].add(core)
+                ProcessMetrics.__core_activity[core] = ProcessMetrics.__core_activity.get(core, 0) + 1
+            thread["name"] = name
+            thread["cpu_ticks"] = cpu_ticks
+        return len(tids)
@@ -0,0 +1,75 @@
+import bisect
+import threading
+import time
+
+class Sampler:
+    # Calls the sample function from its own thread on a fixed period. Deadlines are counted from the
+    # start time, so a slow sample delays only itself instead of making the rate drift, and ticks it
+    # overran are skipped rather than run back to back
+
+    def __init__(self, sample, period=100.0):
+        # The sample function takes the monotonic_ns timestamp of the sample, the clock the engine
+        # stamps its frames with
+        self.sample = sample
+        self.period = period
+        self.start_ts = None
+        self.samples = 0
+        self.overruns = 0
+        self.max_jitter = 0.0
+        self.__jitter_sum = 0.0
+        self.__ticks = 0
+        self.__stopped = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        self.start_ts = time.monotonic_ns()
+        self.__thread = threading.Thread(target=self.__sample_loop, name="sampler", daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        if self.__thread is None:
+            return
+        self.__stopped.set()
+        self.__thread.join()
+        self.__thread = None
+        # A last sample closes the window of the frames that ended after the previous one
+        self.sample(time.monotonic_ns())
+        self.samples += 1
+
+    def get_mean_jitter(self) -> float:
+        if self.__ticks == 0:
+            return 0.0
+        return self.__jitter_sum / self.__ticks
+
+    def get_stats(self) -> tuple:
+        return self.period, self.samples, self.overruns, self.get_mean_jitter(), self.max_jitter
+
+    def __sample_loop(self):
+        period_ns = int(self.period * 1e6)
+        tick = 0
+        while True:
+            deadline_ts = self.start_ts + tick * period_ns
+            delay = deadline_ts - time.monotonic_ns()
+            if self.__stopped.wait(max(0, delay) / 1e9):
+                return
+            sample_ts = time.monotonic_ns()
+            self.sample(sample_ts)
+            self.samples += 1
+            self.__ticks += 1
+            jitter = (sample_ts - deadline_ts) / 1e6
+            self.__jitter_sum += jitter
+            self.max_jitter = max(self.max_jitter, jitter)
+
+            next_tick = (time.monotonic_ns() - self.start_ts) // period_ns + 1
+            self.overruns += next_tick - tick - 1
+            tick = next_tick
+
+    @staticmethod
+    def get_windows(sample_timestamps: list, frame_timestamps: list) -> list:
+        # Each sample covers the time since the previous one, so a frame belongs to the first sample
+        # taken at or after its timestamp. Frames after the last sample have no window (None)
+        windows = list()
+        for frame_ts in frame_timestamps:
+            window = bisect.bisect_left(sample_timestamps, frame_ts)
+            windows.append(window if window < len(sample_timestamps) else None)
+        return windows
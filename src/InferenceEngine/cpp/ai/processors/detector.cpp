@@ -8,9 +8,9 @@ namespace Detector
     static std::string modelInferencer;
     static UltralyticsYOLO architecture;
 
-    int preprocessTime;
-    int inferenceTime;
-    int postprocessTime;
+    double preprocessTime;
+    double inferenceTime;
+    double postprocessTime;
 
     void init(std::string modelPath, std::string cpuCores, float scoreThresh, float confidenceThresh, float iouThresh)
     {
@@ -23,12 +23,12 @@ namespace Detector
         cv::Mat outputs;
         std::vector<Detection> detections;
 
-        auto startTs = std::chrono::high_resolution_clock::now();
+        auto startTs = std::chrono::steady_clock::now();
         cv::Mat input = Detector::architecture.preProcess(image);
-        auto duration = std::chrono::high_resolution_clock::now() - (startTs);
-        Detector::preprocessTime = (int)std::chrono::duration<double, std::milli>(duration).count();
+        auto duration = std::chrono::steady_clock::now() - (startTs);
+        Detector::preprocessTime = std::chrono::duration<double, std::milli>(duration).count();
 
-        startTs = std::chrono::high_resolution_clock::now();
+        startTs = std::chrono::steady_clock::now();
         if (Detector::modelInferencer == "litert")
         {
             outputs = LiteRT::forward(input);
@@ -39,13 +39,13 @@ namespace Detector
             outputs = OnnxRT::forward(input);
         }
 
-        duration = std::chrono::high_resolution_clock::now() - (startTs);
-        Detector::inferenceTime = (int)std::chrono::duration<double, std::milli>(duration).count();
+        duration = std::chrono::steady_clock::now() - (startTs);
+        Detector::inferenceTime = std::chrono::duration<double, std::milli>(duration).count();
 
-        startTs = std::chrono::high_resolution_clock::now();
+        startTs = std::chrono::steady_clock::now();
         detections = Detector::architecture.postProcess(outputs, image);
-        duration = std::chrono::high_resolution_clock::now() - (startTs);
-        Detector::postprocessTime = (int)std::chrono::duration<double, std::milli>(duration).count();
+        duration = std::chrono::steady_clock::now() - (startTs);
+        Detector::postprocessTime = std::chrono::duration<double, std::milli>(duration).count();
 
         return detections;
     }
@@ -10,9 +10,9 @@
 namespace Detector
 {
     
-    extern int preprocessTime;
-    extern int inferenceTime;
-    extern int postprocessTime;
+    extern double preprocessTime;
+    extern double inferenceTime;
+    extern double postprocessTime;
 
     void init(std::string modelPath, std::string cpuCores, float scoreThresh, float confidenceThresh, float iouThresh);
     std::vector<Detection> run(const cv::Mat& image);
@@ -14,6 +14,8 @@ void MQTTProducer::produce(const std::string& topic, const nlohmann::json& msg)
     std::string msgStr = msg.dump();
     mqtt::message_ptr msgPointer = mqtt::make_message(topic, msgStr);
     msgPointer->set_payload(msgStr);
+    // QoS 1: the broker acknowledges each message, so the benchmark receives all of them
+    msgPointer->set_qos(1);
     this->client.publish(msgPointer);
 
 }
\ No newline at end of file
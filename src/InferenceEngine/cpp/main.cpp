@@ -2,10 +2,12 @@
 #include "mqttproducer.hpp"
 #include "plotter.hpp"
 
+#include <chrono>
 #include <filesystem>
 #include <indicators/progress_bar.hpp>
 #include <iostream>
 #include <string>
+#include <unistd.h>
 #include <opencv2/opencv.hpp>
 
 int main(int argc, char *argv[])
@@ -36,6 +38,8 @@ int main(int argc, char *argv[])
     */
     nlohmann::json statusMsg;
     statusMsg["active"] = true;
+    // The benchmark tracks the resource usage of this process
+    statusMsg["pid"] = getpid();
     mqttProducer.produce("inferenceEngine/status", statusMsg);
 
     indicators::ProgressBar bar{
@@ -48,6 +52,7 @@ int main(int argc, char *argv[])
         indicators::option::PrefixText{"[INF. ENGINE] Inferencing images: "}};
 
     int i = 0;
+    auto startTs = std::chrono::steady_clock::now();
     std::filesystem::path imagesDir = imagesFolder;
     if (!std::filesystem::exists(outputFolder))
     {
@@ -68,6 +73,10 @@ int main(int argc, char *argv[])
         //cv::imwrite(outputFolder + "/" + imageName, image);
 
         nlohmann::json dataMsg;
+        dataMsg["seq"] = i;
+        // steady_clock is CLOCK_MONOTONIC, the clock the benchmark stamps its resource samples with
+        dataMsg["timestamp"] = std::chrono::duration_cast<std::chrono::nanoseconds>(
+            std::chrono::steady_clock::now().time_since_epoch()).count();
         dataMsg["pre_processing_time"] = Detector::preprocessTime;
         dataMsg["inference_time"] = Detector::inferenceTime;
         dataMsg["post_processing_time"] = Detector::postprocessTime;
@@ -79,7 +88,11 @@ int main(int argc, char *argv[])
     /**
      * Stop inferencing and alerting
      */
+    auto elapsedTime = std::chrono::steady_clock::now() - startTs;
     statusMsg["active"] = false;
+    // The benchmark waits for this many data messages before stopping
+    statusMsg["processed_images"] = i;
+    statusMsg["elapsed_time"] = std::chrono::duration<double, std::milli>(elapsedTime).count();
     mqttProducer.produce("inferenceEngine/status", statusMsg);
 
     return 0;
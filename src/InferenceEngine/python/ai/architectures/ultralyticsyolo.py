@@ -2,7 +2,9 @@ import numpy as np
 import cv2
 from typing import Tuple, List, Dict
 from image.preprocessing import ImagePreprocessing
+from image.fusedpreprocessing import FusedImagePreprocessing
 from detection.postprocessing import DetectionPostprocessing
+from model.detection import DetectionBatch
 
 class UltralyticsYOLO:
     """
@@ -16,12 +18,16 @@ class UltralyticsYOLO:
         score_thresh (float): Threshold for filtering boxes based on score.
         confidence_thresh (float): Minimum confidence threshold for detections.
         iou_thresh (float): Intersection over Union (IoU) threshold used for Non-Maximum Suppression (NMS).
+        fused_preprocessing (bool): Whether images are preprocessed in place into reused input tensors.
+        class_aware_nms (bool): Whether NMS only suppresses overlapping boxes of the same class.
     """
 
     input_details: Dict[str, any]
     score_thresh: float
     confidence_thresh: float
     iou_thresh: float
+    fused_preprocessing: bool
+    class_aware_nms: bool
 
     def __init__(
         self,
@@ -29,6 +35,8 @@ class UltralyticsYOLO:
         score_thresh: float,
         confidence_thresh: float,
         iou_thresh: float,
+        fused_preprocessing: bool = True,
+        class_aware_nms: bool = False,
     ):
         """
         Initializes the UltralyticsYOLO class with model input details and thresholds.
@@ -39,11 +47,17 @@ class UltralyticsYOLO:
             score_thresh (float): Score threshold for filtering detections.
             confidence_thresh (float): Minimum confidence threshold for detected objects.
             iou_thresh (float): IoU threshold for Non-Maximum Suppression (NMS).
+            fused_preprocessing (bool, optional): If True, images are preprocessed in place into
+                reused input tensors (see FusedImagePreprocessing). Defaults to True.
+            class_aware_nms (bool, optional): If True, NMS is applied per class instead of across
+                all classes. Defaults to False.
         """
         self.input_details = input_details
         self.score_thresh = score_thresh
         self.confidence_thresh = confidence_thresh
         self.iou_thresh = iou_thresh
+        self.fused_preprocessing = fused_preprocessing
+        self.class_aware_nms = class_aware_nms
 
     def pre_process(
         self, image: np.ndarray, litert_model: bool = True, opencvrt_inferencer: bool = False
@@ -61,10 +75,47 @@ class UltralyticsYOLO:
         Returns:
             np.ndarray: Preprocessed image ready for model inference.
         """
+        return self.pre_process_batch(
+            images=[image], litert_model=litert_model, opencvrt_inferencer=opencvrt_inferencer
+        )
+
+    def pre_process_batch(
+        self,
+        images: List[np.ndarray],
+        litert_model: bool = True,
+        opencvrt_inferencer: bool = False,
+        out: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        Preprocesses a batch of input images into a single tensor for YOLO inference.
+
+        Args:
+            images (List[np.ndarray]): Input image arrays in BGR format.
+            litert_model (bool, optional): Indicates if the model uses TensorFlow Lite runtime.
+                Defaults to True.
+            opencvrt_inferencer (bool, optional): If True, preprocesses the images using OpenCV
+                DNN module. Defaults to False.
+            out (np.ndarray, optional): Tensor to write the batch into, such as a view of the
+                interpreter input tensor. Defaults to None.
+
+        Returns:
+            np.ndarray: Preprocessed batch ready for model inference, with the batch size as
+                first dimension. With fused preprocessing, the tensor is reused by later calls.
+        """
+        if self.fused_preprocessing and not opencvrt_inferencer:
+            return FusedImagePreprocessing.format(
+                images=images,
+                input_shape=self.input_details["shape"][1:3],
+                layout="nhwc" if litert_model else "nchw",
+                type=self.input_details["type"],
+                scale=self.input_details["scale"],
+                zero_point=self.input_details["zero_point"],
+                out=out,
+            )
+
         if opencvrt_inferencer:
-            input_image = image
-            input_image = cv2.dnn.blobFromImage(
-                input_image, 
+            input_image = cv2.dnn.blobFromImages(
+                images, 
                 scalefactor=1.0 / 255.0, 
                 size=self.input_details["shape"][1:3], 
                 mean=self.input_details["mean"], 
@@ -73,7 +124,7 @@ class UltralyticsYOLO:
             )
         else:
             input_image: np.ndarray = ImagePreprocessing.format(
-                images=[image], 
+                images=list(images), 
                 input_shape=self.input_details["shape"][1:3],
                 litert_model=litert_model
             )
@@ -86,44 +137,48 @@ class UltralyticsYOLO:
                 type=self.input_details["type"],
             )
 
+        if out is not None:
+            np.copyto(out, input_image)
+            return out
+
         return input_image
 
     def post_process(
-        self, output: np.ndarray, image: np.ndarray
-    ) -> Tuple[List[np.ndarray], List[int], List[float]]:
+        self, output: np.ndarray, image: np.ndarray = None, image_shape: Tuple[int, ...] = None
+    ) -> DetectionBatch:
         """
         Postprocesses model output to extract bounding boxes, confidence scores, and class IDs.
+        Candidates are filtered by confidence and handed to NMS as NumPy arrays, without any
+        per-anchor Python work.
 
         Args:
-            output (np.ndarray): Model output, usually containing bounding box predictions
-                and class scores for each detected object.
-            image (np.ndarray): Original input image, used to calculate scaling factors.
+            output (np.ndarray): Model output of a single image, of shape (1, 4 + classes, anchors),
+                containing bounding box predictions and class scores for each anchor.
+            image (np.ndarray, optional): Original input image, used to calculate scaling factors.
+            image_shape (Tuple[int, ...], optional): Shape of the original image, used instead of
+                `image` when only the preprocessed tensor is at hand.
 
         Returns:
-            List[Detection]
-                List of computed detections with bbox, score and class ID.
+            DetectionBatch
+                Computed detections with bbox, score and class ID, stored column-wise.
         """
-        output: List[np.ndarray] = [np.transpose(pred) for pred in output]
+        prediction: np.ndarray = output[0]  # (4 + classes, anchors)
 
+        if image is not None:
+            image_shape = image.shape
         input_factor: Tuple[float, float] = (
-            image.shape[0] / self.input_details["shape"][1],
-            image.shape[1] / self.input_details["shape"][2],
+            image_shape[0] / self.input_details["shape"][1],
+            image_shape[1] / self.input_details["shape"][2],
         )
 
-        boxes: List[np.ndarray] = []
-        scores: List[float] = []
-        classes_ids: List[int] = []
-
-        for pred in output:
-            x: np.ndarray = pred[:, 0]
-            y: np.ndarray = pred[:, 1]
-            w: np.ndarray = pred[:, 2]
-            h: np.ndarray = pred[:, 3]
-            boxes.extend(np.column_stack([x, y, w, h]))
+        # Keep only the anchors whose best class passes the confidence threshold before NMS
+        class_scores: np.ndarray = prediction[4:]
+        scores: np.ndarray = class_scores.max(axis=0)
+        candidates: np.ndarray = np.flatnonzero(scores > self.confidence_thresh)
 
-            idx: np.ndarray = np.argmax(pred[:, 4:], axis=1)
-            scores.extend(pred[np.arange(pred.shape[0]), idx + 4])
-            classes_ids.extend(idx)
+        boxes: np.ndarray = prediction[:4, candidates].T  # (candidates, [x, y, w, h])
+        scores = scores[candidates]
+        classes_ids: np.ndarray = class_scores[:, candidates].argmax(axis=0)
 
         detections = DetectionPostprocessing.apply_nms(
             boxes=boxes,
@@ -133,6 +188,30 @@ class UltralyticsYOLO:
             confidence_thresh=self.confidence_thresh,
             iou_thresh=self.iou_thresh,
             score_thresh=self.score_thresh,
+            class_aware=self.class_aware_nms,
         )
 
         return detections
+
+    def post_process_batch(
+        self, output: np.ndarray, images: List[np.ndarray] = None, image_shapes: List[Tuple[int, ...]] = None
+    ) -> List[DetectionBatch]:
+        """
+        Postprocesses the output of a batched forward pass, one batch element per image.
+
+        Args:
+            output (np.ndarray): Model output with the batch size as first dimension.
+            images (List[np.ndarray], optional): Original input images, in the same order as the batch.
+            image_shapes (List[Tuple[int, ...]], optional): Shapes of the original images, used
+                instead of `images`.
+
+        Returns:
+            List[DetectionBatch]
+                Computed detections of each image.
+        """
+        if images is not None:
+            image_shapes = [image.shape for image in images]
+        return [
+            self.post_process(output=output[idx:idx + 1], image_shape=image_shape)
+            for idx, image_shape in enumerate(image_shapes)
+        ]
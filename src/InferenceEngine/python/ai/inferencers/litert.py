@@ -1,12 +1,15 @@
 import numpy as np
-import multiprocessing
+from model.runtimeconfig import RuntimeConfig
 
 try:
     from tflite_runtime import interpreter as tflite
     from tflite_runtime.interpreter import load_delegate
+    # Older tflite_runtime builds have no resolver types, which are only needed to disable XNNPACK
+    OpResolverType = getattr(tflite, "OpResolverType", None)
     runtime_available: str = "tflite_runtime"
 except ImportError:
     import tensorflow as tf
+    OpResolverType = tf.lite.experimental.OpResolverType
     runtime_available: str = "tensorflow"
 
 class LiteRT:
@@ -22,14 +25,27 @@ class LiteRT:
             index, type, shape, scale, and zero_point.
         output_details (dict): Dictionary containing model output details, including 
             index, type, scale, and zero_point.
+        zero_copy (bool): Whether inputs and outputs are accessed through views of the
+            interpreter tensors instead of `set_tensor`/`get_tensor` copies.
+        __output_buffers (dict):
+            Private attribute holding the reused buffers the output is decoded into, in zero-copy mode.
     """
 
     __inferencer: 'tflite.Interpreter' or 'tf.lite.Interpreter' = None
+    __input_tensor: callable = None
+    __output_tensor: callable = None
+    __output_buffers: dict = dict()
     input_details: dict = dict()
     output_details: dict = dict()
+    zero_copy: bool = False
 
     @staticmethod
-    def load(model_path: str, half_cores: bool) -> None:
+    def load(
+        model_path: str,
+        half_cores: bool,
+        zero_copy: bool = False,
+        runtime_config: RuntimeConfig = RuntimeConfig()
+    ) -> None:
         """
         Loads a TensorFlow Lite model from the specified path. If the model file name 
         contains 'edgetpu', the Edge TPU delegate is loaded for hardware acceleration.
@@ -37,13 +53,23 @@ class LiteRT:
         Args:
             model_path (str): Path to the TensorFlow Lite model file.
             half_cores (bool): Use only half of CPU cores for inference
+            zero_copy (bool, optional): Access the input and output through views of the interpreter
+                tensors, decoding the output into reused buffers. Defaults to False.
+            runtime_config (RuntimeConfig, optional): Threading options and XNNPACK usage. An explicit
+                number of threads overrides `half_cores`. Defaults to the runtime defaults.
 
         Raises:
-            RuntimeError: If the model file path is invalid or the interpreter fails to load.
+            RuntimeError: If the model file path is invalid or the interpreter fails to load, or if
+                XNNPACK is disabled with a tflite_runtime build that has no resolver types.
         """
-        num_threads = multiprocessing.cpu_count()
-        if half_cores:
-            num_threads = num_threads // 2
+        num_threads = runtime_config.get_intra_op_threads(half_cores=half_cores)
+
+        # XNNPACK is applied as a default delegate, which only the built-in resolver without defaults skips
+        interpreter_options = {"model_path": model_path, "num_threads": num_threads}
+        if not runtime_config.use_xnnpack:
+            if OpResolverType is None:
+                raise RuntimeError("This tflite_runtime build cannot disable XNNPACK (no OpResolverType).")
+            interpreter_options["experimental_op_resolver_type"] = OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
             
         if runtime_available == "tflite_runtime":
             if "edgetpu" in model_path:
@@ -52,24 +78,53 @@ class LiteRT:
                     experimental_delegates=[load_delegate('libedgetpu.so.1')]
                 )
             else:
-                LiteRT.__inferencer = tflite.Interpreter(model_path=model_path, num_threads=num_threads)
+                LiteRT.__inferencer = tflite.Interpreter(**interpreter_options)
         else:
-            LiteRT.__inferencer = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+            LiteRT.__inferencer = tf.lite.Interpreter(**interpreter_options)
 
         LiteRT.__inferencer.allocate_tensors()
         LiteRT.__load_input_details()
         LiteRT.__load_output_details()
 
+        LiteRT.zero_copy = zero_copy
+        LiteRT.__input_tensor = LiteRT.__inferencer.tensor(LiteRT.input_details["index"])
+        LiteRT.__output_tensor = LiteRT.__inferencer.tensor(LiteRT.output_details["index"])
+        LiteRT.__output_buffers = dict()
+
+    @staticmethod
+    def input_tensor(batch_size: int = 1) -> np.ndarray:
+        """
+        Returns a writable view of the interpreter input tensor, resizing the batch dimension if
+        needed. Preprocessing can write into it directly, before calling `forward` without input.
+        The view must be released before `forward` is called.
+
+        Args:
+            batch_size (int, optional): Batch size of the next inference. Defaults to 1.
+
+        Returns:
+            np.ndarray: View of the interpreter input tensor.
+        """
+        if batch_size != LiteRT.input_details["shape"][0]:
+            LiteRT.__resize_batch(batch_size=batch_size)
+        return LiteRT.__input_tensor()
+
     @staticmethod
-    def forward(input: np.ndarray) -> np.ndarray:
+    def forward(input: np.ndarray = None, confidence_thresh: float = None) -> np.ndarray:
         """
         Performs inference on the given input tensor using the loaded TensorFlow Lite model.
+        If the batch size of the input differs from the allocated one, the input tensor is
+        resized and the interpreter tensors are re-allocated before inference.
         
         Args:
-            input (np.ndarray): Preprocessed input data to be fed to the model.
+            input (np.ndarray, optional): Preprocessed input data to be fed to the model. In zero-copy
+                mode it can be omitted when the input was written through `input_tensor`.
+            confidence_thresh (float, optional): In zero-copy mode, only the anchors whose best class
+                score exceeds this threshold are decoded. Defaults to None (all anchors).
 
         Returns:
             np.ndarray: Model output tensor, optionally scaled based on output quantization parameters.
+                In zero-copy mode, the tensor is a reused buffer and, with a confidence threshold,
+                holds the surviving anchors only.
 
         Raises:
             ValueError: If inference is attempted without a loaded model.
@@ -77,6 +132,12 @@ class LiteRT:
         if LiteRT.__inferencer is None:
             raise ValueError("Model not loaded. Please call LiteRT.load() before inference.")
 
+        if LiteRT.zero_copy:
+            return LiteRT.__forward_zero_copy(input=input, confidence_thresh=confidence_thresh)
+
+        if input.shape[0] != LiteRT.input_details["shape"][0]:
+            LiteRT.__resize_batch(batch_size=input.shape[0])
+
         LiteRT.__inferencer.set_tensor(LiteRT.input_details["index"], input)
         LiteRT.__inferencer.invoke()
 
@@ -89,6 +150,104 @@ class LiteRT:
 
         return output
 
+    @staticmethod
+    def __forward_zero_copy(input: np.ndarray, confidence_thresh: float) -> np.ndarray:
+        """
+        Performs inference reading the output through a view of the interpreter tensor. The best
+        class score of each anchor is compared with the threshold in the quantized domain, then only
+        the surviving anchors are dequantized and scaled, into a reused buffer.
+
+        Args:
+            input (np.ndarray): Preprocessed input data, or None if already written in place.
+            confidence_thresh (float): Minimum best class score of the decoded anchors, or None.
+
+        Returns:
+            np.ndarray: Decoded output of shape (batch, 4 + classes, surviving anchors).
+        """
+        if input is not None:
+            LiteRT.input_tensor(batch_size=input.shape[0])[...] = input
+
+        LiteRT.__inferencer.invoke()
+
+        raw_output: np.ndarray = LiteRT.__output_tensor()  # (batch, 4 + classes, anchors)
+        quantized: bool = LiteRT.output_details["type"] != np.float32
+        scale = LiteRT.output_details["scale"]
+        zero_point = LiteRT.output_details["zero_point"]
+
+        anchors: np.ndarray = None
+        if confidence_thresh is not None:
+            if quantized:
+                # (q - zero_point) * scale > thresh  <=>  q > thresh / scale + zero_point
+                confidence_thresh = np.floor(confidence_thresh / scale + zero_point)
+            best_scores: np.ndarray = raw_output[:, 4:].max(axis=1)  # (batch, anchors)
+            anchors = np.flatnonzero((best_scores > confidence_thresh).any(axis=0))
+
+        batch_size, rows, anchors_count = raw_output.shape
+        if anchors is not None:
+            anchors_count = len(anchors)
+        output: np.ndarray = LiteRT.__get_output_buffer(raw_output.shape, np.float32, (batch_size, rows, anchors_count))
+
+        if anchors is None:
+            np.copyto(output, raw_output, casting="unsafe")
+        elif quantized:
+            selected_output = LiteRT.__get_output_buffer(raw_output.shape, raw_output.dtype, output.shape)
+            np.take(raw_output, anchors, axis=2, out=selected_output)
+            np.copyto(output, selected_output, casting="unsafe")
+        else:
+            np.take(raw_output, anchors, axis=2, out=output)
+        del raw_output
+
+        if quantized:
+            output -= zero_point
+            output *= scale
+
+        output[:, 0:4:2] *= LiteRT.input_details["shape"][1]  # Scale x-coordinates
+        output[:, 1:4:2] *= LiteRT.input_details["shape"][2]  # Scale y-coordinates
+
+        return output
+
+    @staticmethod
+    def __get_output_buffer(full_shape: tuple, type: np.dtype, shape: tuple) -> np.ndarray:
+        """
+        Returns a contiguous view of the given shape over a reused buffer sized for the full output.
+
+        Args:
+            full_shape (tuple): Shape of the complete model output.
+            type (np.dtype): Data type of the buffer.
+            shape (tuple): Shape of the requested view, at most the full output size.
+
+        Returns:
+            np.ndarray: Contiguous view over the reused buffer.
+        """
+        key = (tuple(full_shape), np.dtype(type).str)
+        if key not in LiteRT.__output_buffers:
+            LiteRT.__output_buffers[key] = np.empty(int(np.prod(full_shape)), dtype=type)
+        return LiteRT.__output_buffers[key][:int(np.prod(shape))].reshape(shape)
+
+    @staticmethod
+    def __resize_batch(batch_size: int) -> None:
+        """
+        Resizes the batch dimension of the model input and re-allocates the interpreter tensors.
+
+        Args:
+            batch_size (int): New batch size of the model input.
+
+        Raises:
+            ValueError: If the model graph cannot be prepared for the requested batch size.
+        """
+        input_shape: np.ndarray = np.array(LiteRT.input_details["shape"])
+        input_shape[0] = batch_size
+
+        try:
+            LiteRT.__inferencer.resize_tensor_input(LiteRT.input_details["index"], input_shape)
+            LiteRT.__inferencer.allocate_tensors()
+        except RuntimeError as error:
+            raise ValueError(
+                f"Model cannot be resized to a batch size of {batch_size}. "
+                "Export the model with a dynamic batch dimension for batched inference."
+            ) from error
+        LiteRT.input_details["shape"] = input_shape
+
     @staticmethod
     def __load_input_details() -> None:
         """
@@ -1,6 +1,10 @@
+import os
+import glob
+import hashlib
+import platform
 import numpy as np
 import onnxruntime as ort
-import multiprocessing
+from model.runtimeconfig import RuntimeConfig
 
 class OnnxRT:
     """
@@ -10,16 +14,56 @@ class OnnxRT:
     Attributes:
         __inferencer (ort.InferenceSession): 
             Private attribute holding the ONNX Runtime session instance for model inference.
-        input_details (dict): Dictionary containing model input details, such as name, type, shape, scale, and zero_point.
-        output_details (dict): Dictionary containing model output details, including name, type, scale, and zero_point.
+        input_details (dict): Dictionary containing model input details, such as name, type, shape, scale, zero_point
+            and whether the batch dimension is dynamic.
+        output_details (dict): Dictionary containing model output details, including name, type, shape, scale,
+            and zero_point.
+        __io_binding (ort.IOBinding):
+            Private attribute holding the I/O binding of the session, when zero-copy execution is enabled.
+        __bound_inputs (list):
+            Private attribute holding (input array, OrtValue) pairs already bound to the session, from
+            the least to the most recently used.
+        __input_buffers (dict):
+            Private attribute holding, per shape, the persistent input buffers used for arrays that cannot be bound.
+        __output_buffers (dict):
+            Private attribute holding, per batch size, the preallocated output buffers reused across frames.
+        __buffer_count (int):
+            Number of output buffers cycled per batch size in zero-copy execution.
+        model_cache_status (str):
+            Outcome of the optimized model cache lookup on the last load: "hit", "miss" or "disabled".
     """
 
+    __MAX_BOUND_INPUTS: int = 8
+    __EXECUTION_MODES: dict = {
+        "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+        "parallel": ort.ExecutionMode.ORT_PARALLEL,
+    }
+    __GRAPH_OPTIMIZATION_LEVELS: dict = {
+        "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+
     __inferencer: ort.InferenceSession = None
+    __io_binding: ort.IOBinding = None
+    __bound_inputs: list = list()
+    __input_buffers: dict = dict()
+    __output_buffers: dict = dict()
+    __next_output_buffer: dict = dict()
+    __buffer_count: int = 1
     input_details: dict = dict()
     output_details: dict = dict()
+    model_cache_status: str = "disabled"
 
     @staticmethod
-    def load(model_path: str, half_cores: bool) -> None:
+    def load(
+        model_path: str,
+        half_cores: bool,
+        io_binding: bool = False,
+        runtime_config: RuntimeConfig = RuntimeConfig(),
+        model_cache_folder: str = None
+    ) -> None:
         """
         Loads an ONNX model from the specified path and initializes the ONNX runtime session.
         Populates input and output details for the model.
@@ -27,41 +71,108 @@ class OnnxRT:
         Args:
             model_path (str): Path to the ONNX model file.
             half_cores (bool): Use only half of CPU cores for inference
+            io_binding (bool, optional): Run the session through an I/O binding that reuses bound
+                input buffers and preallocated output buffers across frames. Defaults to False.
+            runtime_config (RuntimeConfig, optional): Threading and session tuning options. An explicit
+                number of intra-op threads overrides `half_cores`. Defaults to the runtime defaults.
+            model_cache_folder (str, optional): Folder where the graph optimized by ONNX Runtime is
+                saved on the first load and reloaded, without optimizing it again, on later ones.
+                Defaults to None (no cache).
 
         Raises:
             RuntimeError: If the model file path is invalid or the session fails to load.
         """
         
-        num_cores = multiprocessing.cpu_count()
-        if half_cores:
-            num_cores = num_cores // 2
+        num_cores = runtime_config.get_intra_op_threads(half_cores=half_cores)
         
         print(f"Number of cores: {num_cores}")
         session_options = ort.SessionOptions()
         session_options.intra_op_num_threads = num_cores
+        if runtime_config.inter_op_threads is not None:
+            session_options.inter_op_num_threads = runtime_config.inter_op_threads
+        session_options.execution_mode = OnnxRT.__EXECUTION_MODES[runtime_config.execution_mode]
+        session_options.graph_optimization_level = OnnxRT.__GRAPH_OPTIMIZATION_LEVELS[
+            runtime_config.graph_optimization_level
+        ]
+        # Idle threads busy-wait for work by default, which shows up as CPU load and current draw
+        spinning = "1" if runtime_config.allow_spinning else "0"
+        session_options.add_session_config_entry("session.intra_op.allow_spinning", spinning)
+        session_options.add_session_config_entry("session.inter_op.allow_spinning", spinning)
 
-        OnnxRT.__inferencer = ort.InferenceSession(model_path, sess_options=session_options)
+        OnnxRT.model_cache_status = "disabled"
+        if model_cache_folder is not None and runtime_config.graph_optimization_level != "disable":
+            OnnxRT.__inferencer = OnnxRT.__load_cached_session(
+                model_path=model_path,
+                model_cache_folder=model_cache_folder,
+                session_options=session_options,
+                runtime_config=runtime_config
+            )
+        else:
+            OnnxRT.__inferencer = ort.InferenceSession(model_path, sess_options=session_options)
         
         OnnxRT.__load_input_details()
         OnnxRT.__load_output_details()
 
+        OnnxRT.__io_binding = OnnxRT.__inferencer.io_binding() if io_binding else None
+        OnnxRT.__bound_inputs = list()
+        OnnxRT.__input_buffers = dict()
+        OnnxRT.__output_buffers = dict()
+        OnnxRT.__next_output_buffer = dict()
+
+    @staticmethod
+    def clear_model_cache(model_cache_folder: str) -> None:
+        """
+        Removes every optimized model saved in the cache folder.
+
+        Args:
+            model_cache_folder (str): Folder holding the optimized models.
+        """
+        for cached_model_path in glob.glob(os.path.join(model_cache_folder, "*.onnx")):
+            os.remove(cached_model_path)
+
     @staticmethod
-    def forward(input: np.ndarray) -> np.ndarray:
+    def set_buffer_count(buffer_count: int) -> None:
+        """
+        Sets the number of output buffers cycled per batch size in zero-copy execution. With more
+        than one, an output returned by `forward` is not overwritten by the next `buffer_count - 1` calls.
+
+        Args:
+            buffer_count (int): Number of output buffers cycled per batch size.
+        """
+        OnnxRT.__buffer_count = max(1, buffer_count)
+        OnnxRT.__output_buffers = dict()
+        OnnxRT.__next_output_buffer = dict()
+
+    @staticmethod
+    def forward(input: np.ndarray, confidence_thresh: float = None) -> np.ndarray:
         """
         Performs inference on the given input tensor using the loaded ONNX model.
 
         Args:
             input (np.ndarray): Preprocessed input data to be fed to the model.
+            confidence_thresh (float, optional): Accepted for interface parity with LiteRT; the whole
+                output is always returned. Defaults to None.
 
         Returns:
             np.ndarray: Model output tensor, optionally scaled based on output quantization parameters.
+                With I/O binding, the tensor is a preallocated buffer reused by later calls.
 
         Raises:
-            ValueError: If inference is attempted without a loaded model.
+            ValueError: If inference is attempted without a loaded model, or if the input batch size
+                differs from the static batch size of the model.
         """
         if OnnxRT.__inferencer is None:
             raise ValueError("Model not loaded. Please call OnnxRT.load() before inference.")
 
+        if not OnnxRT.input_details["dynamic_batch"] and input.shape[0] != OnnxRT.input_details["shape"][0]:
+            raise ValueError(
+                f"Model has a static batch size of {OnnxRT.input_details['shape'][0]}, got {input.shape[0]}. "
+                "Export the model with a dynamic batch dimension for batched inference."
+            )
+
+        if OnnxRT.__io_binding is not None:
+            return OnnxRT.__forward_io_binding(input=input)
+
         input_name = OnnxRT.input_details["name"]
         output_name = OnnxRT.output_details["name"]
         
@@ -73,6 +184,181 @@ class OnnxRT:
 
         return output
 
+    @staticmethod
+    def __forward_io_binding(input: np.ndarray) -> np.ndarray:
+        """
+        Performs inference through the I/O binding. Input arrays are bound once and rebound only
+        when a new array is given; the output is written by the runtime straight into a
+        preallocated buffer, and dequantized into another reused buffer when needed.
+
+        Args:
+            input (np.ndarray): Preprocessed input data to be fed to the model.
+
+        Returns:
+            np.ndarray: Model output tensor, held in a reused buffer.
+        """
+        OnnxRT.__io_binding.bind_ortvalue_input(OnnxRT.input_details["name"], OnnxRT.__get_bound_input(input))
+
+        output, output_value, dequantized_output = OnnxRT.__get_output_buffer(batch_size=input.shape[0])
+        if output is None:
+            # Output shape is not fully known: let the runtime allocate it
+            OnnxRT.__io_binding.bind_output(OnnxRT.output_details["name"])
+        else:
+            OnnxRT.__io_binding.bind_ortvalue_output(OnnxRT.output_details["name"], output_value)
+
+        OnnxRT.__inferencer.run_with_iobinding(OnnxRT.__io_binding)
+
+        if output is None:
+            output = OnnxRT.__io_binding.copy_outputs_to_cpu()[0]
+            if OnnxRT.output_details["type"] != np.float32:
+                output = (output.astype(np.float32) - OnnxRT.output_details["zero_point"]) * OnnxRT.output_details["scale"]
+            return output
+
+        if dequantized_output is None:
+            return output
+
+        np.copyto(dequantized_output, output)
+        if OnnxRT.output_details["zero_point"] != 0:
+            dequantized_output -= OnnxRT.output_details["zero_point"]
+        if OnnxRT.output_details["scale"] != 1:
+            dequantized_output *= OnnxRT.output_details["scale"]
+        return dequantized_output
+
+    @staticmethod
+    def __get_bound_input(input: np.ndarray) -> 'ort.OrtValue':
+        """
+        Returns the OrtValue wrapping the given input without copying it. Arrays seen before reuse
+        their OrtValue, so the persistent tensors of the preprocessing are wrapped only once. When
+        all the slots are taken the least recently used array is released, so one-off arrays (e.g.
+        concatenated batches) do not stay pinned or take the slots of the reused ones. Arrays that
+        cannot be wrapped are copied into a persistent input buffer.
+
+        Args:
+            input (np.ndarray): Preprocessed input data to be fed to the model.
+
+        Returns:
+            ort.OrtValue: Value to be bound as session input.
+        """
+        for index, (bound_input, input_value) in enumerate(OnnxRT.__bound_inputs):
+            if bound_input is input:
+                OnnxRT.__bound_inputs.append(OnnxRT.__bound_inputs.pop(index))
+                return input_value
+
+        bindable: bool = (
+            type(input) is np.ndarray
+            and input.flags["C_CONTIGUOUS"]
+            and input.dtype == OnnxRT.input_details["type"]
+        )
+        if bindable:
+            if len(OnnxRT.__bound_inputs) >= OnnxRT.__MAX_BOUND_INPUTS:
+                OnnxRT.__bound_inputs.pop(0)
+            input_value = ort.OrtValue.ortvalue_from_numpy(input)
+            OnnxRT.__bound_inputs.append((input, input_value))
+            return input_value
+
+        # Other arrays are copied into a persistent input buffer of the same shape
+        if input.shape not in OnnxRT.__input_buffers:
+            buffer = np.empty(input.shape, dtype=OnnxRT.input_details["type"])
+            OnnxRT.__input_buffers[input.shape] = (buffer, ort.OrtValue.ortvalue_from_numpy(buffer))
+
+        buffer, input_value = OnnxRT.__input_buffers[input.shape]
+        np.copyto(buffer, input, casting="unsafe")
+        return input_value
+
+    @staticmethod
+    def __get_output_buffer(batch_size: int) -> tuple:
+        """
+        Returns the next preallocated output buffer for the given batch size, allocating the ring
+        on first use.
+
+        Args:
+            batch_size (int): Batch size of the current input.
+
+        Returns:
+            tuple: (output array, OrtValue wrapping it, dequantized float32 array or None), or
+                (None, None, None) when the output shape has symbolic dimensions.
+        """
+        output_shape: list = list(OnnxRT.output_details["shape"])
+        output_shape[0] = batch_size
+        if any(not isinstance(dim, int) for dim in output_shape):
+            return None, None, None
+
+        buffers: list = OnnxRT.__output_buffers.setdefault(batch_size, [])
+        idx: int = OnnxRT.__next_output_buffer.get(batch_size, 0)
+        if idx == len(buffers):
+            output = np.empty(output_shape, dtype=OnnxRT.output_details["type"])
+            dequantized_output = None
+            if OnnxRT.output_details["type"] != np.float32:
+                dequantized_output = np.empty(output_shape, dtype=np.float32)
+            buffers.append((output, ort.OrtValue.ortvalue_from_numpy(output), dequantized_output))
+
+        OnnxRT.__next_output_buffer[batch_size] = (idx + 1) % OnnxRT.__buffer_count
+        return buffers[idx]
+
+    @staticmethod
+    def __load_cached_session(
+        model_path: str,
+        model_cache_folder: str,
+        session_options: ort.SessionOptions,
+        runtime_config: RuntimeConfig
+    ) -> ort.InferenceSession:
+        """
+        Creates the session from the optimized model cached for this model, ONNX Runtime version and
+        session options, with graph optimization disabled. On a cache miss, the session optimizes the
+        original model and saves the result, which is moved into place atomically so concurrent
+        loads never read a partial file. A cached model that fails to load is replaced.
+
+        Args:
+            model_path (str): Path to the original ONNX model file.
+            model_cache_folder (str): Folder holding the optimized models.
+            session_options (ort.SessionOptions): Options of the session to create.
+            runtime_config (RuntimeConfig): Threading and session tuning options, part of the cache key.
+
+        Returns:
+            ort.InferenceSession: Session running the optimized graph.
+        """
+        model_hash = hashlib.sha256()
+        with open(model_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                model_hash.update(chunk)
+
+        # Optimized graphs can hold kernels specific to the runtime build and the CPU, so those are part of the key
+        cache_key = hashlib.sha256("|".join([
+            model_hash.hexdigest(),
+            ort.__version__,
+            platform.machine(),
+            ",".join(ort.get_available_providers()),
+            runtime_config.graph_optimization_level,
+            runtime_config.execution_mode,
+        ]).encode()).hexdigest()[:16]
+
+        model_name = os.path.splitext(os.path.basename(model_path))[0]
+        cached_model_path = os.path.join(model_cache_folder, f"{model_name}_{cache_key}.onnx")
+
+        if os.path.exists(cached_model_path):
+            graph_optimization_level = session_options.graph_optimization_level
+            session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            try:
+                session = ort.InferenceSession(cached_model_path, sess_options=session_options)
+                OnnxRT.model_cache_status = "hit"
+                return session
+            except Exception:
+                os.remove(cached_model_path)
+            session_options.graph_optimization_level = graph_optimization_level
+
+        os.makedirs(model_cache_folder, exist_ok=True)
+        temporary_model_path = f"{cached_model_path}.{os.getpid()}.tmp"
+        session_options.optimized_model_filepath = temporary_model_path
+        try:
+            session = ort.InferenceSession(model_path, sess_options=session_options)
+            os.replace(temporary_model_path, cached_model_path)
+        finally:
+            if os.path.exists(temporary_model_path):
+                os.remove(temporary_model_path)
+        OnnxRT.model_cache_status = "miss"
+
+        return session
+
     @staticmethod
     def __load_input_details() -> None:
         """
@@ -81,11 +367,18 @@ class OnnxRT:
 
         Notes:
             Shape order is adjusted to match TensorFlow conventions (batch, height, width, channels).
+            A symbolic (dynamic) batch dimension is reported as a batch size of 1.
         """
         input_meta = OnnxRT.__inferencer.get_inputs()[0]
+        input_shape: list = list(input_meta.shape)
+        dynamic_batch: bool = not isinstance(input_shape[0], int)
+        if dynamic_batch:
+            input_shape[0] = 1
+
         OnnxRT.input_details["name"] = input_meta.name
         OnnxRT.input_details["type"] = OnnxRT.__map_onnx_dtype(input_meta.type)
-        OnnxRT.input_details["shape"] = np.array(input_meta.shape)[[0, 2, 3, 1]]  # Adjust for (batch, height, width, channels)
+        OnnxRT.input_details["shape"] = np.array(input_shape)[[0, 2, 3, 1]]  # Adjust for (batch, height, width, channels)
+        OnnxRT.input_details["dynamic_batch"] = dynamic_batch
         OnnxRT.input_details["scale"] = 1.0
         OnnxRT.input_details["zero_point"] = 0.0
 
@@ -93,11 +386,12 @@ class OnnxRT:
     def __load_output_details() -> None:
         """
         Loads the output details of the ONNX model into the `output_details` dictionary.
-        Extracted details include output name, data type, scale, and zero_point.
+        Extracted details include output name, data type, shape, scale, and zero_point.
         """
         output_meta = OnnxRT.__inferencer.get_outputs()[0]
         OnnxRT.output_details["name"] = output_meta.name
         OnnxRT.output_details["type"] = OnnxRT.__map_onnx_dtype(output_meta.type)
+        OnnxRT.output_details["shape"] = list(output_meta.shape)
         OnnxRT.output_details["scale"] = 1.0
         OnnxRT.output_details["zero_point"] = 0.0
 
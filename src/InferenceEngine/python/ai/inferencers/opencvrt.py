@@ -0,0 +1,239 @@
+import cv2
+import numpy as np
+from typing import Tuple
+from model.runtimeconfig import RuntimeConfig
+
+class OpenCVRT:
+    """
+    OpenCVRT provides a runtime interface for loading and running ONNX models with the OpenCV DNN module.
+    The computation backend and target device are configurable, and the thread count is applied to
+    OpenCV's own thread pool.
+
+    Attributes:
+        __inferencer (cv2.dnn.Net):
+            Private attribute holding the network instance for model inference.
+        input_details (dict): Dictionary containing model input details, such as name, type, shape, mean,
+            scale, zero_point and whether the batch dimension is dynamic.
+        output_details (dict): Dictionary containing model output details, such as name and type.
+        __buffer_count (int):
+            Number of frames that can be in flight at once, above 1 outputs are copied out of the network.
+    """
+
+    __BACKENDS: dict = {
+        "default": "DNN_BACKEND_DEFAULT",
+        "opencv": "DNN_BACKEND_OPENCV",
+        "openvino": "DNN_BACKEND_INFERENCE_ENGINE",
+        "cuda": "DNN_BACKEND_CUDA",
+        "vulkan": "DNN_BACKEND_VKCOM",
+    }
+    __TARGETS: dict = {
+        "cpu": "DNN_TARGET_CPU",
+        "opencl": "DNN_TARGET_OPENCL",
+        "opencl_fp16": "DNN_TARGET_OPENCL_FP16",
+        "cuda": "DNN_TARGET_CUDA",
+        "cuda_fp16": "DNN_TARGET_CUDA_FP16",
+        "vulkan": "DNN_TARGET_VULKAN",
+    }
+
+    __inferencer: 'cv2.dnn.Net' = None
+    __buffer_count: int = 1
+    input_details: dict = dict()
+    output_details: dict = dict()
+
+    @staticmethod
+    def load(model_path: str, half_cores: bool, runtime_config: RuntimeConfig = RuntimeConfig()) -> None:
+        """
+        Loads an ONNX model from the specified path into an OpenCV DNN network, on the configured
+        backend and target. Populates input and output details for the model.
+
+        Args:
+            model_path (str): Path to the ONNX model file.
+            half_cores (bool): Use only half of CPU cores for inference
+            runtime_config (RuntimeConfig, optional): Threading options and OpenCV backend and target.
+                An explicit number of threads overrides `half_cores`. Defaults to the runtime defaults.
+
+        Raises:
+            RuntimeError: If the model file path is invalid or the network fails to load.
+            ValueError: If the backend or target is not available in the installed OpenCV build.
+        """
+        num_cores = runtime_config.get_intra_op_threads(half_cores=half_cores)
+
+        print(f"Number of cores: {num_cores}")
+        cv2.setNumThreads(num_cores)
+
+        OpenCVRT.__inferencer = cv2.dnn.readNetFromONNX(model_path)
+        OpenCVRT.__inferencer.setPreferableBackend(
+            OpenCVRT.__get_constant(OpenCVRT.__BACKENDS, runtime_config.opencv_backend, "backend")
+        )
+        OpenCVRT.__inferencer.setPreferableTarget(
+            OpenCVRT.__get_constant(OpenCVRT.__TARGETS, runtime_config.opencv_target, "target")
+        )
+
+        OpenCVRT.__load_input_details(model_path=model_path)
+        OpenCVRT.__load_output_details()
+        OpenCVRT.__buffer_count = 1
+
+    @staticmethod
+    def set_buffer_count(buffer_count: int) -> None:
+        """
+        Sets how many frames can be in flight at once. With more than one, outputs are copied out of
+        the network, as some OpenCV versions return views of the output blob overwritten by the next
+        call.
+
+        Args:
+            buffer_count (int): Number of frames that can be in flight at once.
+        """
+        OpenCVRT.__buffer_count = buffer_count
+
+    @staticmethod
+    def forward(input: np.ndarray, confidence_thresh: float = None) -> np.ndarray:
+        """
+        Performs inference on the given input tensor using the loaded network.
+
+        Args:
+            input (np.ndarray): Preprocessed input data to be fed to the model.
+            confidence_thresh (float, optional): Accepted for interface parity with LiteRT; the whole
+                output is always returned. Defaults to None.
+
+        Returns:
+            np.ndarray: Model output tensor of shape (batch, 4 + classes, anchors).
+
+        Raises:
+            ValueError: If inference is attempted without a loaded model, or if the input batch size
+                differs from the static batch size of the model.
+        """
+        if OpenCVRT.__inferencer is None:
+            raise ValueError("Model not loaded. Please call OpenCVRT.load() before inference.")
+
+        if not OpenCVRT.input_details["dynamic_batch"] and input.shape[0] != OpenCVRT.input_details["shape"][0]:
+            raise ValueError(
+                f"Model has a static batch size of {OpenCVRT.input_details['shape'][0]}, got {input.shape[0]}. "
+                "Export the model with a dynamic batch dimension for batched inference."
+            )
+
+        # Half precision models are converted on load, so the network always takes float32 inputs
+        OpenCVRT.__inferencer.setInput(np.ascontiguousarray(input, dtype=np.float32))
+        output: np.ndarray = OpenCVRT.__inferencer.forward(OpenCVRT.output_details["name"])
+        if OpenCVRT.__buffer_count > 1:
+            output = output.copy()
+
+        return output
+
+    @staticmethod
+    def __get_constant(constants: dict, name: str, kind: str) -> int:
+        """
+        Resolves an OpenCV DNN backend or target by name.
+
+        Args:
+            constants (dict): Names of the `cv2.dnn` constants, by option value.
+            name (str): Option value.
+            kind (str): "backend" or "target", for the error message.
+
+        Returns:
+            int: Value of the `cv2.dnn` constant.
+
+        Raises:
+            ValueError: If the name is unknown or the constant is missing from the installed OpenCV build.
+        """
+        if name not in constants or not hasattr(cv2.dnn, constants[name]):
+            raise ValueError(f"OpenCV DNN {kind} '{name}' is not available in OpenCV {cv2.__version__}.")
+        return getattr(cv2.dnn, constants[name])
+
+    @staticmethod
+    def __load_input_details(model_path: str) -> None:
+        """
+        Loads the input details of the ONNX model into the `input_details` dictionary. Extracted
+        details include input name, data type, shape, mean, scale, and zero_point.
+
+        Notes:
+            Shape order is adjusted to match TensorFlow conventions (batch, height, width, channels).
+            A symbolic (dynamic) batch dimension is reported as a batch size of 1.
+        """
+        input_name, input_shape = OpenCVRT.__read_input_shape(model_path=model_path)
+        dynamic_batch: bool = input_shape[0] is None
+        if dynamic_batch:
+            input_shape[0] = 1
+
+        OpenCVRT.input_details["name"] = input_name
+        OpenCVRT.input_details["type"] = np.float32
+        OpenCVRT.input_details["shape"] = np.array(input_shape)[[0, 2, 3, 1]]  # Adjust for (batch, height, width, channels)
+        OpenCVRT.input_details["dynamic_batch"] = dynamic_batch
+        OpenCVRT.input_details["mean"] = (0.0, 0.0, 0.0)
+        OpenCVRT.input_details["scale"] = 1.0
+        OpenCVRT.input_details["zero_point"] = 0.0
+
+    @staticmethod
+    def __load_output_details() -> None:
+        """
+        Loads the output details of the network into the `output_details` dictionary.
+        Extracted details include output name and data type.
+        """
+        OpenCVRT.output_details["name"] = OpenCVRT.__inferencer.getUnconnectedOutLayersNames()[0]
+        OpenCVRT.output_details["type"] = np.float32
+
+    @staticmethod
+    def __read_input_shape(model_path: str) -> Tuple[str, list]:
+        """
+        Reads the name and shape of the first graph input from the ONNX protobuf, which OpenCV does
+        not expose, without depending on the `onnx` package. Only the fields on the path to the input
+        shape are decoded (ModelProto.graph, GraphProto.input, ValueInfoProto.type, TypeProto.tensor_type,
+        TypeProto.Tensor.shape, TensorShapeProto.dim); the others are skipped by their length.
+
+        Args:
+            model_path (str): Path to the ONNX model file.
+
+        Returns:
+            Tuple[str, list]: Input name and shape (batch, channels, height, width), with None for
+                symbolic dimensions.
+
+        Raises:
+            ValueError: If the model has no graph input with a tensor shape.
+        """
+        def fields(data: memoryview):
+            offset = 0
+            while offset < len(data):
+                key, offset = varint(data, offset)
+                number, wire_type = key >> 3, key & 0x7
+                if wire_type == 0:
+                    value, offset = varint(data, offset)
+                elif wire_type == 1:
+                    value, offset = None, offset + 8
+                elif wire_type == 2:
+                    length, offset = varint(data, offset)
+                    value, offset = data[offset:offset + length], offset + length
+                elif wire_type == 5:
+                    value, offset = None, offset + 4
+                else:
+                    raise ValueError(f"Model '{model_path}' is not a valid ONNX file.")
+                yield number, value
+
+        def varint(data: memoryview, offset: int) -> Tuple[int, int]:
+            value, shift = 0, 0
+            while True:
+                byte = data[offset]
+                offset += 1
+                value |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    return value, offset
+                shift += 7
+
+        def field(data: memoryview, number: int) -> memoryview:
+            return next((value for field_number, value in fields(data) if field_number == number), None)
+
+        with open(model_path, "rb") as file:
+            model = memoryview(file.read())
+
+        graph = field(model, 7)
+        value_info = field(graph, 11) if graph is not None else None
+        type_proto = field(value_info, 2) if value_info is not None else None
+        tensor_type = field(type_proto, 1) if type_proto is not None else None
+        shape = field(tensor_type, 2) if tensor_type is not None else None
+        if shape is None:
+            raise ValueError(f"Model '{model_path}' has no graph input with a tensor shape.")
+
+        input_shape: list = list()
+        for number, dimension in fields(shape):
+            if number == 1:
+                # Dimensions hold either a value (field 1) or a symbolic name (field 2)
+                input_shape.append(field(dimension, 1))
+        return bytes(field(value_info, 1)).decode(), input_shape
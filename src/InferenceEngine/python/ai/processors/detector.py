@@ -1,35 +1,95 @@
-from ai.inferencers.litert import LiteRT
-from ai.inferencers.onnxrt import OnnxRT
 from ai.architectures.ultralyticsyolo import UltralyticsYOLO
+from image.fusedpreprocessing import FusedImagePreprocessing
+from model.detection import DetectionBatch
+from model.runtimeconfig import RuntimeConfig
 
+import importlib
 import numpy as np
 import time
+from typing import Dict, List, Tuple
 
 class Detector:
     """
     The Detector class serves as an interface for initializing, processing, and running inference on YOLO models.
     It supports multiple inference backends, including LiteRT, OnnxRT, and OpenCVRT, and can use various YOLO architectures
-    (YOLOv5, YOLOv8, YOLO11). Detector tracks the time taken for preprocessing, inference, and postprocessing.
+    (YOLOv5, YOLOv8, YOLO11). Detector tracks the time taken for preprocessing, inference, and postprocessing,
+    measured with `time.perf_counter_ns` and kept as float milliseconds.
+
+    Inference backends are kept in a registry keyed by model file extension and are only imported
+    when a model of their format is loaded, so a run never pays for the runtimes it does not use.
+    Several backends can serve the same extension, the first registered one being the default.
 
     Attributes:
+        __backends (Dict[str, List[dict]]):
+            Registry of inference backends by model file extension, holding the name, module and class
+            of each inferencer, its architecture format and the `init` options its `load` accepts.
+        __inferencer (LiteRT, OnnxRT or OpenCVRT):
+            Inferencer class of the backend selected for the current model.
+        backend (str):
+            Name of the backend selected for the current model.
         __architecture_format (str): 
             Specifies the architecture format ('litert' or 'onnx') for the current model.
         __architecture (YOLO11, YOLOv8, or YOLOv5): 
             An instance of the appropriate YOLO architecture used for the current model.
-        pre_process_time (int): 
-            Duration in milliseconds taken for preprocessing.
-        inference_time (int): 
-            Duration in milliseconds taken for inference.
-        post_process_time (int): 
-            Duration in milliseconds taken for postprocessing.
+        pre_process_time (float): 
+            Duration in milliseconds taken for preprocessing (amortized per image for batches).
+        inference_time (float): 
+            Duration in milliseconds taken for inference (amortized per image for batches).
+        post_process_time (float): 
+            Duration in milliseconds taken for postprocessing (amortized per image for batches).
+        batch_size (int):
+            Number of images processed by the last call to `run` or `run_batch`.
+        import_time (float):
+            Duration in milliseconds taken to import the inference backend.
+        load_time (float):
+            Duration in milliseconds taken to load the model into the inference backend.
+        first_inference_time (float):
+            Duration in milliseconds taken by the first inference after loading the model, or None.
+        model_cache (str):
+            Outcome of the optimized model cache lookup: "hit", "miss" or "disabled".
     """
 
+    __backends: Dict[str, List[dict]] = {
+        ".tflite": [
+            {
+                "name": "litert",
+                "module": "ai.inferencers.litert",
+                "class": "LiteRT",
+                "format": "litert",
+                "options": ("zero_copy",),
+            },
+        ],
+        ".onnx": [
+            {
+                "name": "onnxrt",
+                "module": "ai.inferencers.onnxrt",
+                "class": "OnnxRT",
+                "format": "onnx",
+                "options": ("io_binding", "model_cache_folder"),
+            },
+            {
+                "name": "opencvrt",
+                "module": "ai.inferencers.opencvrt",
+                "class": "OpenCVRT",
+                "format": "onnx",
+                "options": (),
+            },
+        ],
+    }
+
+    __inferencer: type = None
+    backend: str = None
     __architecture_format: str
     __architecture: UltralyticsYOLO
 
-    pre_process_time: int
-    inference_time: int
-    post_process_time: int
+    pre_process_time: float
+    inference_time: float
+    post_process_time: float
+    batch_size: int = 1
+    import_time: float = 0.0
+    load_time: float = 0.0
+    first_inference_time: float = None
+    model_cache: str = "disabled"
 
     @staticmethod
     def init(
@@ -37,7 +97,13 @@ class Detector:
         score_thresh: float,
         confidence_thresh: float,
         iou_thresh: float,
-        half_cores: bool
+        half_cores: bool,
+        class_aware_nms: bool = False,
+        io_binding: bool = False,
+        zero_copy: bool = False,
+        runtime_config: RuntimeConfig = RuntimeConfig(),
+        model_cache_folder: str = None,
+        backend: str = None
     ):
         """
         Initializes the Detector with the model path, thresholds, and specified inference backend.
@@ -49,13 +115,34 @@ class Detector:
             confidence_thresh (float): Confidence threshold for filtering detections.
             iou_thresh (float): Intersection-over-Union threshold for Non-Maximum Suppression.
             half_cores (bool): Use only half of CPU cores for inference
+            class_aware_nms (bool, optional): Apply Non-Maximum Suppression per class. Defaults to False.
+            io_binding (bool, optional): Run ONNX models through an I/O binding with reused input and
+                output buffers. Defaults to False.
+            zero_copy (bool, optional): Run LiteRT models through views of the interpreter tensors,
+                preprocessing into the input tensor and decoding only the confident anchors of the
+                output. Defaults to False.
+            runtime_config (RuntimeConfig, optional): Threading, session tuning and CPU affinity options
+                of the inference backend. Defaults to the runtime defaults.
+            model_cache_folder (str, optional): Folder caching the graphs optimized by ONNX Runtime,
+                so later loads skip the optimization. Defaults to None (no cache).
+            backend (str, optional): Name of the inference backend, among the ones registered for the
+                model file extension ("onnxrt" or "opencvrt" for ONNX models). Defaults to None (the
+                first one registered).
 
         Raises:
-            ValueError: If an invalid model file extension is provided.
+            ValueError: If an invalid model file extension or backend is provided.
         """
+        runtime_config.apply_cpu_affinity()
         input_details = Detector.__start_inferencer(
             model_path=model_path,
-            half_cores=half_cores
+            half_cores=half_cores,
+            runtime_config=runtime_config,
+            backend=backend,
+            backend_options={
+                "io_binding": io_binding,
+                "zero_copy": zero_copy,
+                "model_cache_folder": model_cache_folder,
+            }
         )
 
         Detector.__load_architecture(
@@ -63,78 +150,347 @@ class Detector:
             input_details=input_details,
             score_thresh=score_thresh,
             confidence_thresh=confidence_thresh,
-            iou_thresh=iou_thresh
+            iou_thresh=iou_thresh,
+            class_aware_nms=class_aware_nms
         )
 
     @staticmethod
-    def run(image):
+    def register_backend(
+        extension: str,
+        module: str,
+        class_name: str,
+        format: str,
+        options: Tuple[str, ...] = (),
+        name: str = None
+    ):
+        """
+        Registers an inference backend for the models with the given file extension. The module is
+        only imported when such a model is loaded. The inferencer class must provide `load`,
+        `forward` and `input_details` like LiteRT and OnnxRT, and `set_buffer_count` if it reuses
+        output buffers. A backend registered under an existing name replaces it, otherwise it is
+        added after the default one.
+
+        Args:
+            extension (str): Model file extension, e.g. ".onnx".
+            module (str): Import path of the module defining the inferencer.
+            class_name (str): Name of the inferencer class in the module.
+            format (str): Architecture format of the models, selecting the preprocessing layout
+                ("litert" for NHWC, "onnx" for NCHW).
+            options (Tuple[str, ...], optional): Names of the `init` options forwarded to `load`.
+                Defaults to none.
+            name (str, optional): Name selecting the backend in `init`. Defaults to the lowercase
+                class name.
+        """
+        entry: dict = {
+            "name": name if name is not None else class_name.lower(),
+            "module": module,
+            "class": class_name,
+            "format": format,
+            "options": tuple(options),
+        }
+        backends: List[dict] = Detector.__backends.setdefault(extension, list())
+        for idx, backend in enumerate(backends):
+            if backend["name"] == entry["name"]:
+                backends[idx] = entry
+                return
+        backends.append(entry)
+
+    @staticmethod
+    def run(image, columnar: bool = False):
         """
         Runs inference on a given image, returning detected bounding boxes, class IDs, and scores.
         Times each step of the detection process.
 
         Args:
             image (np.ndarray): Input image to be processed.
+            columnar (bool, optional): Return the array-backed DetectionBatch instead of a list of
+                Detection objects. Defaults to False.
 
         Returns:
-            List[Detection]
-                List of computed detections with bbox, score and class ID.
+            List[Detection] or DetectionBatch
+                Computed detections with bbox, score and class ID.
         """
         
         input: np.ndarray
         output: np.ndarray
 
         # Preprocess step
-        start_ts = time.time()
-        if Detector.__architecture_format == "litert":
-            input = Detector.__architecture.pre_process(image=image, litert_model=True)
-        elif Detector.__architecture_format == "onnx":
-            input = Detector.__architecture.pre_process(image=image, litert_model=False)
-        Detector.pre_process_time = int((time.time() - start_ts) * 1000)
+        start_ts = time.perf_counter_ns()
+        input = Detector.pre_process(images=[image])
+        Detector.pre_process_time = (time.perf_counter_ns() - start_ts) / 1e6
+
+        # Inference step
+        start_ts = time.perf_counter_ns()
+        output = Detector.forward(input=input)
+        Detector.inference_time = (time.perf_counter_ns() - start_ts) / 1e6
+
+        # Postprocess step
+        start_ts = time.perf_counter_ns()
+        detections = Detector.post_process(output=output, images=[image], columnar=columnar)[0]
+        Detector.post_process_time = (time.perf_counter_ns() - start_ts) / 1e6
+        Detector.batch_size = 1
+
+        return detections
+
+    @staticmethod
+    def run_batch(images: List[np.ndarray], columnar: bool = False) -> list:
+        """
+        Runs inference on a batch of images with a single forward pass, returning the detections
+        of each image. Step durations are amortized over the batch, so `pre_process_time`,
+        `inference_time` and `post_process_time` hold per-image values.
+
+        Args:
+            images (List[np.ndarray]): Input images to be processed.
+            columnar (bool, optional): Return one array-backed DetectionBatch per image instead of
+                lists of Detection objects. Defaults to False.
+
+        Returns:
+            List[List[Detection]] or List[DetectionBatch]
+                Computed detections of each input image, in the same order.
+        """
+        input: np.ndarray
+        output: np.ndarray
+        batch_size = len(images)
+
+        # Preprocess step
+        start_ts = time.perf_counter_ns()
+        input = Detector.pre_process(images=images)
+        Detector.pre_process_time = (time.perf_counter_ns() - start_ts) / 1e6 / batch_size
 
         # Inference step
-        start_ts = time.time()
-        if Detector.__architecture_format == "litert":
-            output = LiteRT.forward(input=input)
-        elif Detector.__architecture_format == "onnx":
-            output = OnnxRT.forward(input=input)
-        Detector.inference_time = int((time.time() - start_ts) * 1000)
+        start_ts = time.perf_counter_ns()
+        output = Detector.forward(input=input)
+        Detector.inference_time = (time.perf_counter_ns() - start_ts) / 1e6 / batch_size
 
         # Postprocess step
-        start_ts = time.time()
-        detections = Detector.__architecture.post_process(output=output, image=image)
-        Detector.post_process_time = int((time.time() - start_ts) * 1000)
+        start_ts = time.perf_counter_ns()
+        detections = Detector.post_process(output=output, images=images, columnar=columnar)
+        Detector.post_process_time = (time.perf_counter_ns() - start_ts) / 1e6 / batch_size
+        Detector.batch_size = batch_size
 
         return detections
 
     @staticmethod
-    def __start_inferencer(model_path: str, half_cores: bool) -> dict:
+    def run_preprocessed(
+        inputs: List[np.ndarray],
+        image_shapes: List[Tuple[int, ...]],
+        columnar: bool = False
+    ) -> list:
         """
-        Initializes the inference backend based on the model file type (.tflite or .onnx).
-        Loads the model using the specified inferencer and extracts input details.
+        Runs inference on already preprocessed tensors, such as the ones of a `TensorCache`, with
+        a single forward pass. The preprocessing step only gathers the tensors into the model
+        input, so its duration is the cost of reading them. Step durations are amortized over
+        the batch.
+
+        Args:
+            inputs (List[np.ndarray]): Preprocessed tensors of shape (1, ...), one per image, in
+                the layout and data type given by `get_input_format`.
+            image_shapes (List[Tuple[int, ...]]): Shapes of the original images, in the same order.
+            columnar (bool, optional): Return one array-backed DetectionBatch per image instead of
+                lists of Detection objects. Defaults to False.
+
+        Returns:
+            List[List[Detection]] or List[DetectionBatch]
+                Computed detections of each image, in the same order.
+        """
+        input: np.ndarray
+        output: np.ndarray
+        batch_size = len(inputs)
+
+        # Preprocess step
+        start_ts = time.perf_counter_ns()
+        input = np.concatenate(inputs, axis=0)
+        Detector.pre_process_time = (time.perf_counter_ns() - start_ts) / 1e6 / batch_size
+
+        # Inference step
+        start_ts = time.perf_counter_ns()
+        output = Detector.forward(input=input)
+        Detector.inference_time = (time.perf_counter_ns() - start_ts) / 1e6 / batch_size
+
+        # Postprocess step
+        start_ts = time.perf_counter_ns()
+        detections = Detector.post_process(output=output, image_shapes=image_shapes, columnar=columnar)
+        Detector.post_process_time = (time.perf_counter_ns() - start_ts) / 1e6 / batch_size
+        Detector.batch_size = batch_size
+
+        return detections
+
+    @staticmethod
+    def get_input_format() -> dict:
+        """
+        Describes the input tensor expected by the loaded model, as produced by `pre_process`.
+
+        Returns:
+            dict: Input size (height, width), layout ("nhwc" or "nchw"), data type, and
+                quantization scale and zero point.
+        """
+        input_details: dict = Detector.__architecture.input_details
+        return {
+            "input_shape": tuple(input_details["shape"][1:3]),
+            "layout": "nhwc" if Detector.__architecture_format == "litert" else "nchw",
+            "type": input_details["type"],
+            "scale": input_details["scale"],
+            "zero_point": input_details["zero_point"],
+        }
+
+    @staticmethod
+    def set_buffer_count(buffer_count: int) -> None:
+        """
+        Sets how many reused input and output buffers are cycled by the preprocessing and the
+        inferencer. Needed when several frames are in flight between steps, as in the pipelined mode.
+
+        Args:
+            buffer_count (int): Number of frames that can be in flight at once.
+        """
+        FusedImagePreprocessing.set_buffer_count(buffer_count)
+        # Backends that allocate their outputs on every call (e.g. LiteRT) have nothing to cycle
+        set_inferencer_buffer_count = getattr(Detector.__inferencer, "set_buffer_count", None)
+        if set_inferencer_buffer_count is not None:
+            set_inferencer_buffer_count(buffer_count)
+
+    @staticmethod
+    def pre_process(images: List[np.ndarray]) -> np.ndarray:
+        """
+        Preprocess step of the detection process, without timing. Together with `forward` and
+        `post_process` it allows running the steps on different threads.
+
+        Args:
+            images (List[np.ndarray]): Input images to be processed.
+
+        Returns:
+            np.ndarray: Input tensor for the loaded model, or None with LiteRT zero-copy, where the
+                images are written straight into the interpreter input tensor.
+        """
+        litert_model: bool = Detector.__architecture_format == "litert"
+        if getattr(Detector.__inferencer, "zero_copy", False):
+            # The tensor view is dropped on return, as the interpreter refuses to run while one is alive
+            Detector.__architecture.pre_process_batch(
+                images=images,
+                litert_model=litert_model,
+                out=Detector.__inferencer.input_tensor(batch_size=len(images))
+            )
+            return None
+        return Detector.__architecture.pre_process_batch(images=images, litert_model=litert_model)
+
+    @staticmethod
+    def forward(input: np.ndarray) -> np.ndarray:
+        """
+        Inference step of the detection process, without timing.
+
+        Args:
+            input (np.ndarray): Input tensor produced by `pre_process`.
+
+        Returns:
+            np.ndarray: Raw model output.
+        """
+        if Detector.first_inference_time is not None:
+            return Detector.__inferencer.forward(input=input, confidence_thresh=Detector.__architecture.confidence_thresh)
+
+        # The first inference pays for lazy allocations and kernel preparation, so it is reported apart
+        start_ts = time.perf_counter_ns()
+        output = Detector.__inferencer.forward(input=input, confidence_thresh=Detector.__architecture.confidence_thresh)
+        Detector.first_inference_time = (time.perf_counter_ns() - start_ts) / 1e6
+        return output
+
+    @staticmethod
+    def post_process(
+        output: np.ndarray,
+        images: List[np.ndarray] = None,
+        columnar: bool = False,
+        image_shapes: List[Tuple[int, ...]] = None
+    ) -> list:
+        """
+        Postprocess step of the detection process, without timing.
+
+        Args:
+            output (np.ndarray): Raw model output produced by `forward`.
+            images (List[np.ndarray], optional): Original input images, in the same order as the batch.
+            columnar (bool, optional): Return one array-backed DetectionBatch per image instead of
+                lists of Detection objects. Defaults to False.
+            image_shapes (List[Tuple[int, ...]], optional): Shapes of the original images, used
+                instead of `images` when only their preprocessed tensors were at hand.
+
+        Returns:
+            List[List[Detection]] or List[DetectionBatch]
+                Computed detections of each input image.
+        """
+        detections: List[DetectionBatch] = Detector.__architecture.post_process_batch(
+            output=output, images=images, image_shapes=image_shapes
+        )
+        if columnar:
+            return detections
+        return [image_detections.to_detections() for image_detections in detections]
+
+    @staticmethod
+    def __start_inferencer(
+        model_path: str,
+        half_cores: bool,
+        runtime_config: RuntimeConfig,
+        backend: str,
+        backend_options: dict
+    ) -> dict:
+        """
+        Selects the inference backend registered for the model file extension, imports it and
+        loads the model, timing both steps. Only the options the backend accepts are forwarded.
 
         Args:
             model_path (str): Path to the model file.
             half_cores (bool): Use only half of CPU cores for inference
+            runtime_config (RuntimeConfig): Threading and session tuning options.
+            backend (str): Name of the backend, or None for the default one of the extension.
+            backend_options (dict): Backend specific `init` options, by name.
 
         Returns:
             dict: Dictionary containing input details of the loaded model.
+
+        Raises:
+            ValueError: If no backend is registered for the model file extension, or under the
+                given name for it.
         """
-        input_details: dict = dict()
+        extension: str = next((ext for ext in Detector.__backends if model_path.endswith(ext)), None)
+        if extension is None:
+            raise ValueError(
+                f"Unsupported model file '{model_path}'. Supported extensions: {', '.join(Detector.__backends)}."
+            )
+        backends: List[dict] = Detector.__backends[extension]
+        backend: dict = backends[0] if backend is None else next(
+            (entry for entry in backends if entry["name"] == backend), None
+        )
+        if backend is None:
+            raise ValueError(
+                f"Unsupported backend for '{model_path}'. Supported backends: "
+                f"{', '.join(entry['name'] for entry in backends)}."
+            )
+
+        start_ts = time.perf_counter_ns()
+        Detector.__inferencer = getattr(importlib.import_module(backend["module"]), backend["class"])
+        Detector.import_time = (time.perf_counter_ns() - start_ts) / 1e6
+
+        start_ts = time.perf_counter_ns()
+        Detector.__inferencer.load(
+            model_path=model_path,
+            half_cores=half_cores,
+            runtime_config=runtime_config,
+            **{name: value for name, value in backend_options.items() if name in backend["options"]}
+        )
+        Detector.load_time = (time.perf_counter_ns() - start_ts) / 1e6
 
-        if ".tflite" in model_path:
-            LiteRT.load(model_path=model_path, half_cores=half_cores)
-            Detector.__architecture_format = "litert"
-            input_details = LiteRT.input_details
-            
-        elif ".onnx" in model_path:
-            OnnxRT.load(model_path=model_path, half_cores=half_cores)
-            Detector.__architecture_format = "onnx"
-            input_details = OnnxRT.input_details
+        Detector.backend = backend["name"]
+        Detector.__architecture_format = backend["format"]
+        Detector.model_cache = getattr(Detector.__inferencer, "model_cache_status", "disabled")
+        Detector.first_inference_time = None
 
-        return input_details
+        return Detector.__inferencer.input_details
     
     @staticmethod
-    def __load_architecture(model_path: str, input_details: dict, score_thresh: float, confidence_thresh: float, iou_thresh: float):
+    def __load_architecture(
+        model_path: str,
+        input_details: dict,
+        score_thresh: float,
+        confidence_thresh: float,
+        iou_thresh: float,
+        class_aware_nms: bool
+    ):
         """
         Loads the appropriate YOLO architecture based on the model filename, configuring it with thresholds.
 
@@ -144,6 +500,7 @@ class Detector:
             score_thresh (float): Score threshold for detections.
             confidence_thresh (float): Confidence threshold for filtering.
             iou_thresh (float): IoU threshold for Non-Maximum Suppression.
+            class_aware_nms (bool): Apply Non-Maximum Suppression per class.
         """
         if ("yolo11" in model_path) or ("yolov8" in model_path) or ("yolov5" in model_path):
             Detector.__architecture = UltralyticsYOLO(
@@ -151,4 +508,5 @@ class Detector:
                 score_thresh=score_thresh,
                 confidence_thresh=confidence_thresh,
                 iou_thresh=iou_thresh,
+                class_aware_nms=class_aware_nms,
             )
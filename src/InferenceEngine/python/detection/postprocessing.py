@@ -1,7 +1,7 @@
 import cv2
 import numpy as np
 from typing import List, Tuple
-from model.detection import Detection
+from model.detection import DetectionBatch
 
 class DetectionPostprocessing:
     """
@@ -10,11 +10,11 @@ class DetectionPostprocessing:
 
     Methods
     -------
-    apply_nms(boxes: List[np.ndarray], scores: List[float], classes_ids: List[int],
+    apply_nms(boxes: np.ndarray, scores: np.ndarray, classes_ids: np.ndarray,
               input_factor: Tuple[float, float], confidence_thresh: float,
-              iou_thresh: float, score_thresh: float) -> Tuple[List[np.ndarray], List[int], List[float]]:
-        Applies NMS to filter out overlapping bounding boxes and scales the bounding boxes
-        to the input dimensions.
+              iou_thresh: float, score_thresh: float, class_aware: bool = False) -> DetectionBatch:
+        Applies NMS, optionally per class, to filter out overlapping bounding boxes and scales
+        the bounding boxes to the input dimensions.
         
     __revert_letterbox(boxes: List[np.ndarray], image_shape: Tuple[int, int],
                        input_shape: Tuple[int, int]) -> List[np.ndarray]:
@@ -24,61 +24,73 @@ class DetectionPostprocessing:
 
     @staticmethod
     def apply_nms(
-        boxes: List[np.ndarray],
-        scores: List[float],
-        classes_ids: List[int],
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        classes_ids: np.ndarray,
         input_factor: Tuple[float, float],
         confidence_thresh: float,
         iou_thresh: float,
-        score_thresh: float
-    ) -> Tuple[List[np.ndarray], List[int], List[float]]:
+        score_thresh: float,
+        class_aware: bool = False
+    ) -> DetectionBatch:
         """
         Applies Non-Maximum Suppression (NMS) on detection boxes to remove overlapping boxes
-        with lower confidence scores, and rescales boxes based on the provided input factor.
+        with lower confidence scores, and rescales the kept boxes in bulk based on the provided
+        input factor.
 
         Parameters
         ----------
-        boxes : List[np.ndarray]
-            A list of bounding boxes in the format [x_center, y_center, width, height].
-        scores : List[float]
-            Confidence scores for each bounding box.
-        classes_ids : List[int]
-            Class IDs associated with each bounding box.
+        boxes : np.ndarray
+            Bounding boxes of shape (N, 4) in the format [x_center, y_center, width, height].
+        scores : np.ndarray
+            Confidence scores of shape (N,) for each bounding box.
+        classes_ids : np.ndarray
+            Class IDs of shape (N,) associated with each bounding box.
         input_factor : Tuple[float, float]
-            Scaling factor for width and height to match the original image size.
+            Scaling factor for height and width to match the original image size.
         confidence_thresh : float
             Minimum confidence score for a box to be retained.
         iou_thresh : float
             IoU threshold for NMS; boxes with IoU > iou_thresh are suppressed.
         score_thresh : float
             Minimum score threshold; boxes with scores below this value are removed.
+        class_aware : bool, optional
+            If True, boxes only suppress boxes of the same class. Each class is shifted by an offset
+            larger than the coordinate range, so a single NMS call handles every class
+            (default is False).
 
         Returns
         -------
-        List[Detection]
-            List of computed detections with bbox, score and class ID.
+        DetectionBatch
+            Computed detections with bbox, score and class ID, stored column-wise.
         """
-        detections: List[Detection] = []
-        indices: np.ndarray = cv2.dnn.NMSBoxes(
-            boxes, scores, confidence_thresh, iou_thresh
-        )
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float32)
+        classes_ids = np.asarray(classes_ids)
+        if len(scores) == 0:
+            return DetectionBatch.from_arrays(classes_ids=[], scores=[], boxes=[])
 
-        if len(indices) > 0:
-            for i in indices.flatten():
-                box: np.ndarray = boxes[i]
-                box[0] = int((box[0] - 0.5 * box[2]) * input_factor[1])  
-                box[1] = int((box[1] - 0.5 * box[3]) * input_factor[0])  
-                box[2] = box[0] + int(box[2] * input_factor[1])  
-                box[3] = box[1] + int(box[3] * input_factor[0]) 
-                
-                score: float = scores[i]
-                class_id: int = classes_ids[i]
+        nms_boxes: np.ndarray = boxes
+        if class_aware:
+            coordinates_offset = float(np.abs(boxes).max()) * 2 + 1
+            nms_boxes = boxes.copy()
+            nms_boxes[:, :2] += classes_ids[:, None] * coordinates_offset
 
-                if score > score_thresh:
-                    detection = Detection(class_id=class_id, locations=box, score=score)
-                    detections.append(detection)
-                    
-        return detections
+        indices: np.ndarray = np.asarray(
+            cv2.dnn.NMSBoxes(nms_boxes, scores, confidence_thresh, iou_thresh), dtype=np.int64
+        ).reshape(-1)
+        indices = indices[scores[indices] > score_thresh]
+
+        kept_boxes: np.ndarray = boxes[indices]
+        locations: np.ndarray = np.empty_like(kept_boxes)
+        locations[:, 0] = np.trunc((kept_boxes[:, 0] - 0.5 * kept_boxes[:, 2]) * input_factor[1])
+        locations[:, 1] = np.trunc((kept_boxes[:, 1] - 0.5 * kept_boxes[:, 3]) * input_factor[0])
+        locations[:, 2] = locations[:, 0] + np.trunc(kept_boxes[:, 2] * input_factor[1])
+        locations[:, 3] = locations[:, 1] + np.trunc(kept_boxes[:, 3] * input_factor[0])
+
+        return DetectionBatch.from_arrays(
+            classes_ids=classes_ids[indices], scores=scores[indices], boxes=locations
+        )
     
     @staticmethod
     def __revert_letterbox(
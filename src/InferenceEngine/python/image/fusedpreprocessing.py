@@ -0,0 +1,179 @@
+import numpy as np
+import cv2
+from typing import Dict, List, Tuple
+
+class FusedImagePreprocessing:
+    """
+    A class for preprocessing images into preallocated input tensors. Resizing, channel swapping,
+    normalization and quantization are written in place into a tensor kept per
+    (batch size, shape, layout, data type), so no full-size temporary is allocated per frame.
+
+    Attributes
+    ----------
+    buffer_count : int
+        Number of tensors cycled per key. With more than one, a tensor handed out by `format` is
+        not overwritten by the next `buffer_count - 1` calls, which allows several frames in flight.
+
+    Methods
+    -------
+    set_buffer_count(buffer_count: int) -> None
+        Sets the number of tensors cycled per key and drops the tensors allocated so far.
+    format(images: List[np.ndarray], input_shape: Tuple[int, int], layout: str = "nhwc",
+           type: np.dtype = np.float32, scale: float = 1.0, zero_point: int = 0,
+           out: np.ndarray = None) -> np.ndarray
+        Formats the input images into a reused tensor, quantizing them for integer data types.
+    """
+
+    buffer_count: int = 1
+
+    __tensors: Dict[tuple, List[np.ndarray]] = dict()
+    __next_tensor: Dict[tuple, int] = dict()
+    __resized_images: Dict[tuple, np.ndarray] = dict()
+    __rgb_images: Dict[tuple, np.ndarray] = dict()
+    __scratch_tensors: Dict[tuple, np.ndarray] = dict()
+
+    @staticmethod
+    def set_buffer_count(buffer_count: int) -> None:
+        """
+        Sets the number of tensors cycled per key and drops the tensors allocated so far.
+
+        Parameters
+        ----------
+        buffer_count : int
+            Number of tensors cycled per (batch size, shape, layout, data type).
+        """
+        FusedImagePreprocessing.buffer_count = max(1, buffer_count)
+        FusedImagePreprocessing.__tensors.clear()
+        FusedImagePreprocessing.__next_tensor.clear()
+
+    @staticmethod
+    def format(
+        images: List[np.ndarray],
+        input_shape: Tuple[int, int],
+        layout: str = "nhwc",
+        type: np.dtype = np.float32,
+        scale: float = 1.0,
+        zero_point: int = 0,
+        out: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        Formats the input images into a reused tensor. The images are resized, converted from BGR
+        to RGB and normalized to [0, 1]; for integer data types they are also quantized with the
+        given scale and zero point, matching `ImagePreprocessing.format` followed by
+        `ImagePreprocessing.quantize`.
+
+        Parameters
+        ----------
+        images : List[np.ndarray]
+            Images to format. Each image should be in the format (height, width, channels), BGR.
+        input_shape : Tuple[int, int]
+            The target shape for resizing the images (height, width).
+        layout : str, optional
+            Tensor layout, "nhwc" for LiteRT models or "nchw" for ONNX models (default is "nhwc").
+        type : np.dtype, optional
+            Data type of the model input (default is np.float32).
+        scale : float, optional
+            Quantization scale, used for integer data types only (default is 1.0).
+        zero_point : int, optional
+            Quantization zero point, used for integer data types only (default is 0).
+        out : np.ndarray, optional
+            Tensor to write into instead of a reused one, such as a view of the interpreter input
+            tensor. It must match the batch size, shape, layout and data type (default is None).
+
+        Returns
+        -------
+        np.ndarray
+            The formatted tensor. Unless `out` is given, it is owned by this class and reused by
+            later calls.
+        """
+        height, width = int(input_shape[0]), int(input_shape[1])
+        batch_size = len(images)
+        type = np.dtype(type)
+
+        tensor = out
+        if tensor is None:
+            tensor = FusedImagePreprocessing.__get_tensor(
+                key=(batch_size, height, width, layout, type.str)
+            )
+
+        resized_images = FusedImagePreprocessing.__get_buffer(
+            buffers=FusedImagePreprocessing.__resized_images,
+            shape=(batch_size, height, width, 3),
+            type=np.uint8
+        )
+        rgb_images = FusedImagePreprocessing.__get_buffer(
+            buffers=FusedImagePreprocessing.__rgb_images,
+            shape=tensor.shape,
+            type=np.uint8
+        )
+        for idx, image in enumerate(images):
+            cv2.resize(image, (width, height), dst=resized_images[idx], interpolation=cv2.INTER_LINEAR)
+            if layout == "nhwc":
+                cv2.cvtColor(resized_images[idx], cv2.COLOR_BGR2RGB, dst=rgb_images[idx])
+            else:
+                # BGR to RGB and HWC to CHW in one pass, writing each channel into its plane
+                cv2.split(resized_images[idx], [rgb_images[idx, 2], rgb_images[idx, 1], rgb_images[idx, 0]])
+
+        if np.issubdtype(type, np.integer):
+            scratch = FusedImagePreprocessing.__get_buffer(
+                buffers=FusedImagePreprocessing.__scratch_tensors,
+                shape=tensor.shape,
+                type=np.float32
+            )
+            np.divide(rgb_images, np.float32(255.0), out=scratch)
+            scratch /= scale
+            scratch += zero_point
+            np.copyto(tensor, scratch, casting="unsafe")
+        else:
+            np.divide(rgb_images, np.float32(255.0), out=tensor, dtype=np.float32, casting="same_kind")
+
+        return tensor
+
+    @staticmethod
+    def __get_tensor(key: tuple) -> np.ndarray:
+        """
+        Returns the next tensor of the ring kept for the given key, allocating it on first use.
+
+        Parameters
+        ----------
+        key : tuple
+            (batch size, height, width, layout, data type string) of the tensor.
+
+        Returns
+        -------
+        np.ndarray
+            Tensor to be filled.
+        """
+        batch_size, height, width, layout, type = key
+        tensors = FusedImagePreprocessing.__tensors.setdefault(key, [])
+        idx = FusedImagePreprocessing.__next_tensor.get(key, 0)
+
+        if idx == len(tensors):
+            shape = (batch_size, height, width, 3) if layout == "nhwc" else (batch_size, 3, height, width)
+            tensors.append(np.empty(shape, dtype=np.dtype(type)))
+
+        FusedImagePreprocessing.__next_tensor[key] = (idx + 1) % FusedImagePreprocessing.buffer_count
+        return tensors[idx]
+
+    @staticmethod
+    def __get_buffer(buffers: Dict[tuple, np.ndarray], shape: Tuple[int, ...], type: np.dtype) -> np.ndarray:
+        """
+        Returns the intermediate buffer of the given shape, allocating it on first use.
+
+        Parameters
+        ----------
+        buffers : Dict[tuple, np.ndarray]
+            Buffers kept by shape.
+        shape : Tuple[int, ...]
+            Shape of the buffer.
+        type : np.dtype
+            Data type of the buffer.
+
+        Returns
+        -------
+        np.ndarray
+            Buffer to be filled.
+        """
+        if shape not in buffers:
+            buffers[shape] = np.empty(shape, dtype=type)
+        return buffers[shape]
@@ -0,0 +1,178 @@
+import os
+import cv2
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterator, List
+from image.tensorcache import TensorCache
+from model.frame import Frame
+
+class ImageLoader:
+    """
+    A dataset reader that decodes the images of a folder ahead of their consumer.
+
+    Images are decoded on a thread pool (OpenCV releases the GIL while decoding), keeping at most
+    `prefetch` images decoded or being decoded ahead of the consumer. Frames are always yielded in
+    file order, which is sorted so that every run sees the same sequence.
+
+    With a tensor cache, images are not decoded: their preprocessed tensors are memory mapped
+    from the cache instead, which must already hold every image (see `missing_files`).
+
+    Attributes
+    ----------
+    images_folder : str
+        Folder containing the images.
+    files : List[str]
+        Sorted names of the image files of the folder.
+    prefetch : int
+        Maximum number of images decoded ahead of the consumer. With 0, images are decoded
+        synchronously when requested.
+    threads : int
+        Number of decoding threads.
+    tensor_cache : TensorCache
+        Cache the preprocessed tensors are read from, or None to decode the images.
+
+    Methods
+    -------
+    frames(files: List[str] = None) -> Iterator[Frame]
+        Yields the frames of the given files, or of every file, with their image decoded.
+    missing_files() -> List[str]
+        Lists the files without an entry in the tensor cache.
+    close() -> None
+        Stops the decoding threads.
+    """
+
+    EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+    def __init__(self, images_folder: str, prefetch: int = 4, threads: int = 1, tensor_cache: TensorCache = None):
+        """
+        Lists the images of the folder and starts the decoding threads.
+
+        Parameters
+        ----------
+        images_folder : str
+            Folder containing the images.
+        prefetch : int, optional
+            Maximum number of images decoded ahead of the consumer, by default 4.
+        threads : int, optional
+            Number of decoding threads, by default 1.
+        tensor_cache : TensorCache, optional
+            Cache to read the preprocessed tensors from instead of decoding the images, by default None.
+        """
+        self.images_folder = images_folder
+        self.files = sorted(f for f in os.listdir(images_folder) if f.lower().endswith(ImageLoader.EXTENSIONS))
+        self.prefetch = prefetch
+        self.threads = threads
+        self.tensor_cache = tensor_cache
+        self.__executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="decode") if prefetch > 0 else None
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def frames(self, files: List[str] = None) -> Iterator[Frame]:
+        """
+        Yields a frame per file, in order, with its image decoded and its decode duration in
+        milliseconds stored in `stage_times["decode"]`. With a tensor cache, the frame holds the
+        memory-mapped tensor in `input` and the original image shape in `image_shape` instead,
+        and the decode duration is the one of opening the entry.
+
+        Parameters
+        ----------
+        files : List[str], optional
+            Names of the files to read, possibly repeated. Defaults to every file of the folder.
+
+        Yields
+        ------
+        Frame
+            Frame with `index`, `name`, `image` (or `input` and `image_shape`), `capture_ts` (the
+            start of its read) and `stage_times["decode"]` filled in.
+
+        Raises
+        ------
+        ValueError
+            If an image cannot be decoded, or has no entry in the tensor cache.
+        """
+        files = self.files if files is None else files
+
+        if self.__executor is None:
+            for idx, image_file in enumerate(files):
+                yield self.__read(idx=idx, image_file=image_file)
+            return
+
+        pending: Deque[Future] = deque()
+        files = iter(enumerate(files))
+        try:
+            while True:
+                # Refill the window before waiting, so the decoding threads never idle on the consumer
+                for idx, image_file in files:
+                    pending.append(self.__executor.submit(self.__read, idx, image_file))
+                    if len(pending) >= self.prefetch:
+                        break
+                if not pending:
+                    break
+
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def missing_files(self) -> List[str]:
+        """
+        Lists the files without an entry in the tensor cache.
+
+        Returns
+        -------
+        List[str]
+            Names of the files to preprocess and store before reading the frames, in order.
+        """
+        if self.tensor_cache is None:
+            return list()
+        return [
+            image_file for image_file in self.files
+            if self.tensor_cache.load(os.path.join(self.images_folder, image_file))[0] is None
+        ]
+
+    def close(self) -> None:
+        """
+        Stops the decoding threads, dropping the images not yet decoded.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True, cancel_futures=True)
+
+    def __read(self, idx: int, image_file: str) -> Frame:
+        """
+        Decodes an image of the folder, or opens its tensor cache entry.
+
+        Parameters
+        ----------
+        idx : int
+            Index of the frame.
+        image_file : str
+            Name of the image file.
+
+        Returns
+        -------
+        Frame
+            Frame holding the decoded BGR image, or the cached tensor and the image shape.
+
+        Raises
+        ------
+        ValueError
+            If the file cannot be decoded as an image, or has no entry in the tensor cache.
+        """
+        image_path = os.path.join(self.images_folder, image_file)
+        frame = Frame(index=idx, name=image_file)
+
+        start_ts = time.perf_counter_ns()
+        frame.capture_ts = start_ts
+        if self.tensor_cache is not None:
+            frame.input, frame.image_shape = self.tensor_cache.load(image_path)
+            if frame.input is None:
+                raise ValueError(f"Image '{image_file}' has no entry in the tensor cache.")
+        else:
+            frame.image = cv2.imread(image_path)
+            if frame.image is None:
+                raise ValueError(f"Image '{image_file}' could not be decoded.")
+        frame.stage_times["decode"] = (time.perf_counter_ns() - start_ts) / 1e6
+
+        return frame
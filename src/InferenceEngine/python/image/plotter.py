@@ -1,6 +1,15 @@
 import numpy as np
 import cv2
-from model.detection import Detection
+from typing import Dict, List, Tuple
+from model.detection import Detection, DetectionBatch
+
+def _build_color_palette(class_count: int) -> List[Tuple[int, int, int]]:
+    # Hues spread by the golden ratio keep neighbouring class IDs apart, and the high value keeps
+    # the black label text readable
+    hues = (np.arange(class_count) * 0.618033988749895 % 1.0 * 180).astype(np.uint8)
+    hsv = np.stack([hues, np.full(class_count, 170, np.uint8), np.full(class_count, 255, np.uint8)], axis=-1)
+    bgr = cv2.cvtColor(hsv.reshape(1, -1, 3), cv2.COLOR_HSV2BGR).reshape(-1, 3)
+    return [tuple(int(channel) for channel in color) for color in bgr]
 
 class ImagePlotter:
     """
@@ -10,15 +19,26 @@ class ImagePlotter:
     ----------
     classes : List[str]
         A list of class names corresponding to detection class IDs.
-    color_palette : np.ndarray
-        An array of RGB color values used to represent each class visually.
+    color_palette : List[Tuple[int, int, int]]
+        BGR color of each class, precomputed once.
 
     Methods
     -------
     draw_detections(image: np.ndarray, box: Tuple[int, int, int, int], score: float, class_id: int) -> None
         Draws a detection bounding box with the class label and confidence score on the image.
+    draw_detection_batch(image: np.ndarray, detections: DetectionBatch, preview_scale: float = 1.0) -> np.ndarray
+        Draws a whole set of detections in one call, optionally onto a downscaled preview.
     """
 
+    FONT = cv2.FONT_HERSHEY_DUPLEX
+    FONT_SCALE = 0.5
+    FONT_THICKNESS = 1
+    # Font scales are rounded to this step, which bounds the number of cached text sizes
+    FONT_SCALE_BUCKET = 0.05
+
+    __label_prefixes: Dict[int, str] = dict()
+    __text_widths: Dict[Tuple[str, float], int] = dict()
+
     classes = [
         "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
         "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", 
@@ -32,6 +52,7 @@ class ImagePlotter:
         "refrigerator", "book", "clock", "vase", "scissors", "teddy bear", "hair drier", 
         "toothbrush"
     ]
+    color_palette = _build_color_palette(len(classes))
 
     @staticmethod
     def draw_detections(
@@ -87,4 +108,121 @@ class ImagePlotter:
             0.50,
             (0, 0, 0),
             1        
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def draw_detection_batch(image: np.ndarray, detections: DetectionBatch, preview_scale: float = 1.0) -> np.ndarray:
+        """
+        Draws every detection of a frame in one call. Labels, text widths and colors are looked up
+        from per-class caches instead of being computed for each box, so the cost per box is
+        reduced to the OpenCV drawing calls, which keeps crowded scenes cheap.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            The image the detections were computed on.
+        detections : DetectionBatch
+            Detections of the image, in image coordinates.
+        preview_scale : float, optional
+            Scale of the rendered image. Below 1, the detections are drawn onto a downscaled copy
+            of the image instead of the image itself (default is 1.0).
+
+        Returns
+        -------
+        np.ndarray
+            The annotated image: `image` itself, or the downscaled preview.
+        """
+        boxes: np.ndarray = detections.get_boxes()
+        if preview_scale != 1.0:
+            image = cv2.resize(image, None, fx=preview_scale, fy=preview_scale, interpolation=cv2.INTER_AREA)
+            boxes = (boxes * preview_scale).astype(np.int32)
+
+        font_scale = ImagePlotter.__bucket_font_scale(ImagePlotter.FONT_SCALE * max(preview_scale, 0.5))
+        label_height = int(round(15 * font_scale / ImagePlotter.FONT_SCALE))
+        palette = ImagePlotter.color_palette
+
+        # Plain Python values avoid a NumPy scalar conversion per argument in the loop below
+        for class_id, score, (x_min, y_min, x_max, y_max) in zip(
+            detections.get_classes_ids().tolist(), detections.get_scores().tolist(), boxes.tolist()
+        ):
+            color = palette[class_id % len(palette)]
+            prefix = ImagePlotter.__label_prefix(class_id)
+            score_text = f"{score * 100:.0f}%"
+            text_width = (
+                ImagePlotter.__text_width(prefix, font_scale) + ImagePlotter.__text_width(score_text, font_scale)
+                - ImagePlotter.FONT_THICKNESS
+            )
+
+            cv2.rectangle(image, (x_min, y_min), (x_max, y_max), color, 2)
+            cv2.rectangle(image, (x_min, y_min - label_height), (x_min + text_width + 2, y_min), color, cv2.FILLED)
+            cv2.putText(
+                image, prefix + score_text, (x_min + 2, y_min), ImagePlotter.FONT, font_scale, (0, 0, 0),
+                ImagePlotter.FONT_THICKNESS
+            )
+
+        return image
+
+    @staticmethod
+    def __bucket_font_scale(font_scale: float) -> float:
+        """
+        Rounds a font scale to its bucket.
+
+        Parameters
+        ----------
+        font_scale : float
+            Requested font scale.
+
+        Returns
+        -------
+        float
+            Font scale rounded to a multiple of `FONT_SCALE_BUCKET`.
+        """
+        bucket = ImagePlotter.FONT_SCALE_BUCKET
+        return round(max(bucket, round(font_scale / bucket) * bucket), 2)
+
+    @staticmethod
+    def __label_prefix(class_id: int) -> str:
+        """
+        Returns the cached "<class>: " prefix of the labels of a class.
+
+        Parameters
+        ----------
+        class_id : int
+            The ID of the class.
+
+        Returns
+        -------
+        str
+            The label prefix.
+        """
+        prefix = ImagePlotter.__label_prefixes.get(class_id)
+        if prefix is None:
+            name = ImagePlotter.classes[class_id] if 0 <= class_id < len(ImagePlotter.classes) else str(class_id)
+            prefix = ImagePlotter.__label_prefixes[class_id] = f"{name}: "
+        return prefix
+
+    @staticmethod
+    def __text_width(text: str, font_scale: float) -> int:
+        """
+        Returns the cached rendered width of a text. The width getTextSize reports is the sum of the
+        glyph advances plus the font thickness, so the width of a label is the sum of the widths of
+        its class prefix and its score minus the thickness, which is counted twice.
+
+        Parameters
+        ----------
+        text : str
+            Text to measure.
+        font_scale : float
+            Bucketed font scale.
+
+        Returns
+        -------
+        int
+            Width of the text in pixels.
+        """
+        key = (text, font_scale)
+        width = ImagePlotter.__text_widths.get(key)
+        if width is None:
+            (width, _), _ = cv2.getTextSize(text, ImagePlotter.FONT, font_scale, ImagePlotter.FONT_THICKNESS)
+            ImagePlotter.__text_widths[key] = width
+        return width
@@ -0,0 +1,166 @@
+import os
+import json
+import shutil
+import hashlib
+from typing import Tuple
+import numpy as np
+
+class TensorCache:
+    """
+    An on-disk cache of preprocessed input tensors, so repeated runs over the same images skip
+    decoding and preprocessing. Each tensor is stored as a `.npy` file and loaded as a read-only
+    memory map, next to a JSON sidecar holding the shape of the original image.
+
+    Entries are keyed by image path and modification time together with the input shape, layout,
+    data type and quantization parameters of the model, so models sharing an input format share
+    their entries while an edited image or a different input format misses.
+
+    Attributes
+    ----------
+    cache_folder : str
+        Folder holding the cached tensors.
+    input_shape : Tuple[int, int]
+        Model input size (height, width).
+    layout : str
+        Tensor layout, "nhwc" or "nchw".
+    type : np.dtype
+        Data type of the model input.
+    scale : float
+        Quantization scale of the model input.
+    zero_point : int
+        Quantization zero point of the model input.
+
+    Methods
+    -------
+    load(image_path: str) -> Tuple[np.ndarray, Tuple[int, ...]]
+        Memory maps the cached tensor of an image, returning it with the original image shape.
+    store(image_path: str, tensor: np.ndarray, image_shape: Tuple[int, ...]) -> None
+        Writes the tensor of an image into the cache.
+    clear(cache_folder: str) -> None
+        Removes every cached tensor.
+    """
+
+    def __init__(
+        self,
+        cache_folder: str,
+        input_shape: Tuple[int, int],
+        layout: str,
+        type: np.dtype,
+        scale: float = 1.0,
+        zero_point: int = 0
+    ):
+        """
+        Initializes the cache for a model input format, creating the folder if needed.
+
+        Parameters
+        ----------
+        cache_folder : str
+            Folder holding the cached tensors.
+        input_shape : Tuple[int, int]
+            Model input size (height, width).
+        layout : str
+            Tensor layout, "nhwc" or "nchw".
+        type : np.dtype
+            Data type of the model input.
+        scale : float, optional
+            Quantization scale of the model input (default is 1.0).
+        zero_point : int, optional
+            Quantization zero point of the model input (default is 0).
+        """
+        self.cache_folder = cache_folder
+        self.input_shape = tuple(int(size) for size in input_shape)
+        self.layout = layout
+        self.type = np.dtype(type)
+        self.scale = float(scale)
+        self.zero_point = int(zero_point)
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def load(self, image_path: str) -> Tuple[np.ndarray, Tuple[int, ...]]:
+        """
+        Memory maps the cached tensor of an image.
+
+        Parameters
+        ----------
+        image_path : str
+            Path to the original image.
+
+        Returns
+        -------
+        Tuple[np.ndarray, Tuple[int, ...]]
+            The read-only tensor of shape (1, ...) and the original image shape, or (None, None)
+            if the image has no entry for this input format.
+        """
+        entry_path = self.__entry_path(image_path)
+        try:
+            with open(f"{entry_path}.json", "r") as file:
+                image_shape = tuple(json.load(file)["image_shape"])
+            tensor = np.load(f"{entry_path}.npy", mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None, None
+        return tensor, image_shape
+
+    def store(self, image_path: str, tensor: np.ndarray, image_shape: Tuple[int, ...]) -> None:
+        """
+        Writes the tensor of an image into the cache. Files are written under a temporary name
+        and then renamed, so concurrent runs never read a partial entry.
+
+        Parameters
+        ----------
+        image_path : str
+            Path to the original image.
+        tensor : np.ndarray
+            Preprocessed tensor of the image, of shape (1, ...).
+        image_shape : Tuple[int, ...]
+            Shape of the original image, needed to scale the detections back.
+        """
+        entry_path = self.__entry_path(image_path)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "wb") as file:
+            np.save(file, np.ascontiguousarray(tensor, dtype=self.type))
+        os.replace(tmp_path, f"{entry_path}.npy")
+
+        # The sidecar is written last, so an entry is only found once its tensor is complete
+        with open(tmp_path, "w") as file:
+            json.dump({"image": os.path.abspath(image_path), "image_shape": list(image_shape)}, file)
+        os.replace(tmp_path, f"{entry_path}.json")
+
+    @staticmethod
+    def clear(cache_folder: str) -> None:
+        """
+        Removes every cached tensor.
+
+        Parameters
+        ----------
+        cache_folder : str
+            Folder holding the cached tensors.
+        """
+        shutil.rmtree(cache_folder, ignore_errors=True)
+
+    def __entry_path(self, image_path: str) -> str:
+        """
+        Builds the path of the entry of an image, without extension.
+
+        Parameters
+        ----------
+        image_path : str
+            Path to the original image.
+
+        Returns
+        -------
+        str
+            Entry path, made of the image name and the hash of the entry key.
+        """
+        image_path = os.path.abspath(image_path)
+        key = json.dumps([
+            image_path,
+            os.stat(image_path).st_mtime_ns,
+            self.input_shape,
+            self.layout,
+            self.type.str,
+            self.scale,
+            self.zero_point,
+        ])
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        image_name = os.path.splitext(os.path.basename(image_path))[0]
+        return os.path.join(self.cache_folder, f"{image_name}_{digest}")
@@ -0,0 +1,297 @@
+import cv2
+import time
+import queue
+import threading
+from collections import deque
+from typing import Deque, Iterator, List, Union
+from model.frame import Frame
+
+class VideoLoader:
+    """
+    A frame reader for video files and camera streams, opened through `cv2.VideoCapture`.
+
+    Two modes are available:
+
+    - Every frame (default): each captured frame is delivered. A capture thread reads up to
+      `prefetch` frames ahead and then blocks, so a slow consumer slows the capture down
+      (back-pressure) and no frame is lost.
+    - Real-time: a capture thread reads the stream continuously and keeps only the latest frame.
+      Frames replaced before the consumer took them are counted as dropped. Video files are read
+      at their native frame rate, so they stand in for a live camera.
+
+    Each frame carries its capture timestamp, so the capture-to-result latency can be measured.
+
+    Attributes
+    ----------
+    source : Union[str, int]
+        Video file path, stream URL, device path or camera index.
+    realtime : bool
+        Whether only the latest frame is delivered.
+    prefetch : int
+        Maximum number of frames read ahead in every-frame mode. With 0, frames are read
+        synchronously when requested.
+    max_frames : int
+        Maximum number of frames delivered by `frames`, or None to read until the stream ends.
+    fps : float
+        Frame rate reported by the source, or 0 if unknown.
+    captured_frames : int
+        Number of frames read from the source by the last call to `frames`.
+    dropped_frames : int
+        Number of frames replaced by a newer one before being delivered by the last call to `frames`.
+    delivered_frames : int
+        Number of frames delivered by the last call to `frames`.
+
+    Methods
+    -------
+    frames(limit: int = None) -> Iterator[Frame]
+        Yields the frames of the stream.
+    close() -> None
+        Releases the source.
+    """
+
+    def __init__(self, source: Union[str, int], realtime: bool = False, prefetch: int = 4, max_frames: int = None):
+        """
+        Opens the source.
+
+        Parameters
+        ----------
+        source : Union[str, int]
+            Video file path, stream URL, device path or camera index. Strings made of digits are
+            taken as camera indexes.
+        realtime : bool, optional
+            Deliver only the latest frame, dropping the ones the consumer could not keep up with,
+            by default False.
+        prefetch : int, optional
+            Maximum number of frames read ahead in every-frame mode, by default 4.
+        max_frames : int, optional
+            Maximum number of frames delivered by `frames`, by default None (until the stream ends).
+
+        Raises
+        ------
+        ValueError
+            If the source cannot be opened.
+        """
+        self.source = int(source) if isinstance(source, str) and source.isdigit() else source
+        self.realtime = realtime
+        self.prefetch = prefetch
+        self.max_frames = max_frames
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.delivered_frames = 0
+        self.__read_ahead_frames: Deque[Frame] = deque()
+        self.__position: int = 0
+
+        self.__capture = cv2.VideoCapture(self.source)
+        if not self.__capture.isOpened():
+            raise ValueError(f"Video source '{source}' could not be opened.")
+        self.fps = self.__capture.get(cv2.CAP_PROP_FPS) or 0.0
+        # Files report their length, live streams do not and are not paced
+        self.__frame_count = int(self.__capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.__paced = realtime and self.__frame_count > 0 and self.fps > 0
+
+    def __len__(self) -> int:
+        """
+        Expected number of delivered frames, 0 if unknown. In real-time mode it is an upper bound.
+        """
+        frame_count = max(0, self.__frame_count)
+        if self.max_frames is not None:
+            return min(frame_count, self.max_frames) if frame_count > 0 else self.max_frames
+        return frame_count
+
+    def frames(self, limit: int = None) -> Iterator[Frame]:
+        """
+        Yields the frames of the stream, continuing from where the previous call stopped. The read
+        duration of each frame is stored in `stage_times["decode"]` and its capture time in
+        `capture_ts`. Capture counters are reset by each call.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum number of frames to deliver, by default `max_frames`.
+
+        Yields
+        ------
+        Frame
+            Frame with `index`, `name`, `image`, `capture_ts` and `stage_times["decode"]` filled in.
+        """
+        limit = self.max_frames if limit is None else limit
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.delivered_frames = 0
+
+        if self.realtime:
+            frames = self.__latest_frames()
+        elif self.prefetch > 0:
+            frames = self.__buffered_frames()
+        else:
+            frames = self.__direct_frames()
+
+        try:
+            while limit is None or self.delivered_frames < limit:
+                frame = next(frames, None)
+                if frame is None:
+                    break
+                frame.index = self.delivered_frames
+                self.delivered_frames += 1
+                yield frame
+        finally:
+            frames.close()
+
+    def close(self) -> None:
+        """
+        Releases the source.
+        """
+        self.__capture.release()
+
+    def __read(self) -> Frame:
+        """
+        Reads the next frame of the source.
+
+        Returns
+        -------
+        Frame
+            Captured frame, or None at the end of the stream.
+        """
+        start_ts = time.perf_counter_ns()
+        ok, image = self.__capture.read()
+        if not ok:
+            return None
+        self.captured_frames += 1
+        self.__position += 1
+        return Frame(
+            index=self.__position - 1,
+            name=f"frame{self.__position - 1:06d}",
+            image=image,
+            capture_ts=start_ts,
+            stage_times={"decode": (time.perf_counter_ns() - start_ts) / 1e6}
+        )
+
+    def __direct_frames(self) -> Iterator[Frame]:
+        """
+        Yields every frame, read when requested.
+
+        Yields
+        ------
+        Frame
+            Captured frames, in order.
+        """
+        yield from self.__read_ahead()
+        while True:
+            frame = self.__read()
+            if frame is None:
+                return
+            yield frame
+
+    def __buffered_frames(self) -> Iterator[Frame]:
+        """
+        Yields every frame, read ahead by a capture thread through a bounded queue.
+
+        Yields
+        ------
+        Frame
+            Captured frames, in order.
+        """
+        yield from self.__read_ahead()
+
+        frames: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        unsent_frames: List[Frame] = list()
+        stop = threading.Event()
+
+        def capture():
+            while not stop.is_set():
+                frame = self.__read()
+                # A full queue blocks the capture until the consumer catches up
+                while True:
+                    if stop.is_set():
+                        unsent_frames.append(frame)
+                        return
+                    try:
+                        frames.put(frame, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if frame is None:
+                    return
+
+        thread = threading.Thread(target=capture, name="capture", daemon=True)
+        thread.start()
+        try:
+            while True:
+                frame = frames.get()
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            stop.set()
+            thread.join()
+            # Frames read ahead but not delivered are kept for the next call, so none is skipped
+            queued_frames: List[Frame] = list()
+            while not frames.empty():
+                queued_frames.append(frames.get())
+            for frame in queued_frames + unsent_frames:
+                if frame is not None:
+                    self.__read_ahead_frames.append(frame)
+                    self.captured_frames -= 1
+
+    def __read_ahead(self) -> Iterator[Frame]:
+        """
+        Yields the frames read ahead but not delivered by the previous call to `frames`.
+
+        Yields
+        ------
+        Frame
+            Frames read ahead, in order.
+        """
+        while self.__read_ahead_frames:
+            self.captured_frames += 1
+            yield self.__read_ahead_frames.popleft()
+
+    def __latest_frames(self) -> Iterator[Frame]:
+        """
+        Yields the latest captured frame each time the consumer asks for one, waiting only when
+        the latest frame was already delivered. A capture thread keeps reading the source.
+
+        Yields
+        ------
+        Frame
+            Latest captured frames, in capture order, with gaps where frames were dropped.
+        """
+        condition = threading.Condition()
+        state = {"latest": None, "ended": False, "stop": False}
+
+        def capture():
+            start_ts = time.perf_counter()
+            while True:
+                frame = self.__read()
+                with condition:
+                    if state["stop"]:
+                        return
+                    if frame is None:
+                        state["ended"] = True
+                        condition.notify()
+                        return
+                    if state["latest"] is not None:
+                        self.dropped_frames += 1
+                    state["latest"] = frame
+                    condition.notify()
+
+                # Files are read at their native frame rate, as a camera would deliver them
+                if self.__paced:
+                    delay = start_ts + self.captured_frames / self.fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+        thread = threading.Thread(target=capture, name="capture", daemon=True)
+        thread.start()
+        try:
+            while True:
+                with condition:
+                    condition.wait_for(lambda: state["latest"] is not None or state["ended"])
+                    frame, state["latest"] = state["latest"], None
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            with condition:
+                state["stop"] = True
+            thread.join()
@@ -3,20 +3,37 @@ import json
 
 class MQTTProducer:
 
-    def __init__(self, server, client_id):
+    def __init__(self, server, client_id, qos=1):
         self.server = server
         self.client_id = client_id
+        # QoS 1 makes the broker acknowledge every message, so none is lost on the way
+        self.qos = qos
         self.client = mqtt.Client(self.client_id)
+        self.__started = False
+        self.__last_msg = None
     
     def __del__(self):
         self.stop()
     
     def start(self):
         self.client.connect(self.server["address"], self.server["port"])
+        # Packets are written by the network thread, so publishing never waits on the socket
+        self.client.loop_start()
+        self.__started = True
 
     def stop(self):
+        if not self.__started:
+            return
+        self.__started = False
+        # Messages are acknowledged in order, so the last one being acknowledged means all of them were
+        if self.__last_msg is not None:
+            self.__last_msg.wait_for_publish(timeout=5)
         self.client.disconnect()
+        self.client.loop_stop()
 
     def produce(self, topic, msg):
         msg_str = json.dumps(msg)
-        self.client.publish(topic, msg_str)
\ No newline at end of file
+        self.__last_msg = self.client.publish(topic, msg_str, qos=self.qos)
+
+    def produce_bytes(self, topic, payload):
+        self.__last_msg = self.client.publish(topic, payload, qos=self.qos)
@@ -0,0 +1,150 @@
+import os
+import cv2
+import json
+import queue
+import struct
+import threading
+from model.detection import DetectionBatch, DETECTION_DTYPE
+from model.frame import Frame
+
+DETECTIONS_FORMATS = ("jsonl", "binary")
+
+class OutputSink:
+    # Binary records are a little-endian (frame index, detections count) header followed by the
+    # detections as packed DETECTION_DTYPE records
+    RECORD_HEADER = struct.Struct("<II")
+
+    __STOP = None
+
+    def __init__(
+        self,
+        output_folder: str,
+        save_images: bool = False,
+        jpeg_quality: int = 90,
+        image_sampling: int = 1,
+        detections_format: str = None,
+        queue_size: int = 32
+    ):
+        if detections_format is not None and detections_format not in DETECTIONS_FORMATS:
+            raise ValueError(f"Invalid detections format '{detections_format}', expected one of {DETECTIONS_FORMATS}.")
+        self.output_folder = output_folder
+        self.save_images = save_images
+        self.jpeg_quality = jpeg_quality
+        self.image_sampling = max(1, image_sampling)
+        self.detections_format = detections_format
+        self.queue_size = queue_size
+
+        self.written_images = 0
+        self.written_records = 0
+        self.dropped_writes = 0
+        self.max_queue_depth = 0
+        self.__queue_depth_sum = 0
+        self.__writes = 0
+
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__records_file = None
+        self.__thread = None
+        self.__error = None
+
+    def start(self):
+        os.makedirs(self.output_folder, exist_ok=True)
+        if self.detections_format == "jsonl":
+            self.__records_file = open(os.path.join(self.output_folder, "detections.jsonl"), "w")
+        elif self.detections_format == "binary":
+            self.__records_file = open(os.path.join(self.output_folder, "detections.bin"), "wb")
+        self.__thread = threading.Thread(target=self.__write_loop, name="output", daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        if self.__thread is None:
+            return
+        # A writer that failed no longer empties the queue, so the stop marker is only waited on while it runs
+        while self.__thread.is_alive():
+            try:
+                self.__queue.put(OutputSink.__STOP, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self.__thread.join()
+        self.__thread = None
+        if self.__records_file is not None:
+            self.__records_file.close()
+            self.__records_file = None
+        if self.__error is not None:
+            raise RuntimeError("The output writer failed.") from self.__error
+
+    def write(self, frame: Frame, detections: DetectionBatch) -> bool:
+        # Never blocks the inference loop: a full queue drops the write instead
+        image = None
+        if self.save_images and frame.image is not None and frame.index % self.image_sampling == 0:
+            # Frame images may be reused buffers (worker pool slots), so the writer gets its own copy
+            image = frame.image.copy()
+        if image is None and self.detections_format is None:
+            return True
+
+        try:
+            self.__queue.put_nowait((frame.index, frame.name, image, detections))
+        except queue.Full:
+            self.dropped_writes += 1
+            return False
+
+        self.__writes += 1
+        queue_depth = self.__queue.qsize()
+        self.__queue_depth_sum += queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+        return True
+
+    def get_mean_queue_depth(self) -> float:
+        if self.__writes == 0:
+            return 0.0
+        return self.__queue_depth_sum / self.__writes
+
+    def get_stats(self) -> dict:
+        return {
+            "written_images": self.written_images,
+            "written_records": self.written_records,
+            "dropped_writes": self.dropped_writes,
+            "max_queue_depth": self.max_queue_depth,
+            "mean_queue_depth": round(self.get_mean_queue_depth(), 3),
+        }
+
+    def __write_loop(self):
+        try:
+            self.__write_items()
+        except Exception as error:
+            self.__error = error
+
+    def __write_items(self):
+        while True:
+            item = self.__queue.get()
+            if item is OutputSink.__STOP:
+                break
+            index, name, image, detections = item
+
+            if image is not None:
+                image_path = os.path.join(self.output_folder, f"{os.path.splitext(name)[0]}.jpg")
+                cv2.imwrite(image_path, image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                self.written_images += 1
+
+            if self.detections_format == "jsonl":
+                record = {"index": index, "name": name, **detections.to_dict()}
+                record["scores"] = [round(score, 4) for score in record["scores"]]
+                self.__records_file.write(json.dumps(record) + "\n")
+                self.written_records += 1
+            elif self.detections_format == "binary":
+                self.__records_file.write(OutputSink.RECORD_HEADER.pack(index, len(detections)))
+                self.__records_file.write(detections.to_bytes())
+                self.written_records += 1
+
+    @staticmethod
+    def read_binary_records(file_path: str):
+        # Inverse of the binary format, yielding (frame index, DetectionBatch) pairs
+        with open(file_path, "rb") as file:
+            data = file.read()
+        offset = 0
+        record_size = DETECTION_DTYPE.itemsize
+        while offset < len(data):
+            index, count = OutputSink.RECORD_HEADER.unpack_from(data, offset)
+            offset += OutputSink.RECORD_HEADER.size
+            yield index, DetectionBatch.from_bytes(data[offset:offset + count * record_size])
+            offset += count * record_size
@@ -0,0 +1,42 @@
+import socket
+import struct
+import threading
+import json
+
+class SocketProducer:
+    # Each message is framed as a little-endian (topic length, payload length) header followed by
+    # the topic and the payload, so binary and JSON messages share the stream
+    HEADER = struct.Struct("<HI")
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Status and JSON records come from the inference loop, binary batches from the telemetry thread
+        self.lock = threading.Lock()
+        self.__started = False
+
+    def __del__(self):
+        self.stop()
+
+    def start(self):
+        # The benchmark listens before launching the engine, so nothing is published before it reads
+        self.client.connect(self.socket_path)
+        self.__started = True
+
+    def stop(self):
+        if not self.__started:
+            return
+        self.__started = False
+        # A stream socket delivers everything sent before the shutdown
+        with self.lock:
+            self.client.shutdown(socket.SHUT_WR)
+            self.client.close()
+
+    def produce(self, topic, msg):
+        msg_str = json.dumps(msg)
+        self.produce_bytes(topic, msg_str.encode())
+
+    def produce_bytes(self, topic, payload):
+        topic_bytes = topic.encode()
+        with self.lock:
+            self.client.sendall(SocketProducer.HEADER.pack(len(topic_bytes), len(payload)) + topic_bytes + payload)
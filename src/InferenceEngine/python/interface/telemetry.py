@@ -0,0 +1,177 @@
+import time
+import struct
+import threading
+from typing import Union
+from interface.mqttproducer import MQTTProducer
+from interface.socketproducer import SocketProducer
+
+TELEMETRY_FORMATS = ("binary", "json")
+
+# Any object with produce and produce_bytes, such as the benchmark's in-process channel, can carry telemetry
+Producer = Union[MQTTProducer, SocketProducer]
+
+class Telemetry:
+    # Binary batches are a plain sequence of little-endian records; the layout is sent once in the
+    # start status message (see get_schema), so the consumer never hardcodes it
+    RECORD = struct.Struct("<IIq7f")
+    FIELDS = (
+        "seq", "flags", "timestamp",
+        "decode_time", "pre_processing_time", "inference_time", "post_processing_time",
+        "draw_time", "latency", "publish_time"
+    )
+    FLAG_WARMUP = 0x1
+    # Binary batches go to their own topic, as their payload cannot be told apart from JSON
+    TOPICS = {"binary": "inferenceEngine/telemetry", "json": "inferenceEngine/data"}
+
+    def __init__(
+        self,
+        producer: Producer,
+        format: str = "binary",
+        flush_frames: int = 64,
+        flush_interval: float = 250.0
+    ):
+        if format not in TELEMETRY_FORMATS:
+            raise ValueError(f"Invalid telemetry format '{format}', expected one of {TELEMETRY_FORMATS}.")
+        self.producer = producer
+        self.format = format
+        self.topic = Telemetry.TOPICS[format]
+        self.flush_frames = max(1, flush_frames)
+        self.flush_interval = flush_interval
+
+        self.records = 0
+        self.flushes = 0
+        self.flushed_bytes = 0
+        self.max_flush_time = 0.0
+        self.__flush_time_sum = 0.0
+        self.__seq = 0
+
+        # Records are packed into the active buffer by the inference loop, while the flush thread
+        # publishes the other one
+        self.__buffers = [bytearray(self.flush_frames * Telemetry.RECORD.size) for _ in range(2)]
+        self.__active = 0
+        self.__pending = 0
+        self.__condition = threading.Condition()
+        self.__stopped = False
+        self.__thread = None
+
+    def start(self):
+        if self.format != "binary":
+            return
+        self.__thread = threading.Thread(target=self.__flush_loop, name="telemetry", daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        if self.__thread is None:
+            return
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify()
+        self.__thread.join()
+        self.__thread = None
+
+    def get_schema(self) -> dict:
+        return {
+            "format": self.format,
+            "topic": self.topic,
+            "struct": Telemetry.RECORD.format,
+            "fields": list(Telemetry.FIELDS),
+            "warmup_flag": Telemetry.FLAG_WARMUP,
+        }
+
+    def record(self, stage_times: dict, latency: float = None, publish_time: float = None, warmup: bool = False) -> float:
+        # Returns its own duration in milliseconds, which the next record carries as its publish time
+        start_ts = time.perf_counter_ns()
+        if self.format == "json":
+            self.__publish_json(stage_times=stage_times, latency=latency, publish_time=publish_time, warmup=warmup)
+        else:
+            self.__pack(stage_times=stage_times, latency=latency, publish_time=publish_time, warmup=warmup)
+        self.records += 1
+        return round((time.perf_counter_ns() - start_ts) / 1e6, 3)
+
+    def get_mean_flush_time(self) -> float:
+        if self.flushes == 0:
+            return 0.0
+        return self.__flush_time_sum / self.flushes
+
+    def get_stats(self) -> dict:
+        return {
+            "format": self.format,
+            "records": self.records,
+            "flushes": self.flushes,
+            "flushed_bytes": self.flushed_bytes,
+            "mean_flush_time": round(self.get_mean_flush_time(), 3),
+            "max_flush_time": round(self.max_flush_time, 3),
+        }
+
+    def __pack(self, stage_times: dict, latency: float, publish_time: float, warmup: bool):
+        flags = Telemetry.FLAG_WARMUP if warmup else 0
+        # NaN marks the values a record does not carry, such as the stages the warm-up does not time
+        # or the publish time of the first frame
+        nan = float("nan")
+        with self.__condition:
+            # A full buffer is only possible if the flush thread fell a whole batch behind; wait for it
+            # instead of dropping records
+            self.__condition.wait_for(lambda: self.__pending < self.flush_frames)
+            Telemetry.RECORD.pack_into(
+                self.__buffers[self.__active],
+                self.__pending * Telemetry.RECORD.size,
+                self.__seq,
+                flags,
+                time.monotonic_ns(),
+                stage_times.get("decode", nan),
+                stage_times["pre_process"],
+                stage_times["inference"],
+                stage_times["post_process"],
+                stage_times.get("draw", nan),
+                nan if latency is None else latency,
+                nan if publish_time is None else publish_time,
+            )
+            self.__seq += 1
+            self.__pending += 1
+            if self.__pending == self.flush_frames:
+                self.__condition.notify()
+
+    def __publish_json(self, stage_times: dict, latency: float, publish_time: float, warmup: bool):
+        msg = {
+            "seq": self.__seq,
+            "timestamp": time.monotonic_ns(),
+            "pre_processing_time": round(stage_times["pre_process"], 3),
+            "inference_time": round(stage_times["inference"], 3),
+            "post_processing_time": round(stage_times["post_process"], 3),
+        }
+        if warmup:
+            msg["warmup"] = True
+        else:
+            msg.update({
+                "decode_time": round(stage_times["decode"], 3),
+                "draw_time": round(stage_times["draw"], 3),
+                "publish_time": publish_time,
+                "latency": round(latency, 3),
+            })
+        self.producer.produce(topic=self.topic, msg=msg)
+        self.__seq += 1
+
+    def __flush_loop(self):
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(
+                    lambda: self.__stopped or self.__pending >= self.flush_frames,
+                    timeout=self.flush_interval / 1000
+                )
+                stopped = self.__stopped
+                # Swap the buffers, so the inference loop keeps packing while this batch is published
+                buffer, count = self.__buffers[self.__active], self.__pending
+                self.__active = 1 - self.__active
+                self.__pending = 0
+                self.__condition.notify()
+
+            if count > 0:
+                start_ts = time.perf_counter_ns()
+                self.producer.produce_bytes(topic=self.topic, payload=bytes(buffer[:count * Telemetry.RECORD.size]))
+                flush_time = (time.perf_counter_ns() - start_ts) / 1e6
+                self.flushes += 1
+                self.flushed_bytes += count * Telemetry.RECORD.size
+                self.__flush_time_sum += flush_time
+                self.max_flush_time = max(self.max_flush_time, flush_time)
+            if stopped:
+                return
@@ -0,0 +1,88 @@
+
+import os
+import cv2
+import time
+import argparse
+import tracemalloc
+import numpy as np
+
+from ai.processors.detector import Detector
+
+def measure_inference(model_path: str, images: list, io_binding: bool, repetitions: int) -> tuple:
+    Detector.init(
+        model_path=model_path,
+        score_thresh=0.25,
+        confidence_thresh=0.5,
+        iou_thresh=0.5,
+        half_cores=False,
+        io_binding=io_binding
+    )
+
+    inference_times = []
+    allocated_bytes = []
+    tracemalloc.start()
+    for repetition in range(repetitions):
+        for image in images:
+            input = Detector.pre_process(images=[image])
+
+            current_bytes, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            start_ts = time.perf_counter()
+            output = Detector.forward(input=input)
+            inference_times.append((time.perf_counter() - start_ts) * 1000)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            allocated_bytes.append(peak_bytes - current_bytes)
+            del output
+    tracemalloc.stop()
+
+    # The first inference includes session warm-up and buffer allocation
+    return float(np.mean(inference_times[1:])), float(np.mean(allocated_bytes[1:]))
+
+def generate_report(images_folder: str, model_paths: list, repetitions: int):
+    image_files = sorted(f for f in os.listdir(images_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg')))
+    images = [cv2.imread(os.path.join(images_folder, image_file)) for image_file in image_files]
+
+    print(
+        f"{'Model':<28}{'Default (ms)':>14}{'Binding (ms)':>14}{'Saved (%)':>11}"
+        f"{'Default (KiB)':>15}{'Binding (KiB)':>15}"
+    )
+    for model_path in model_paths:
+        default_time, default_bytes = measure_inference(model_path, images, False, repetitions)
+        binding_time, binding_bytes = measure_inference(model_path, images, True, repetitions)
+        saved_time = (1 - binding_time / default_time) * 100 if default_time > 0 else 0.0
+        print(
+            f"{os.path.basename(model_path):<28}{default_time:>14.3f}{binding_time:>14.3f}{saved_time:>11.1f}"
+            f"{default_bytes / 1024:>15.1f}{binding_bytes / 1024:>15.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compares the inference step of ONNX models with and without I/O binding."
+    )
+    parser.add_argument(
+        "--images_folder",
+        type=str,
+        required=True,
+        help="Path to the folder containing images."
+    )
+    parser.add_argument(
+        "--model_paths",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Paths to the ONNX model files (e.g. data/models/onnx/*_float32.onnx)."
+    )
+    parser.add_argument(
+        "--repetitions",
+        type=int,
+        default=1,
+        help="Number of passes over the images per model and mode."
+    )
+
+    args = parser.parse_args()
+
+    generate_report(
+        images_folder=args.images_folder,
+        model_paths=args.model_paths,
+        repetitions=args.repetitions
+    )
@@ -1,84 +1,499 @@
 
 import os
 import cv2
+import time
 import argparse
+import itertools
 from tqdm import tqdm 
+from typing import Union
 
 from ai.processors.detector import Detector
+from image.imageloader import ImageLoader
 from image.plotter import ImagePlotter
+from image.tensorcache import TensorCache
+from image.videoloader import VideoLoader
 from interface.mqttproducer import MQTTProducer
+from interface.socketproducer import SocketProducer
+from interface.telemetry import Telemetry, Producer, TELEMETRY_FORMATS
+from interface.outputsink import OutputSink, DETECTIONS_FORMATS
+from model.frame import Frame
+from model.runtimeconfig import RuntimeConfig, EXECUTION_MODES, GRAPH_OPTIMIZATION_LEVELS, OPENCV_BACKENDS, OPENCV_TARGETS
+from pipeline.inferencepipeline import InferencePipeline
+from pipeline.workerpool import WorkerPool
 
-def start_inferencing(images_folder: str, model_path: str, half_cores: bool, output_folder: str):
+FrameLoader = Union[ImageLoader, VideoLoader]
+
+def publish_data(telemetry: Telemetry, frame: Frame, stage_times: dict, publish_time: float) -> float:
+    # Timings are sent in milliseconds. A record cannot carry its own publish duration, so it
+    # carries the one of the previous record
+    latency = (time.perf_counter_ns() - frame.capture_ts) / 1e6
+    return telemetry.record(stage_times=stage_times, latency=latency, publish_time=publish_time)
+
+def detect(frames: list) -> list:
+    # Frames read from the tensor cache hold their preprocessed tensor instead of their image
+    if frames[0].input is not None:
+        return Detector.run_preprocessed(
+            inputs=[frame.input for frame in frames],
+            image_shapes=[frame.image_shape for frame in frames],
+            columnar=True
+        )
+    if len(frames) == 1:
+        return [Detector.run(image=frames[0].image, columnar=True)]
+    return Detector.run_batch(images=[frame.image for frame in frames], columnar=True)
+
+def fill_tensor_cache(frame_loader: ImageLoader):
+    # Missing tensors are computed once, before the runs that stream them from the cache
+    missing_files = frame_loader.missing_files()
+    for image_file in tqdm(missing_files, desc="[INF. ENGINE] Caching input tensors "):
+        image_path = os.path.join(frame_loader.images_folder, image_file)
+        image = cv2.imread(image_path)
+        frame_loader.tensor_cache.store(
+            image_path=image_path,
+            tensor=Detector.pre_process(images=[image]),
+            image_shape=image.shape
+        )
+
+def infer_sequentially(
+    frame_loader: FrameLoader,
+    batch_size: int,
+    telemetry: Telemetry,
+    output_sink: OutputSink = None,
+    preview_scale: float = 1.0
+) -> float:
+    publish_time: float = None
+    frames = frame_loader.frames()
+    progress_bar = tqdm(total=len(frame_loader) or None, desc="[INF. ENGINE] Inferencing images ")
+    while True:
+        batch_frames = list(itertools.islice(frames, batch_size))
+        if not batch_frames:
+            break
+        batch_detections = detect(frames=batch_frames)
+
+        for frame, detections in zip(batch_frames, batch_detections):
+            start_ts = time.perf_counter_ns()
+            # Cached tensors come without their image, so there is nothing to draw on
+            if frame.image is not None:
+                frame.image = ImagePlotter.draw_detection_batch(
+                    image=frame.image, detections=detections, preview_scale=preview_scale
+                )
+            draw_time = (time.perf_counter_ns() - start_ts) / 1e6
+
+            publish_time = publish_data(
+                telemetry=telemetry,
+                frame=frame,
+                stage_times={
+                    "decode": frame.stage_times["decode"],
+                    "pre_process": Detector.pre_process_time,
+                    "inference": Detector.inference_time,
+                    "post_process": Detector.post_process_time,
+                    "draw": draw_time
+                },
+                publish_time=publish_time
+            )
+            if output_sink is not None:
+                output_sink.write(frame=frame, detections=detections)
+
+        progress_bar.update(len(batch_frames))
+    progress_bar.close()
+    return publish_time
+
+def infer_pipelined(
+    frame_loader: FrameLoader,
+    telemetry: Telemetry,
+    output_sink: OutputSink = None,
+    preview_scale: float = 1.0
+) -> float:
+    def pre_process(frame: Frame):
+        frame.input = Detector.pre_process(images=[frame.image])
+
+    def inference(frame: Frame):
+        frame.output = Detector.forward(input=frame.input)
+        frame.input = None
+
+    def post_process(frame: Frame):
+        frame.detections = Detector.post_process(output=frame.output, images=[frame.image], columnar=True)[0]
+        frame.output = None
+
+    def draw(frame: Frame):
+        frame.image = ImagePlotter.draw_detection_batch(
+            image=frame.image, detections=frame.detections, preview_scale=preview_scale
+        )
+
+    pipeline = InferencePipeline(
+        stages=[
+            ("pre_process", pre_process),
+            ("inference", inference),
+            ("post_process", post_process),
+            ("draw", draw),
+        ]
+    )
+    # Input and output tensors are reused across frames, so keep one per frame that can be
+    # queued or running between the stages using them
+    Detector.set_buffer_count(pipeline.queue_size + 2)
+
+    publish_time: float = None
+    for frame in tqdm(pipeline.run(frame_loader.frames()), total=len(frame_loader) or None, desc="[INF. ENGINE] Inferencing images "):
+        publish_time = publish_data(
+            telemetry=telemetry, frame=frame, stage_times=frame.stage_times, publish_time=publish_time
+        )
+        if output_sink is not None:
+            output_sink.write(frame=frame, detections=frame.detections)
+
+    stage_times = pipeline.get_mean_stage_times()
+    print(
+        f"[INF. ENGINE] Pipelined execution finished\n"
+        f"    Throughput: {pipeline.get_throughput():.2f} images/s\n"
+        f"    Mean stage latency (ms): "
+        + ", ".join(f"{name} {duration:.3f}" for name, duration in stage_times.items())
+    )
+    return publish_time
+
+def infer_with_workers(
+    frame_loader: FrameLoader,
+    pool: WorkerPool,
+    telemetry: Telemetry,
+    output_sink: OutputSink = None,
+    preview_scale: float = 1.0
+) -> float:
+    publish_time: float = None
+    for frame in tqdm(pool.run(frame_loader.frames()), total=len(frame_loader) or None, desc="[INF. ENGINE] Inferencing images "):
+        start_ts = time.perf_counter_ns()
+        frame.image = ImagePlotter.draw_detection_batch(
+            image=frame.image, detections=frame.detections, preview_scale=preview_scale
+        )
+        frame.stage_times["draw"] = (time.perf_counter_ns() - start_ts) / 1e6
+
+        publish_time = publish_data(
+            telemetry=telemetry, frame=frame, stage_times=frame.stage_times, publish_time=publish_time
+        )
+        if output_sink is not None:
+            output_sink.write(frame=frame, detections=frame.detections)
+
+    print(
+        f"[INF. ENGINE] Worker pool execution finished\n"
+        f"    Workers: {pool.workers} x {pool.threads} threads\n"
+        f"    Throughput: {pool.get_throughput():.2f} images/s"
+    )
+    return publish_time
+
+def warm_up(
+    frame_loader: FrameLoader,
+    warmup: int,
+    batch_size: int,
+    pool: WorkerPool,
+    telemetry: Telemetry
+):
+    # Each worker process holds its own session, so every one of them gets the warm-up inferences
+    warmup_steps = warmup * pool.workers if pool is not None else warmup
+    if isinstance(frame_loader, VideoLoader):
+        # Streams cannot be rewound, so their first frames are spent on the warm-up
+        frames = frame_loader.frames(limit=warmup_steps * batch_size)
+    elif len(frame_loader) == 0:
+        # An empty images folder has nothing to warm up with
+        return
+    else:
+        warmup_files = [frame_loader.files[idx % len(frame_loader)] for idx in range(warmup_steps * batch_size)]
+        frames = frame_loader.frames(files=warmup_files)
+
+    stage_times = []
+    if pool is not None:
+        stage_times = [
+            (frame.stage_times["pre_process"], frame.stage_times["inference"], frame.stage_times["post_process"])
+            for frame in pool.run(frames)
+        ]
+    else:
+        while True:
+            batch_frames = list(itertools.islice(frames, batch_size))
+            if not batch_frames:
+                break
+            detect(frames=batch_frames)
+            # Batch timings are amortized per image, with one sample per image as in the measured loop
+            stage_times += [(Detector.pre_process_time, Detector.inference_time, Detector.post_process_time)] * len(batch_frames)
+
+    for pre_process_time, inference_time, post_process_time in stage_times:
+        telemetry.record(
+            stage_times={
+                "pre_process": pre_process_time,
+                "inference": inference_time,
+                "post_process": post_process_time,
+            },
+            warmup=True
+        )
+
+def start_inferencing(
+    images_folder: str,
+    model_path: str,
+    half_cores: bool,
+    output_folder: str,
+    batch_size: int = 1,
+    pipelined: bool = False,
+    class_aware_nms: bool = False,
+    io_binding: bool = False,
+    zero_copy: bool = False,
+    workers: int = 1,
+    runtime_config: RuntimeConfig = RuntimeConfig(),
+    model_cache_folder: str = None,
+    clear_model_cache: bool = False,
+    warmup: int = 0,
+    prefetch: int = 4,
+    decode_threads: int = 1,
+    tensor_cache_folder: str = None,
+    clear_tensor_cache: bool = False,
+    video_source: str = None,
+    realtime: bool = False,
+    max_frames: int = None,
+    save_images: bool = False,
+    jpeg_quality: int = 90,
+    image_sampling: int = 1,
+    save_detections: str = None,
+    output_queue_size: int = 32,
+    preview_scale: float = 1.0,
+    backend: str = None,
+    telemetry_format: str = "binary",
+    telemetry_batch: int = 64,
+    telemetry_interval: float = 250.0,
+    transport: str = "mqtt",
+    socket_path: str = None,
+    producer: Producer = None
+):
     '''
     STAGE 1: Inference engine setup
     '''
-    Detector.init(
-        model_path=model_path,
-        score_thresh=0.25,
-        confidence_thresh=0.5,
-        iou_thresh=0.5,
-        half_cores=half_cores
-    )
-
-    mqtt_producer = MQTTProducer(
-        server={
-            "address": "localhost",
-            "port": 1883
-        },
-        client_id="inference"
-    )
-    mqtt_producer.start()
+    if clear_model_cache and model_cache_folder is not None:
+        # Imported here so runs that keep the cache do not load ONNX Runtime before the backend is chosen
+        from ai.inferencers.onnxrt import OnnxRT
+        OnnxRT.clear_model_cache(model_cache_folder=model_cache_folder)
+
+    detector_options = {
+        "model_path": model_path,
+        "score_thresh": 0.25,
+        "confidence_thresh": 0.5,
+        "iou_thresh": 0.5,
+        "half_cores": half_cores,
+        "class_aware_nms": class_aware_nms,
+        "io_binding": io_binding,
+        "zero_copy": zero_copy,
+        "runtime_config": runtime_config,
+        "model_cache_folder": model_cache_folder,
+        "backend": backend
+    }
+    pool: WorkerPool = None
+    if workers > 1:
+        # Each worker process loads its own session, splitting the cores between them by default
+        threads = runtime_config.intra_op_threads
+        if threads is None:
+            threads = max(1, runtime_config.get_intra_op_threads(half_cores=half_cores) // workers)
+        pool = WorkerPool(detector_options=detector_options, workers=workers, threads=threads)
+        # Workers start concurrently, so startup lasts as long as the slowest one
+        import_time = max(details["import_time"] for details in pool.startup_details)
+        load_time = max(details["load_time"] for details in pool.startup_details)
+        model_cache = pool.startup_details[0]["model_cache"]
+        backend = pool.startup_details[0]["backend"]
+    else:
+        Detector.init(**detector_options)
+        import_time = Detector.import_time
+        load_time = Detector.load_time
+        model_cache = Detector.model_cache
+        backend = Detector.backend
+
+    # The benchmark can also read the messages from a Unix socket, or hand over its own channel when
+    # it runs the engine in its process, so no broker is needed
+    if producer is None and transport == "socket":
+        producer = SocketProducer(socket_path=socket_path)
+    elif producer is None:
+        producer = MQTTProducer(
+            server={
+                "address": "localhost",
+                "port": 1883
+            },
+            client_id="inference"
+        )
+    producer.start()
+    # Per-frame records are batched and published by a background thread, off the measured loop
+    telemetry = Telemetry(
+        producer=producer,
+        format=telemetry_format,
+        flush_frames=telemetry_batch,
+        flush_interval=telemetry_interval
+    )
     
-    image_files = [f for f in os.listdir(images_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-    os.makedirs(output_folder, exist_ok=True)
+    tensor_cache: TensorCache = None
+    if tensor_cache_folder is not None:
+        if clear_tensor_cache:
+            TensorCache.clear(cache_folder=tensor_cache_folder)
+        tensor_cache = TensorCache(cache_folder=tensor_cache_folder, **Detector.get_input_format())
+
+    # Frames are decoded ahead of the inference loop, so decoding stays off its critical path
+    frame_loader: FrameLoader
+    if video_source is not None:
+        frame_loader = VideoLoader(source=video_source, realtime=realtime, prefetch=prefetch, max_frames=max_frames)
+    else:
+        frame_loader = ImageLoader(
+            images_folder=images_folder,
+            prefetch=prefetch,
+            threads=decode_threads,
+            tensor_cache=tensor_cache
+        )
+    if tensor_cache is not None:
+        fill_tensor_cache(frame_loader=frame_loader)
+    # Outputs are written by a background thread, so they never hold the inference loop
+    output_sink: OutputSink = None
+    if save_images or save_detections is not None:
+        output_sink = OutputSink(
+            output_folder=output_folder,
+            save_images=save_images,
+            jpeg_quality=jpeg_quality,
+            image_sampling=image_sampling,
+            detections_format=save_detections,
+            queue_size=output_queue_size
+        )
+        output_sink.start()
 
     '''
     STAGE 2: Continuous inferencing
     '''
-    mqtt_producer.produce(
+    producer.produce(
         topic="inferenceEngine/status",
-        msg={"active": True}
+        msg={
+            "active": True,
+            # The benchmark tracks the resource usage of this process and of its workers
+            "pid": os.getpid(),
+            "import_time": round(import_time, 3),
+            "load_time": round(load_time, 3),
+            "model_cache": model_cache,
+            "telemetry": telemetry.get_schema()
+        }
     )
-    
-    for image_file in tqdm(image_files, desc="[INF. ENGINE] Inferencing images "):
-        image_path = os.path.join(images_folder, image_file)
-        image = cv2.imread(image_path)
+    telemetry.start()
 
-        detections = Detector.run(image=image)        
-        mqtt_producer.produce(
-            topic="inferenceEngine/data",
-            msg={
-                "pre_processing_time": Detector.pre_process_time,
-                "inference_time": Detector.inference_time,
-                "post_processing_time": Detector.post_process_time,
-            }
+    # Warm-up inferences absorb lazy allocations, kernel selection and cold caches before the measured loop
+    if warmup > 0:
+        warm_up(
+            frame_loader=frame_loader,
+            warmup=warmup,
+            batch_size=batch_size,
+            pool=pool,
+            telemetry=telemetry
         )
-        
-        for detection in detections:
-            ImagePlotter.draw_detections(
-                image=image,
-                detection=detection
+    
+    start_ts = time.perf_counter_ns()
+    if pool is not None:
+        try:
+            last_publish_time = infer_with_workers(
+                frame_loader=frame_loader,
+                pool=pool,
+                telemetry=telemetry,
+                output_sink=output_sink,
+                preview_scale=preview_scale
             )
-
-        #output_path = os.path.join(output_folder, image_file)
-        #cv2.imwrite(output_path, image)
+        except BaseException:
+            pool.close()
+            raise
+    elif pipelined:
+        last_publish_time = infer_pipelined(
+            frame_loader=frame_loader,
+            telemetry=telemetry,
+            output_sink=output_sink,
+            preview_scale=preview_scale
+        )
+    else:
+        last_publish_time = infer_sequentially(
+            frame_loader=frame_loader,
+            batch_size=batch_size,
+            telemetry=telemetry,
+            output_sink=output_sink,
+            preview_scale=preview_scale
+        )
+    elapsed_time = (time.perf_counter_ns() - start_ts) / 1e6
     
     '''
     STAGE 3: Stop inferencing and alerting
     '''
-    mqtt_producer.produce(
+    frame_loader.close()
+    first_inference_time = Detector.first_inference_time
+    if pool is not None:
+        first_inference_time = pool.first_inference_time
+        pool.close()
+    print(
+        f"[INF. ENGINE] Cold start\n"
+        f"    Backend: {backend}\n"
+        f"    Backend import: {import_time:.3f} ms\n"
+        f"    Model load: {load_time:.3f} ms (optimized model cache: {model_cache})\n"
+        f"    First inference: {f'{first_inference_time:.3f} ms' if first_inference_time is not None else 'n/a'}"
+    )
+
+    status_msg = {
+        "active": False,
+        "processed_images": len(frame_loader),
+        "elapsed_time": round(elapsed_time, 3),
+        # None when no frame was processed (e.g. an empty images folder)
+        "first_inference_time": round(first_inference_time, 3) if first_inference_time is not None else None,
+        "last_publish_time": last_publish_time
+    }
+    if isinstance(frame_loader, VideoLoader):
+        status_msg["processed_images"] = frame_loader.delivered_frames
+        status_msg["captured_frames"] = frame_loader.captured_frames
+        status_msg["dropped_frames"] = frame_loader.dropped_frames
+        print(
+            f"[INF. ENGINE] Stream finished ({'real-time' if realtime else 'every frame'})\n"
+            f"    Captured frames: {frame_loader.captured_frames} (source at {frame_loader.fps:.2f} FPS)\n"
+            f"    Processed frames: {frame_loader.delivered_frames} "
+            f"({frame_loader.delivered_frames / (elapsed_time / 1000):.2f} FPS)\n"
+            f"    Dropped frames: {frame_loader.dropped_frames}"
+        )
+
+    # Records still buffered are published before the final status, so the benchmark has them all
+    telemetry.stop()
+    telemetry_stats = telemetry.get_stats()
+    status_msg.update({f"telemetry_{name}": value for name, value in telemetry_stats.items()})
+    print(
+        f"[INF. ENGINE] Telemetry ({telemetry_stats['format']})\n"
+        f"    Records: {telemetry_stats['records']} in {telemetry_stats['flushes']} batches "
+        f"({telemetry_stats['flushed_bytes']} bytes)\n"
+        f"    Batch publish time: mean {telemetry_stats['mean_flush_time']:.3f} ms, "
+        f"max {telemetry_stats['max_flush_time']:.3f} ms"
+    )
+
+    output_error = None
+    if output_sink is not None:
+        # Pending writes are flushed after the measured loop. A writer failure is raised only once the
+        # final status is sent, so the benchmark is not left waiting for it
+        try:
+            output_sink.stop()
+        except RuntimeError as error:
+            output_error = error
+        output_stats = output_sink.get_stats()
+        status_msg.update({f"output_{name}": value for name, value in output_stats.items()})
+        print(
+            f"[INF. ENGINE] Output sink\n"
+            f"    Written images: {output_stats['written_images']}, records: {output_stats['written_records']}\n"
+            f"    Dropped writes: {output_stats['dropped_writes']}\n"
+            f"    Queue depth: max {output_stats['max_queue_depth']} of {output_sink.queue_size}, "
+            f"mean {output_stats['mean_queue_depth']:.2f}"
+        )
+
+    producer.produce(
         topic="inferenceEngine/status",
-        msg={"active": False}
+        msg=status_msg
     )
+    producer.stop()
+    if output_error is not None:
+        raise output_error
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--images_folder",
         type=str,
-        required=True,
+        default=None,
         help="Path to the folder containing images."
     )
+    parser.add_argument(
+        "--video_source",
+        type=str,
+        default=None,
+        help="Video file, stream URL, device path or camera index read instead of an images folder."
+    )
     parser.add_argument(
         "--model_path",
         type=str,
@@ -86,6 +501,14 @@ if __name__ == "__main__":
         help="Path to the YOLOv8 model file."
     )
     
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=("onnxrt", "opencvrt"),
+        default=None,
+        help="Inference backend of ONNX models: ONNX Runtime (default) or the OpenCV DNN module."
+    )
+
     parser.add_argument(
         "--half_cores",
         action="store_true",
@@ -98,14 +521,328 @@ if __name__ == "__main__":
         default="data/output",
         help="Path to the folder where output images will be saved."
     )    
+
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=1,
+        help="Number of images processed by each forward pass."
+    )
+
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Run decode, preprocessing, inference, postprocessing and drawing as concurrent stages."
+    )
+
+    parser.add_argument(
+        "--class_aware_nms",
+        action="store_true",
+        help="Apply Non-Maximum Suppression per class instead of across all classes."
+    )
+
+    parser.add_argument(
+        "--io_binding",
+        action="store_true",
+        help="Run ONNX models through an I/O binding with reused input and output buffers."
+    )
+
+    parser.add_argument(
+        "--zero_copy",
+        action="store_true",
+        help="Run LiteRT models through views of the interpreter tensors, decoding only confident anchors."
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, each one running its own inference session."
+    )
+
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Number of inference threads per session (defaults to the available cores split between workers)."
+    )
+
+    parser.add_argument(
+        "--inter_op_threads",
+        type=int,
+        default=None,
+        help="Number of ONNX Runtime inter-op threads, used by the parallel execution mode."
+    )
+
+    parser.add_argument(
+        "--execution_mode",
+        type=str,
+        choices=EXECUTION_MODES,
+        default="sequential",
+        help="ONNX Runtime execution mode of the graph operators."
+    )
+
+    parser.add_argument(
+        "--graph_optimization",
+        type=str,
+        choices=GRAPH_OPTIMIZATION_LEVELS,
+        default="all",
+        help="ONNX Runtime graph optimization level."
+    )
+
+    parser.add_argument(
+        "--no_spinning",
+        action="store_true",
+        help="Disable the busy-waiting of idle ONNX Runtime threads."
+    )
+
+    parser.add_argument(
+        "--cpu_affinity",
+        type=int,
+        nargs="+",
+        default=None,
+        help="CPU cores the inference engine is pinned to (e.g. 2 3)."
+    )
+
+    parser.add_argument(
+        "--no_xnnpack",
+        action="store_true",
+        help="Run LiteRT models without the XNNPACK delegate."
+    )
+
+    parser.add_argument(
+        "--opencv_backend",
+        type=str,
+        choices=OPENCV_BACKENDS,
+        default="opencv",
+        help="OpenCV DNN computation backend."
+    )
+
+    parser.add_argument(
+        "--opencv_target",
+        type=str,
+        choices=OPENCV_TARGETS,
+        default="cpu",
+        help="OpenCV DNN target device."
+    )
+
+    parser.add_argument(
+        "--model_cache_folder",
+        type=str,
+        default=None,
+        help="Folder caching the graphs optimized by ONNX Runtime, so later runs skip the optimization."
+    )
+
+    parser.add_argument(
+        "--clear_model_cache",
+        action="store_true",
+        help="Remove the cached optimized models before loading the model."
+    )
+
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        help="Number of warm-up inferences (per worker) run and reported apart before the measured loop."
+    )
+
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=4,
+        help="Number of images decoded ahead of the inference loop (0 decodes each image when it is needed)."
+    )
+
+    parser.add_argument(
+        "--decode_threads",
+        type=int,
+        default=1,
+        help="Number of threads decoding the prefetched images."
+    )
+
+    parser.add_argument(
+        "--tensor_cache_folder",
+        type=str,
+        default=None,
+        help="Folder caching the preprocessed input tensors, so runs read them instead of decoding the images."
+    )
+
+    parser.add_argument(
+        "--clear_tensor_cache",
+        action="store_true",
+        help="Remove the cached input tensors before filling the cache."
+    )
+
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Process only the latest frame of the video source, dropping the frames the engine cannot keep up with."
+    )
+
+    parser.add_argument(
+        "--max_frames",
+        type=int,
+        default=None,
+        help="Maximum number of video frames processed (needed to stop live streams)."
+    )
+
+    parser.add_argument(
+        "--save_images",
+        action="store_true",
+        help="Save the annotated images to the output folder, from a background writer."
+    )
+
+    parser.add_argument(
+        "--jpeg_quality",
+        type=int,
+        default=90,
+        help="JPEG quality (0-100) of the saved images."
+    )
+
+    parser.add_argument(
+        "--image_sampling",
+        type=int,
+        default=1,
+        help="Save one annotated image every N frames."
+    )
+
+    parser.add_argument(
+        "--save_detections",
+        type=str,
+        choices=DETECTIONS_FORMATS,
+        default=None,
+        help="Append the detections of each frame to detections.jsonl or detections.bin in the output folder."
+    )
+
+    parser.add_argument(
+        "--output_queue_size",
+        type=int,
+        default=32,
+        help="Maximum number of pending writes before further ones are dropped."
+    )
+
+    parser.add_argument(
+        "--preview_scale",
+        type=float,
+        default=1.0,
+        help="Draw the detections onto a copy of each image downscaled by this factor (0-1]."
+    )
+
+    parser.add_argument(
+        "--telemetry",
+        type=str,
+        choices=TELEMETRY_FORMATS,
+        default="binary",
+        help="Publish the per-frame timings as batches of binary records, or as one JSON message per frame."
+    )
+
+    parser.add_argument(
+        "--telemetry_batch",
+        type=int,
+        default=64,
+        help="Number of binary records published together."
+    )
+
+    parser.add_argument(
+        "--telemetry_interval",
+        type=float,
+        default=250.0,
+        help="Maximum time in milliseconds a binary record waits before being published."
+    )
+    parser.add_argument(
+        "--transport",
+        type=str,
+        choices=["mqtt", "socket"],
+        default="mqtt",
+        help="How status and timing messages reach the benchmark: the MQTT broker on localhost or a Unix socket."
+    )
+    parser.add_argument(
+        "--socket_path",
+        type=str,
+        default="/tmp/yolo-benchmark.sock",
+        help="Unix socket the benchmark listens on, with --transport socket."
+    )
     
     # Parse arguments
     args = parser.parse_args()
+    if (args.images_folder is None) == (args.video_source is None):
+        parser.error("Exactly one of --images_folder and --video_source is required.")
+    if args.video_source is not None and args.tensor_cache_folder is not None:
+        parser.error("--tensor_cache_folder only applies to images folders.")
+    if (args.realtime or args.max_frames is not None) and args.video_source is None:
+        parser.error("--realtime and --max_frames only apply to --video_source.")
+    if args.realtime and args.batch_size > 1:
+        parser.error("--realtime does not support --batch_size greater than 1.")
+    if args.pipelined and args.batch_size > 1:
+        parser.error("--pipelined does not support --batch_size greater than 1.")
+    if args.zero_copy and not args.model_path.endswith(".tflite"):
+        parser.error("--zero_copy is only supported with LiteRT models.")
+    if args.zero_copy and args.pipelined:
+        parser.error("--zero_copy does not support --pipelined, as the interpreter tensors hold a single frame.")
+    if args.workers > 1 and (args.pipelined or args.batch_size > 1):
+        parser.error("--workers greater than 1 does not support --pipelined or --batch_size greater than 1.")
+    onnx_options = (
+        args.inter_op_threads is not None or args.execution_mode != "sequential"
+        or args.graph_optimization != "all" or args.no_spinning
+    )
+    if onnx_options and not args.model_path.endswith(".onnx"):
+        parser.error("--inter_op_threads, --execution_mode, --graph_optimization and --no_spinning only apply to ONNX models.")
+    if args.backend is not None and not args.model_path.endswith(".onnx"):
+        parser.error("--backend only applies to ONNX models.")
+    if args.backend == "opencvrt" and (onnx_options or args.io_binding or args.model_cache_folder is not None):
+        parser.error("ONNX Runtime options (--io_binding, --model_cache_folder and session tuning) do not apply to --backend opencvrt.")
+    if (args.opencv_backend != "opencv" or args.opencv_target != "cpu") and args.backend != "opencvrt":
+        parser.error("--opencv_backend and --opencv_target only apply to --backend opencvrt.")
+    if args.tensor_cache_folder is not None and (args.pipelined or args.workers > 1 or args.zero_copy):
+        parser.error("--tensor_cache_folder does not support --pipelined, --workers greater than 1 or --zero_copy.")
+    if args.no_xnnpack and not args.model_path.endswith(".tflite"):
+        parser.error("--no_xnnpack only applies to LiteRT models.")
+    if not 0 < args.preview_scale <= 1:
+        parser.error("--preview_scale must be in (0, 1].")
 
     # Call the function with the provided arguments
     start_inferencing(
         images_folder=args.images_folder, 
         model_path=args.model_path, 
         half_cores=args.half_cores,
-        output_folder=args.output_folder
+        output_folder=args.output_folder,
+        batch_size=args.batch_size,
+        pipelined=args.pipelined,
+        class_aware_nms=args.class_aware_nms,
+        io_binding=args.io_binding,
+        zero_copy=args.zero_copy,
+        workers=args.workers,
+        runtime_config=RuntimeConfig(
+            intra_op_threads=args.threads,
+            cpu_affinity=args.cpu_affinity,
+            inter_op_threads=args.inter_op_threads,
+            execution_mode=args.execution_mode,
+            graph_optimization_level=args.graph_optimization,
+            allow_spinning=not args.no_spinning,
+            use_xnnpack=not args.no_xnnpack,
+            opencv_backend=args.opencv_backend,
+            opencv_target=args.opencv_target
+        ),
+        model_cache_folder=args.model_cache_folder,
+        clear_model_cache=args.clear_model_cache,
+        warmup=args.warmup,
+        prefetch=args.prefetch,
+        decode_threads=args.decode_threads,
+        tensor_cache_folder=args.tensor_cache_folder,
+        clear_tensor_cache=args.clear_tensor_cache,
+        video_source=args.video_source,
+        realtime=args.realtime,
+        max_frames=args.max_frames,
+        save_images=args.save_images,
+        jpeg_quality=args.jpeg_quality,
+        image_sampling=args.image_sampling,
+        save_detections=args.save_detections,
+        output_queue_size=args.output_queue_size,
+        preview_scale=args.preview_scale,
+        backend=args.backend,
+        telemetry_format=args.telemetry,
+        telemetry_batch=args.telemetry_batch,
+        telemetry_interval=args.telemetry_interval,
+        transport=args.transport,
+        socket_path=args.socket_path
     )
\ No newline at end of file
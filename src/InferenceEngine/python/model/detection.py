@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from typing import Iterator, List
+import numpy as np
 
 @dataclass
 class BoundingBox:
@@ -25,4 +27,86 @@ class Detection:
         return self.score
 
     def get_bounding_box(self) -> BoundingBox:
-        return self.bbox
\ No newline at end of file
+        return self.bbox
+
+DETECTION_DTYPE = np.dtype([
+    ("class_id", np.int32),
+    ("score", np.float32),
+    ("box", np.int32, (4,)),  # xMin, yMin, xMax, yMax
+])
+
+class DetectionView:
+    __slots__ = ("__records", "__index")
+
+    def __init__(self, records: np.ndarray, index: int):
+        self.__records = records
+        self.__index = index
+
+    def get_class_id(self) -> int:
+        return int(self.__records["class_id"][self.__index])
+
+    def get_score(self) -> float:
+        return float(self.__records["score"][self.__index])
+
+    def get_bounding_box(self) -> BoundingBox:
+        xMin, yMin, xMax, yMax = self.__records["box"][self.__index].tolist()
+        return BoundingBox(xMin=xMin, yMin=yMin, xMax=xMax, yMax=yMax)
+
+class DetectionBatch:
+    __slots__ = ("records",)
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+
+    @staticmethod
+    def from_arrays(classes_ids: np.ndarray, scores: np.ndarray, boxes: np.ndarray) -> "DetectionBatch":
+        records = np.empty(len(scores), dtype=DETECTION_DTYPE)
+        records["class_id"] = classes_ids
+        records["score"] = scores
+        records["box"] = np.asarray(boxes).reshape(-1, 4)
+        return DetectionBatch(records)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "DetectionBatch":
+        return DetectionBatch(np.frombuffer(data, dtype=DETECTION_DTYPE))
+
+    def get_classes_ids(self) -> np.ndarray:
+        return self.records["class_id"]
+
+    def get_scores(self) -> np.ndarray:
+        return self.records["score"]
+
+    def get_boxes(self) -> np.ndarray:
+        return self.records["box"]
+
+    def to_detections(self) -> List[Detection]:
+        return [
+            Detection(class_id=class_id, score=score, locations=box)
+            for class_id, score, box in zip(
+                self.records["class_id"].tolist(), self.records["score"].tolist(), self.records["box"].tolist()
+            )
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "classes_ids": self.records["class_id"].tolist(),
+            "scores": self.records["score"].tolist(),
+            "boxes": self.records["box"].tolist(),
+        }
+
+    def to_bytes(self) -> bytes:
+        return self.records.tobytes()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> DetectionView:
+        if index < 0:
+            index += len(self.records)
+        if not 0 <= index < len(self.records):
+            raise IndexError("DetectionBatch index out of range")
+        return DetectionView(self.records, index)
+
+    def __iter__(self) -> Iterator[DetectionView]:
+        for index in range(len(self.records)):
+            yield DetectionView(self.records, index)
@@ -0,0 +1,15 @@
+from dataclasses import dataclass, field
+from typing import Dict
+import numpy as np
+
+@dataclass
+class Frame:
+    index: int
+    name: str
+    image: np.ndarray = None
+    image_shape: tuple = None
+    capture_ts: int = None
+    input: np.ndarray = None
+    output: np.ndarray = None
+    detections: list = None
+    stage_times: Dict[str, float] = field(default_factory=dict)
@@ -0,0 +1,59 @@
+import os
+import multiprocessing
+from dataclasses import dataclass, asdict
+from typing import List
+
+EXECUTION_MODES = ("sequential", "parallel")
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+OPENCV_BACKENDS = ("default", "opencv", "openvino", "cuda", "vulkan")
+OPENCV_TARGETS = ("cpu", "opencl", "opencl_fp16", "cuda", "cuda_fp16", "vulkan")
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    # Shared by ONNX Runtime (intra-op threads), LiteRT (interpreter threads) and OpenCV DNN (thread pool)
+    intra_op_threads: int = None
+    cpu_affinity: List[int] = None
+
+    # ONNX Runtime only
+    inter_op_threads: int = None
+    execution_mode: str = "sequential"
+    graph_optimization_level: str = "all"
+    allow_spinning: bool = True
+
+    # LiteRT only
+    use_xnnpack: bool = True
+
+    # OpenCV DNN only
+    opencv_backend: str = "opencv"
+    opencv_target: str = "cpu"
+
+    def __post_init__(self):
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Invalid execution mode '{self.execution_mode}', expected one of {EXECUTION_MODES}.")
+        if self.graph_optimization_level not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(
+                f"Invalid graph optimization level '{self.graph_optimization_level}', "
+                f"expected one of {GRAPH_OPTIMIZATION_LEVELS}."
+            )
+        if self.opencv_backend not in OPENCV_BACKENDS:
+            raise ValueError(f"Invalid OpenCV backend '{self.opencv_backend}', expected one of {OPENCV_BACKENDS}.")
+        if self.opencv_target not in OPENCV_TARGETS:
+            raise ValueError(f"Invalid OpenCV target '{self.opencv_target}', expected one of {OPENCV_TARGETS}.")
+        if self.cpu_affinity is not None:
+            object.__setattr__(self, "cpu_affinity", sorted(set(self.cpu_affinity)))
+
+    def get_intra_op_threads(self, half_cores: bool) -> int:
+        if self.intra_op_threads is not None:
+            return self.intra_op_threads
+
+        num_cores = len(self.cpu_affinity) if self.cpu_affinity else multiprocessing.cpu_count()
+        if half_cores:
+            num_cores = num_cores // 2
+        return max(1, num_cores)
+
+    def apply_cpu_affinity(self) -> None:
+        if self.cpu_affinity:
+            os.sched_setaffinity(0, self.cpu_affinity)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
@@ -0,0 +1,168 @@
+import time
+import threading
+from queue import Queue
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from model.frame import Frame
+
+class InferencePipeline:
+    """
+    InferencePipeline runs the steps of the inference loop as a chain of stages, each one on its own
+    worker thread and connected to the next by a bounded queue. While a stage works on frame N, the
+    previous stage can already work on frame N+1, so the CPU is kept busy whenever a native runtime
+    releases the GIL. Frames leave the pipeline in the order they entered it.
+
+    Attributes:
+        stages (List[Tuple[str, Callable[[Frame], None]]]):
+            Ordered list of (name, function) pairs. Each function processes a frame in place.
+        queue_size (int):
+            Maximum number of frames waiting between two consecutive stages.
+        stage_times (Dict[str, List[float]]):
+            Duration in milliseconds taken by each stage, per frame, in frame order.
+        elapsed_time (float):
+            Wall-clock duration in milliseconds of the last run.
+        processed_frames (int):
+            Number of frames that went through every stage in the last run.
+    """
+
+    __STOP = object()
+
+    stages: List[Tuple[str, Callable[[Frame], None]]]
+    queue_size: int
+    stage_times: Dict[str, List[float]]
+    elapsed_time: float
+    processed_frames: int
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Frame], None]]], queue_size: int = 2):
+        """
+        Initializes the pipeline with its stages and the capacity of the queues between them.
+
+        Args:
+            stages (List[Tuple[str, Callable[[Frame], None]]]): Ordered (name, function) pairs.
+            queue_size (int, optional): Maximum number of frames waiting between stages. Defaults to 2.
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stage_times = {name: [] for name, _ in stages}
+        self.elapsed_time = 0.0
+        self.processed_frames = 0
+
+    def run(self, frames: Iterable[Frame]) -> Iterator[Frame]:
+        """
+        Feeds the frames through every stage and yields them once they leave the last stage.
+
+        Args:
+            frames (Iterable[Frame]): Frames to be processed, in order.
+
+        Yields:
+            Frame: Processed frames, in the same order, with `stage_times` filled in.
+
+        Raises:
+            Exception: Any exception raised by a stage is re-raised in the consuming thread.
+        """
+        queues: List[Queue] = [Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        workers: List[threading.Thread] = [
+            threading.Thread(target=self.__feed, args=(frames, queues[0]), daemon=True)
+        ]
+        for idx, (name, function) in enumerate(self.stages):
+            workers.append(
+                threading.Thread(
+                    target=self.__work,
+                    args=(name, function, queues[idx], queues[idx + 1]),
+                    daemon=True
+                )
+            )
+
+        self.stage_times = {name: [] for name, _ in self.stages}
+        self.processed_frames = 0
+        start_ts = time.perf_counter_ns()
+        for worker in workers:
+            worker.start()
+
+        while True:
+            frame = queues[-1].get()
+            if frame is InferencePipeline.__STOP:
+                break
+            if isinstance(frame, Exception):
+                raise frame
+
+            for name, _ in self.stages:
+                self.stage_times[name].append(frame.stage_times[name])
+            self.processed_frames += 1
+            yield frame
+
+        self.elapsed_time = (time.perf_counter_ns() - start_ts) / 1e6
+
+    def get_throughput(self) -> float:
+        """
+        Computes the end-to-end throughput of the last run.
+
+        Returns:
+            float: Processed frames per second.
+        """
+        if self.elapsed_time == 0:
+            return 0.0
+        return self.processed_frames / (self.elapsed_time / 1000)
+
+    def get_mean_stage_times(self) -> Dict[str, float]:
+        """
+        Computes the mean latency of each stage over the last run.
+
+        Returns:
+            Dict[str, float]: Mean duration in milliseconds per stage name.
+        """
+        return {
+            name: (sum(times) / len(times) if times else 0.0)
+            for name, times in self.stage_times.items()
+        }
+
+    @staticmethod
+    def __feed(frames: Iterable[Frame], output_queue: Queue) -> None:
+        """
+        Puts the input frames into the first queue, followed by the stop marker.
+
+        Args:
+            frames (Iterable[Frame]): Frames to be processed.
+            output_queue (Queue): Input queue of the first stage.
+        """
+        try:
+            for frame in frames:
+                output_queue.put(frame)
+        except Exception as error:
+            output_queue.put(error)
+        output_queue.put(InferencePipeline.__STOP)
+
+    @staticmethod
+    def __work(name: str, function: Callable[[Frame], None], input_queue: Queue, output_queue: Queue) -> None:
+        """
+        Applies a stage function to every frame of its input queue and times it. After a failure,
+        the remaining frames are discarded so upstream stages never block on a full queue.
+
+        Args:
+            name (str): Stage name, used as key in the frame stage times.
+            function (Callable[[Frame], None]): Stage function, processing the frame in place.
+            input_queue (Queue): Queue holding the frames coming from the previous stage.
+            output_queue (Queue): Queue holding the frames going to the next stage.
+        """
+        failed: bool = False
+        while True:
+            frame = input_queue.get()
+            if frame is InferencePipeline.__STOP:
+                output_queue.put(frame)
+                break
+            if failed:
+                continue
+            if isinstance(frame, Exception):
+                failed = True
+                output_queue.put(frame)
+                continue
+
+            try:
+                start_ts = time.perf_counter_ns()
+                function(frame)
+                frame.stage_times[name] = (time.perf_counter_ns() - start_ts) / 1e6
+            except Exception as error:
+                failed = True
+                output_queue.put(error)
+                continue
+
+            output_queue.put(frame)
@@ -0,0 +1,324 @@
+import time
+import queue
+import traceback
+import contextlib
+import numpy as np
+import multiprocessing
+from dataclasses import replace
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Tuple
+from model.frame import Frame
+from model.detection import DetectionBatch
+from model.runtimeconfig import RuntimeConfig
+
+class WorkerPool:
+    """
+    WorkerPool runs the detection of each frame on one of several worker processes, each one with its
+    own Detector session. Images are handed over through shared memory slots instead of being pickled,
+    and only the slot name and image shape go through the task queue. Frames leave the pool in the
+    order they entered it.
+
+    Attributes:
+        workers (int):
+            Number of worker processes.
+        threads (int):
+            Number of inference threads used by each worker session.
+        slot_count (int):
+            Number of shared memory slots, which bounds the number of frames in flight.
+        elapsed_time (float):
+            Wall-clock duration in milliseconds of the last run.
+        processed_frames (int):
+            Number of frames processed in the last run.
+        startup_details (List[dict]):
+            Backend import time, model load time, optimized model cache outcome and backend name reported
+            by each worker.
+        first_inference_time (float):
+            Inference duration in milliseconds of the first frame of the last run, the first one of
+            the worker that took it.
+        __slots (List[shared_memory.SharedMemory]):
+            Private attribute holding the shared memory slots, grown on demand for larger images.
+        __processes (List[multiprocessing.Process]):
+            Private attribute holding the worker processes.
+    """
+
+    __STOP = None
+    # Results are awaited in steps of this many seconds, checking in between that every worker is alive
+    __POLL_INTERVAL = 1.0
+
+    workers: int
+    threads: int
+    slot_count: int
+    elapsed_time: float
+    processed_frames: int
+    startup_details: List[dict]
+    first_inference_time: float
+
+    def __init__(self, detector_options: dict, workers: int, threads: int, slot_count: int = None):
+        """
+        Initializes the pool and starts the worker processes, each one loading its own Detector.
+
+        Args:
+            detector_options (dict): Keyword arguments of `Detector.init`.
+            workers (int): Number of worker processes.
+            threads (int): Number of inference threads used by each worker session, overriding the
+                one of the runtime configuration.
+            slot_count (int, optional): Number of shared memory slots. Defaults to twice the number
+                of workers, so each worker has a frame queued while it processes another.
+
+        Raises:
+            RuntimeError: If a worker fails to load its Detector or exits while loading it.
+        """
+        self.workers = workers
+        self.threads = threads
+        self.slot_count = slot_count if slot_count is not None else 2 * workers
+        self.elapsed_time = 0.0
+        self.processed_frames = 0
+        self.first_inference_time = None
+        self.__slots = [None] * self.slot_count
+
+        # Inference runtimes are not fork-safe once initialized, so workers start from a fresh interpreter
+        context = multiprocessing.get_context("spawn")
+        self.__tasks = context.Queue()
+        self.__results = context.Queue()
+        self.__processes = [
+            context.Process(
+                target=WorkerPool.serve,
+                args=(detector_options, threads, self.__tasks, self.__results),
+                daemon=True
+            )
+            for _ in range(workers)
+        ]
+        for process in self.__processes:
+            process.start()
+
+        self.startup_details = list()
+        for _ in range(workers):
+            try:
+                status = self.__get_result()
+            except RuntimeError:
+                self.close()
+                raise
+            if isinstance(status, str):
+                self.close()
+                raise RuntimeError(f"Worker failed to load the detector:\n{status}")
+            self.startup_details.append(status)
+
+    def run(self, frames: Iterable[Frame]) -> Iterator[Frame]:
+        """
+        Copies each frame image into a free slot, dispatches it to the workers and yields the frames
+        once their detections are back. The image of a frame is replaced by a view of its slot, valid
+        until the next frame is requested.
+
+        Args:
+            frames (Iterable[Frame]): Frames to be processed, in order, with their image decoded.
+
+        Yields:
+            Frame: Processed frames, in the same order, with `detections` and `stage_times` filled in.
+
+        Raises:
+            RuntimeError: If a worker fails to process a frame or exits while frames are in flight.
+        """
+        free_slots: List[int] = list(range(self.slot_count))
+        in_flight: Dict[int, Tuple[Frame, int]] = dict()
+        finished: Dict[int, tuple] = dict()
+        next_index: int = 0
+
+        self.processed_frames = 0
+        start_ts = time.perf_counter_ns()
+        frames = iter(frames)
+        exhausted: bool = False
+        while not exhausted or in_flight:
+            # Keep every slot busy before waiting on results
+            while not exhausted and free_slots:
+                frame = next(frames, None)
+                if frame is None:
+                    exhausted = True
+                    break
+                slot_idx = free_slots.pop()
+                self.__dispatch(frame=frame, slot_idx=slot_idx)
+                in_flight[frame.index] = (frame, slot_idx)
+
+            if not in_flight:
+                break
+
+            result = self.__get_result()
+            if isinstance(result, str):
+                raise RuntimeError(f"Worker failed to process a frame:\n{result}")
+            finished[result[0]] = result
+
+            while next_index in finished:
+                _, detections, stage_times = finished.pop(next_index)
+                frame, slot_idx = in_flight.pop(next_index)
+                frame.detections = DetectionBatch.from_bytes(detections)
+                frame.stage_times.update(stage_times)
+                if self.first_inference_time is None:
+                    self.first_inference_time = stage_times["inference"]
+                self.processed_frames += 1
+                yield frame
+
+                free_slots.append(slot_idx)
+                next_index += 1
+
+        self.elapsed_time = (time.perf_counter_ns() - start_ts) / 1e6
+
+    def get_throughput(self) -> float:
+        """
+        Computes the end-to-end throughput of the last run.
+
+        Returns:
+            float: Processed frames per second.
+        """
+        if self.elapsed_time == 0:
+            return 0.0
+        return self.processed_frames / (self.elapsed_time / 1000)
+
+    def close(self) -> None:
+        """
+        Stops the worker processes and releases the shared memory slots.
+        """
+        for _ in self.__processes:
+            self.__tasks.put(WorkerPool.__STOP)
+        for process in self.__processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+        for slot_idx in range(self.slot_count):
+            self.__release(slot_idx=slot_idx)
+
+    def __dispatch(self, frame: Frame, slot_idx: int) -> None:
+        """
+        Copies the frame image into its slot, growing the slot when the image does not fit, and
+        queues the frame for the workers. The frame image is replaced by the slot view.
+
+        Args:
+            frame (Frame): Frame to be processed, with its image decoded.
+            slot_idx (int): Index of the free slot to use.
+        """
+        slot = self.__slots[slot_idx]
+        if slot is None or slot.size < frame.image.nbytes:
+            self.__release(slot_idx=slot_idx)
+            slot = shared_memory.SharedMemory(create=True, size=frame.image.nbytes)
+            self.__slots[slot_idx] = slot
+
+        image: np.ndarray = self.__view(slot_idx=slot_idx, shape=frame.image.shape)
+        np.copyto(image, frame.image)
+        frame.image = image
+        self.__tasks.put((frame.index, slot_idx, slot.name, image.shape))
+
+    def __get_result(self):
+        """
+        Waits for the next message of the workers. A worker killed by the system (e.g. out of memory)
+        or crashed in a native runtime never answers, so the workers are checked between waits.
+
+        Returns:
+            The next result or status message.
+
+        Raises:
+            RuntimeError: If a worker process exited.
+        """
+        while True:
+            try:
+                return self.__results.get(timeout=WorkerPool.__POLL_INTERVAL)
+            except queue.Empty:
+                pass
+            for process in self.__processes:
+                if not process.is_alive():
+                    raise RuntimeError(f"Worker process {process.pid} exited with code {process.exitcode}.")
+
+    def __release(self, slot_idx: int) -> None:
+        """
+        Unlinks a slot, so its memory is freed once every process has unmapped it.
+
+        Args:
+            slot_idx (int): Index of the slot.
+        """
+        slot = self.__slots[slot_idx]
+        if slot is None:
+            return
+        slot.unlink()
+        # Images of frames already handed out may still view the slot; the mapping is then
+        # released together with them
+        with contextlib.suppress(BufferError):
+            slot.close()
+        self.__slots[slot_idx] = None
+
+    def __view(self, slot_idx: int, shape: tuple) -> np.ndarray:
+        """
+        Returns an image view over a slot.
+
+        Args:
+            slot_idx (int): Index of the slot.
+            shape (tuple): Shape of the image held by the slot.
+
+        Returns:
+            np.ndarray: uint8 image view over the slot buffer.
+        """
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.__slots[slot_idx].buf)
+
+    @staticmethod
+    def serve(
+        detector_options: dict,
+        threads: int,
+        tasks: multiprocessing.Queue,
+        results: multiprocessing.Queue
+    ) -> None:
+        """
+        Worker process loop. Loads a Detector, then runs it on every queued frame, attaching to the
+        slots by name and sending the detections back as bytes together with the step durations.
+        It is the target of the spawned processes, so it must stay reachable by name.
+
+        Args:
+            detector_options (dict): Keyword arguments of `Detector.init`.
+            threads (int): Number of inference threads of the session.
+            tasks (multiprocessing.Queue): Queue of (frame index, slot index, slot name, image shape) tasks.
+            results (multiprocessing.Queue): Queue of (frame index, detections, stage times) results.
+        """
+        from ai.processors.detector import Detector
+
+        try:
+            runtime_config: RuntimeConfig = detector_options.get("runtime_config", RuntimeConfig())
+            Detector.init(**{**detector_options, "runtime_config": replace(runtime_config, intra_op_threads=threads)})
+        except Exception:
+            results.put(traceback.format_exc())
+            return
+        results.put({
+            "import_time": Detector.import_time,
+            "load_time": Detector.load_time,
+            "model_cache": Detector.model_cache,
+            "backend": Detector.backend,
+        })
+
+        attached_slots: Dict[int, shared_memory.SharedMemory] = dict()
+        while True:
+            task = tasks.get()
+            if task is WorkerPool.__STOP:
+                break
+
+            index, slot_idx, slot_name, shape = task
+            try:
+                slot = attached_slots.get(slot_idx)
+                if slot is None or slot.name != slot_name:
+                    # The slot was grown, and the parent unlinked the one it replaces
+                    if slot is not None:
+                        with contextlib.suppress(BufferError):
+                            slot.close()
+                    slot = attached_slots[slot_idx] = shared_memory.SharedMemory(name=slot_name)
+                image = np.ndarray(shape, dtype=np.uint8, buffer=slot.buf)
+
+                detections: DetectionBatch = Detector.run(image=image, columnar=True)
+                del image
+                results.put((
+                    index,
+                    detections.to_bytes(),
+                    {
+                        "pre_process": Detector.pre_process_time,
+                        "inference": Detector.inference_time,
+                        "post_process": Detector.post_process_time,
+                    }
+                ))
+            except Exception:
+                results.put(traceback.format_exc())
+
+        for slot in attached_slots.values():
+            slot.close()